@@ -11,16 +11,67 @@ class Settings(BaseSettings):
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60
+    token_cache_size: int = 10000  # Verified tokens memoized until they expire
+    user_cache_size: int = 10000
+    user_cache_ttl_seconds: int = 60
     
     # MongoDB
     mongodb_uri: str
     mongodb_db: str = "credsaathi_db"
+    mongo_profile_slow_ms: int = 0  # Profile operations slower than this; 0 leaves the profiler alone
     
     # Google OAuth
     google_client_id: str
     google_client_secret: str
     google_oauth_redirect_uri: str
     
+    # Prediction
+    model_backend: str = "catboost"  # "catboost" or "numpy" (compiled artifact)
+    model_mmap: bool = False  # Memory-map compiled (.npz) models so workers share one copy
+    model_history_size: int = 3  # Previous models kept warm for rollback
+    model_watch_interval_seconds: float = 0  # Poll the model file for changes (0 = off)
+    predict_batch_max_size: int = 500
+    
+    # Prediction cache
+    prediction_cache_size: int = 10000
+    prediction_cache_ttl_seconds: int = 3600
+    prediction_cache_shared: bool = False  # Also cache in MongoDB across workers
+    
+    # Inference executor
+    inference_workers: int = 2
+    inference_max_queue: int = 64
+    catboost_thread_count: int = 1
+    inference_batch_window_ms: float = 3.0
+    inference_max_batch_size: int = 32
+    
+    # Bulk ingestion
+    ingest_bulk_chunk_size: int = 1000  # Rows per insert_many
+    ingest_bulk_max_errors: int = 1000  # Line numbers reported per category
+    
+    # Prediction audit writer
+    audit_flush_batch_size: int = 500  # Flush when this many records are buffered
+    audit_flush_interval_ms: float = 200.0  # ... or after this long
+    audit_max_buffer: int = 10000  # Routes wait for a flush beyond this
+    audit_write_concern_w: str = "1"  # Node count or "majority"
+    audit_write_concern_j: bool = False  # Wait for the journal
+    audit_spill_dir: str = "audit_spill"  # Records not written at shutdown, replayed on start
+    audit_drain_timeout_seconds: float = 10.0
+    input_snapshot_cache_size: int = 100000  # Input snapshot hashes known to be stored
+    score_history_retention_days: int = 0  # Expire score history points; 0 keeps them (set before first start)
+    
+    # Re-scoring jobs
+    rescore_batch_size: int = 500  # Applicants per cursor batch / model call / bulk_write
+    rescore_max_rate: float = 0  # Applicants per second; 0 = unthrottled
+    rescore_lease_seconds: int = 120  # A running job not checkpointed or renewed for this long can be resumed
+    rescore_yield_ms: float = 50  # Pause between checks while interactive inference is queued
+    rescore_max_yield_seconds: float = 2.0  # Longest a chunk waits for interactive traffic
+    
+    # Columnar loader
+    columnar_batch_size: int = 10000  # Applicants per raw BSON batch (app/services/columnar_loader.py)
+    
+    # Read endpoints build trusted output and encode it with orjson (app/utils/fast_json.py)
+    fast_json_responses: bool = False
+    
     # CORS
     frontend_url: str = "http://localhost:8080"
     
@@ -29,6 +80,26 @@ class Settings(BaseSettings):
 
     # Gemini API
     gemini_api_key: str
+    gemini_api_url: str = "https://generativelanguage.googleapis.com/v1"
+    gemini_connect_timeout: float = 5.0
+    gemini_read_timeout: float = 30.0
+    gemini_total_timeout: float = 60.0  # Whole call, including queueing and retries
+    gemini_max_retries: int = 3
+    gemini_backoff_base: float = 0.5
+    gemini_backoff_max: float = 8.0
+    gemini_max_concurrency: int = 8
+    gemini_max_connections: int = 20
+    gemini_rate_per_minute: float = 60.0  # Upstream quota for the whole deployment; 0 disables
+    gemini_rate_burst: int = 10
+    web_concurrency: int = 1  # Worker processes sharing the quota (gunicorn.conf.py sets it)
+    insights_cache_size: int = 1000
+    insights_cache_ttl_seconds: int = 86400
+    insights_job_workers: int = 2
+    insights_job_max_attempts: int = 3
+    insights_job_lease_seconds: int = 120  # Running jobs older than this are re-queued
+    insights_job_poll_interval: float = 1.0
+    insights_job_ttl_seconds: int = 604800  # Finished jobs are kept for a week
+    insights_job_max_wait_seconds: float = 30.0  # Long-poll cap
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -4,9 +4,18 @@ from fastapi import Depends
 def get_db():
     db = get_database()
     yield db
+import logging
+
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from app.config import settings
-from typing import Optional
+from app.query_shapes import COLLECTIONS, INDEXES
+from app.services.query_profiler import set_profiling
+from pymongo.errors import CollectionInvalid, OperationFailure
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+INDEX_OPTIONS_CONFLICT = 85
 
 
 class MongoDB:
@@ -16,6 +25,10 @@ class MongoDB:
 
 mongodb = MongoDB()
 
+# (collection, fields) of unique indexes ensure_indexes could not create;
+# writes that rely on them check for duplicates themselves (unique_index_missing)
+missing_unique_indexes: Set[Tuple[str, Tuple[str, ...]]] = set()
+
 
 async def connect_to_mongo():
     """Connect to MongoDB"""
@@ -24,6 +37,14 @@ async def connect_to_mongo():
     
     # Ensure indexes
     await ensure_indexes()
+    
+    if settings.mongo_profile_slow_ms > 0:
+        try:
+            await set_profiling(mongodb.db, settings.mongo_profile_slow_ms)
+            print(f"MongoDB profiler on for operations over {settings.mongo_profile_slow_ms} ms")
+        except Exception as e:
+            # Not permitted on some hosted tiers
+            print(f"Could not enable MongoDB profiler: {e}")
     print(f"Connected to MongoDB: {settings.mongodb_db}")
 
 
@@ -42,20 +63,97 @@ def get_database() -> AsyncIOMotorDatabase:
 
 
 async def ensure_indexes():
-    """Create necessary database indexes"""
+    """Create the collections and indexes declared in app/query_shapes.py"""
     db = mongodb.db
+    missing_unique_indexes.clear()
+    existing = {
+        info["name"]: info.get("options", {})
+        for info in await (await db.list_collections()).to_list(None)
+    }
+    for collection, options in COLLECTIONS.items():
+        if collection not in existing:
+            try:
+                await db.create_collection(collection, **options)
+            except CollectionInvalid:
+                pass  # Created concurrently by another worker
+            continue
+        # Retention (time series) changed since the collection was created
+        expire = options.get("expireAfterSeconds", "off")
+        if existing[collection].get("expireAfterSeconds", "off") != expire:
+            await db.command({"collMod": collection, "expireAfterSeconds": expire})
+            logger.warning("Changed %s expireAfterSeconds to %s", collection, expire)
     
-    # Users collection indexes
-    await db.users.create_index("email", unique=True)
-    await db.users.create_index("google_id", unique=True, sparse=True)
-    
-    # Applicants collection indexes
-    await db.applicants.create_index("user_id")
-    await db.applicants.create_index("created_at")
-    
-    # Predictions collection indexes
-    await db.predictions.create_index("user_id")
-    await db.predictions.create_index("applicant_id")
-    await db.predictions.create_index("created_at")
+    for collection, indexes in INDEXES.items():
+        for index in indexes:
+            options = {key: value for key, value in index.items() if key != "keys"}
+            try:
+                await db[collection].create_index(index["keys"], **options)
+            except OperationFailure as e:
+                if e.code == INDEX_OPTIONS_CONFLICT and "expireAfterSeconds" in options:
+                    await update_ttl(collection, index["keys"], options["expireAfterSeconds"])
+                    continue
+                if not options.get("unique") or e.code != 11000:
+                    raise
+                # Existing duplicates: start without the index and say which
+                # documents conflict, instead of failing to boot
+                fields = tuple(field for field, _ in index["keys"])
+                missing_unique_indexes.add((collection, fields))
+                groups = [
+                    f"    {duplicate['_id']}: {', '.join(str(_id) for _id in duplicate['ids'])}"
+                    for duplicate in await find_duplicates(collection, index["keys"])
+                ]
+                logger.error(
+                    "Unique index on %s (%s) not created: duplicate values exist\n%s\n"
+                    "  Resolve them (scripts/dedupe_applicants.py for applicants) and restart",
+                    collection, ", ".join(fields), "\n".join(groups)
+                )
     
     print("Database indexes ensured")
+
+
+async def update_ttl(collection: str, keys: List[Any], expire_after_seconds: int):
+    """
+    Change an existing TTL index's expireAfterSeconds in place
+
+    create_index fails with IndexOptionsConflict when the TTL setting behind
+    an index changed; collMod applies the new value without a rebuild.
+    """
+    db = mongodb.db
+    await db.command({
+        "collMod": collection,
+        "index": {"keyPattern": dict(keys), "expireAfterSeconds": expire_after_seconds},
+    })
+    fields = ", ".join(field for field, _ in keys)
+    logger.warning("Changed TTL index on %s (%s) to expire after %s s", collection, fields, expire_after_seconds)
+
+
+def unique_index_missing(collection: str, fields: Tuple[str, ...]) -> bool:
+    """Whether ensure_indexes left this unique index uncreated"""
+    return (collection, tuple(fields)) in missing_unique_indexes
+
+
+async def find_duplicates(collection: str, keys: List[Any], limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    Key values held by more than one document, with the conflicting _ids
+
+    Args:
+        collection: Collection name
+        keys: Index keys, as declared in app/query_shapes.py
+        limit: Maximum number of duplicate groups returned
+
+    Returns:
+        [{"_id": {field: value}, "ids": [...], "count": n}], largest groups first
+    """
+    db = mongodb.db
+    pipeline = [
+        {"$group": {
+            "_id": {field.replace(".", "_"): f"${field}" for field, _ in keys},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1},
+        }},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$sort": {"count": -1}},
+    ]
+    if limit:
+        pipeline.append({"$limit": limit})
+    return await db[collection].aggregate(pipeline, allowDiskUse=True).to_list(None)
@@ -1,11 +1,26 @@
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from contextlib import asynccontextmanager
+
+# Before the app imports: loading the model at import time logs
+logging.basicConfig(level=logging.INFO, format="%(levelname)s:     %(name)s: %(message)s")
+# httpx logs each request URL at INFO, and Gemini URLs carry the API key
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
 from app.config import settings
 from app.db import connect_to_mongo, close_mongo_connection
+from app.services.inference_executor import inference_executor
+from app.services.model_registry import model_registry
+from app.services.insights_service import gemini_client
+from app.services.insights_jobs import insights_job_queue
+from app.services.audit_writer import audit_writer
+from app.services.score_history import score_history_writer
+from app.services.rescore_job import rescore_runner
 from app.routers import auth, users, ingest, predict
-from app.routers import insights
+from app.routers import insights, admin, stats
 
 
 @asynccontextmanager
@@ -13,8 +28,21 @@ async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
     # Startup
     await connect_to_mongo()
+    await audit_writer.start()
+    await score_history_writer.start()
+    inference_executor.start()
+    model_registry.start_watcher(settings.model_watch_interval_seconds)
+    insights_job_queue.start()
     yield
     # Shutdown
+    await model_registry.stop_watcher()
+    await insights_job_queue.stop()
+    await rescore_runner.stop()
+    # After the routes stop producing records, before Mongo closes
+    await audit_writer.stop()
+    await score_history_writer.stop()
+    await gemini_client.aclose()
+    inference_executor.shutdown()
     await close_mongo_connection()
 
 
@@ -42,6 +70,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
@@ -50,6 +79,8 @@ app.include_router(users.router)
 app.include_router(ingest.router)
 app.include_router(predict.router)
 app.include_router(insights.router)
+app.include_router(admin.router)
+app.include_router(stats.router)
 
 
 @app.get("/")
@@ -32,6 +32,16 @@ APPLICANT_SCHEMA = {
     },
     "credit_score": "int (300-850, optional)",
     "risk_tier": "string (low/medium/high/very_high, optional)",
+    "last_scored_at": "datetime (optional)",
+    "last_prediction_id": "string (references predictions._id, optional)",
+    "model_version": "string (model that produced credit_score, optional)",
+    "features": {
+        "version": "int (FEATURE_PIPELINE_VERSION that computed the record)",
+        "vector": "array of floats (normalized model input, FEATURE_NAMES order)",
+        "values": "array of floats (raw feature values)",
+        "defaulted": "array of strings (input fields that were missing)",
+        "computed_at": "datetime"
+    },
     "created_at": "datetime",
     "updated_at": "datetime"
 }
@@ -41,16 +51,105 @@ PREDICTION_SCHEMA = {
     "_id": "ObjectId",
     "user_id": "string",
     "applicant_id": "string",
-    "input_data": "object (snapshot of data used)",
+    "input_hash": "string (sha256 of the input; see input_snapshots)",
+    "feature_version": "int (FEATURE_PIPELINE_VERSION of the features used)",
+    "features": "binary (model feature vector, packed little-endian float32)",
+    "defaulted_features": "array of strings (inputs that were missing and defaulted; absent on older predictions)",
     "score": "int (300-850)",
     "risk_tier": "string",
     "feature_importances": "array of objects",
     "confidence": "float (0-1)",
+    "model_version": "string (missing on predictions written before model versions were recorded)",
+    "created_at": "datetime"
+}
+
+
+# Time-series collection (timeField ts, metaField meta); see app/services/score_history.py
+SCORE_HISTORY_SCHEMA = {
+    "ts": "datetime (when the score was made)",
+    "meta": "object (applicant_id, user_id)",
+    "score": "int (300-850)",
+    "risk_tier": "string",
+    "confidence": "float (0-1)",
+    "model_version": "string or null (null for backfilled legacy predictions)",
+    "prediction_id": "string (predictions _id)"
+}
+
+
+# Model inputs stored once per distinct content (see app/services/prediction_storage.py)
+INPUT_SNAPSHOT_SCHEMA = {
+    "_id": "string (sha256 of the canonical input JSON)",
+    "data": "object (financial_data, social_data, gig_data used for scoring)",
     "created_at": "datetime"
 }
 
 
+PREDICTION_CACHE_SCHEMA = {
+    "_id": "string (sha256 of model version + feature vector)",
+    "result": "object (score, risk_tier, feature_importances, confidence)",
+    "model_version": "string",
+    "expires_at": "datetime (TTL index)"
+}
+
+
+INSIGHTS_CACHE_SCHEMA = {
+    "_id": "string (sha256 of canonical applicant data + prompt version + model)",
+    "insights": "object (parsed Gemini report)",
+    "prompt_version": "string",
+    "model": "string",
+    "created_at": "datetime (TTL index)"
+}
+
+
+INSIGHTS_JOB_SCHEMA = {
+    "_id": "ObjectId (job ID)",
+    "user_id": "string (owner; jobs are only readable by them)",
+    "status": "string (queued, running, done, failed)",
+    "applicant_data": "object",
+    "cache_key": "string (insights cache key)",
+    "attempts": "int",
+    "created_at": "datetime",
+    "available_at": "datetime (not claimed before this; retry backoff)",
+    "started_at": "datetime (latest attempt)",
+    "lease_expires_at": "datetime (running jobs past this are re-claimed)",
+    "finished_at": "datetime (TTL index)",
+    "result": "object (insights report, when done)",
+    "cache": "string (hit, miss, coalesced)",
+    "error": "string (last failure)"
+}
+
+RESCORE_JOB_SCHEMA = {
+    "_id": "ObjectId (job ID)",
+    "status": "string (queued, running, paused, done, failed, cancelled)",
+    "user_id": "string (optional, only this user's applicants)",
+    "only_stale": "bool (skip applicants already scored by model_version)",
+    "model_version": "string (model the job scores with)",
+    "batch_size": "int",
+    "max_rate": "float (applicants per second, 0 = unthrottled)",
+    "total": "int (applicants to score when created)",
+    "processed": "int",
+    "changed": "int (score or tier changed)",
+    "last_id": "ObjectId (checkpoint: last applicant written)",
+    "runs": "int (times claimed; > 1 after a resume)",
+    "run_started_at": "datetime",
+    "run_processed": "int",
+    "rate": "float (applicants per second in the current run)",
+    "lease_expires_at": "datetime (running jobs past this can be resumed)",
+    "recompute_stats": "bool (rebuild portfolio stats when done)",
+    "created_at": "datetime",
+    "updated_at": "datetime",
+    "finished_at": "datetime",
+    "error": "string"
+}
+
+
 # Indexes created in app/db.py
 # - user_id
+# - (user_id, email) unique, for applicants
 # - created_at
 # - applicant_id (for predictions)
+# - expires_at (TTL, for prediction_cache)
+# - created_at (TTL, for insights_cache)
+# - (status, created_at) and finished_at (TTL) for insights_jobs
+# - created_at for rescore_jobs
+# - (meta.applicant_id, meta.user_id, ts) for score_history
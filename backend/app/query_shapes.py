@@ -0,0 +1,221 @@
+"""
+Query shapes and the indexes that serve them
+
+Every query the API runs against MongoDB is declared here with the index
+meant to serve it. `ensure_indexes` (app/db.py) creates INDEXES, and
+scripts/check_query_plans.py runs `explain` on each QUERY_SHAPE to prove it
+uses an index without an in-memory sort. Collections that need creation
+options (time series) are declared in COLLECTIONS.
+
+When adding a query to a router or service, add its shape here too.
+Filter values are placeholders of the right type; only the shape matters.
+Aggregations declare a `pipeline` instead of filter/sort/limit; their
+$sort stages before any $group must be covered by the index too.
+"""
+
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.config import settings
+
+
+# Collections that need options at creation; created before INDEXES
+COLLECTIONS = {
+    # Score time series (app/services/score_history.py), bucketed per applicant
+    "score_history": {
+        "timeseries": {"timeField": "ts", "metaField": "meta", "granularity": "hours"},
+        **(
+            {"expireAfterSeconds": settings.score_history_retention_days * 86400}
+            if settings.score_history_retention_days > 0 else {}
+        ),
+    },
+}
+
+
+# Compound indexes follow equality -> sort -> range field order
+INDEXES = {
+    "users": [
+        {"keys": [("email", 1)], "unique": True},
+        {"keys": [("google_id", 1)], "unique": True, "sparse": True},
+    ],
+    "applicants": [
+        # Also rejects duplicate applicants (see app/services/bulk_ingest.py)
+        {"keys": [("user_id", 1), ("email", 1)], "unique": True},
+        # _id breaks created_at ties for keyset pagination
+        {"keys": [("user_id", 1), ("created_at", -1), ("_id", -1)]},
+        {"keys": [("created_at", 1)]},
+    ],
+    "predictions": [
+        {"keys": [("applicant_id", 1), ("user_id", 1), ("created_at", -1)]},
+        {"keys": [("user_id", 1)]},
+        {"keys": [("created_at", 1)]},
+    ],
+    "score_history": [
+        {"keys": [("meta.applicant_id", 1), ("meta.user_id", 1), ("ts", 1)]},
+    ],
+    "prediction_cache": [
+        # Entries expire at expires_at
+        {"keys": [("expires_at", 1)], "expireAfterSeconds": 0},
+    ],
+    "insights_cache": [
+        {"keys": [("created_at", 1)], "expireAfterSeconds": settings.insights_cache_ttl_seconds},
+    ],
+    "rescore_jobs": [
+        {"keys": [("created_at", -1)]},
+    ],
+    "insights_jobs": [
+        # Jobs are claimed oldest-first; finished jobs expire
+        {"keys": [("status", 1), ("created_at", 1)]},
+        {"keys": [("finished_at", 1)], "expireAfterSeconds": settings.insights_job_ttl_seconds},
+    ],
+}
+
+
+_OID = ObjectId("000000000000000000000000")
+_NOW = datetime(2024, 1, 1)
+
+QUERY_SHAPES = [
+    {
+        "name": "users.by_id",
+        "used_by": "get_current_user, PATCH /users/me",
+        "collection": "users",
+        "filter": {"_id": _OID},
+    },
+    {
+        "name": "users.by_google_id_or_email",
+        "used_by": "get_or_create_user",
+        "collection": "users",
+        "filter": {"$or": [{"google_id": "g"}, {"email": "e"}]},
+    },
+    {
+        "name": "applicants.by_owner_email",
+        "used_by": "POST /ingest/applicant, /ingest/applicants/bulk (unique index)",
+        "collection": "applicants",
+        "filter": {"user_id": "u", "email": "e"},
+    },
+    {
+        "name": "applicants.list_by_owner",
+        "used_by": "GET /ingest/applicants",
+        "collection": "applicants",
+        "filter": {"user_id": "u"},
+        "sort": [("created_at", -1), ("_id", -1)],
+        "limit": 51,
+    },
+    {
+        "name": "applicants.list_by_owner_after_cursor",
+        "used_by": "GET /ingest/applicants?cursor=",
+        "collection": "applicants",
+        "filter": {
+            "user_id": "u",
+            "created_at": {"$lte": _NOW},
+            "$or": [{"created_at": {"$lt": _NOW}}, {"_id": {"$lt": _OID}}],
+        },
+        "sort": [("created_at", -1), ("_id", -1)],
+        "limit": 51,
+    },
+    {
+        "name": "applicants.by_id_and_owner",
+        "used_by": "POST /predict/score, /ingest/financial|social|gig",
+        "collection": "applicants",
+        "filter": {"_id": _OID, "user_id": "u"},
+    },
+    {
+        "name": "applicants.batch_by_ids",
+        "used_by": "POST /predict/batch (applicant_ids)",
+        "collection": "applicants",
+        "filter": {"_id": {"$in": [_OID]}, "user_id": "u"},
+    },
+    {
+        "name": "applicants.batch_by_filter",
+        "used_by": "POST /predict/batch (filter)",
+        "collection": "applicants",
+        "filter": {"user_id": "u", "risk_tier": "High", "credit_score": None},
+        "sort": [("created_at", -1)],
+        "limit": 100,
+    },
+    {
+        "name": "applicants.rescore_scan",
+        "used_by": "re-score jobs (app/services/rescore_job.py)",
+        "collection": "applicants",
+        "filter": {"_id": {"$gt": _OID}, "model_version": {"$ne": "v"}},
+        "sort": [("_id", 1)],
+        "limit": 500,
+    },
+    {
+        "name": "predictions.history",
+        "used_by": "GET /predict/history/{applicant_id}",
+        "collection": "predictions",
+        "filter": {"applicant_id": "a", "user_id": "u"},
+        "sort": [("created_at", -1)],
+        "limit": 10,
+    },
+    {
+        "name": "score_history.range",
+        "used_by": "GET /predict/history/{applicant_id}/series",
+        "collection": "score_history",
+        "filter": {"meta.applicant_id": "a", "meta.user_id": "u", "ts": {"$gte": _NOW, "$lt": _NOW}},
+        "sort": [("ts", 1)],
+        "limit": 1000,
+    },
+    {
+        "name": "score_history.downsampled",
+        "used_by": "GET /predict/history/{applicant_id}/series?interval=",
+        "collection": "score_history",
+        "pipeline": [
+            {"$match": {"meta.applicant_id": "a", "meta.user_id": "u", "ts": {"$gte": _NOW, "$lt": _NOW}}},
+            {"$sort": {"ts": 1}},
+            {"$group": {
+                "_id": {"$dateTrunc": {"date": "$ts", "unit": "day"}},
+                "last": {"$last": "$score"},
+                "count": {"$sum": 1},
+            }},
+            {"$sort": {"_id": -1}},
+            {"$limit": 1000},
+        ],
+    },
+    {
+        "name": "applicants.portfolio_stats",
+        "used_by": "recompute_portfolio_stats (POST /stats/portfolio/recompute)",
+        "collection": "applicants",
+        "pipeline": [
+            {"$match": {"user_id": "u"}},
+            {"$group": {"_id": None, "total": {"$sum": 1}, "score_sum": {"$sum": "$credit_score"}}},
+        ],
+    },
+    {
+        "name": "input_snapshots.by_hash",
+        "used_by": "expand_predictions (GET /predict/history)",
+        "collection": "input_snapshots",
+        "filter": {"_id": {"$in": ["h"]}},
+    },
+    {
+        "name": "insights_jobs.claim",
+        "used_by": "insights job workers",
+        "collection": "insights_jobs",
+        "filter": {
+            "$or": [
+                {"status": "queued", "available_at": {"$lte": _NOW}},
+                {"status": "running", "lease_expires_at": {"$lt": _NOW}},
+            ]
+        },
+        "sort": [("created_at", 1)],
+        "limit": 1,
+    },
+    {
+        "name": "rescore_jobs.recent",
+        "used_by": "GET /admin/rescore",
+        "collection": "rescore_jobs",
+        "filter": {},
+        "sort": [("created_at", -1)],
+        "limit": 20,
+    },
+    {
+        "name": "insights_jobs.oldest_queued",
+        "used_by": "GET /insights/jobs/stats",
+        "collection": "insights_jobs",
+        "filter": {"status": "queued"},
+        "sort": [("created_at", 1)],
+        "limit": 1,
+    },
+]
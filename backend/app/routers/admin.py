@@ -0,0 +1,187 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.utils.dependencies import get_current_admin
+from app.services.model_registry import model_registry, ModelLoadError
+from app.services.query_profiler import check_query_plans, slow_query_report
+from app.services.portfolio_stats import recompute_all_portfolio_stats
+from app.services.rescore_job import rescore_runner, describe_progress
+from app.db import get_database
+from bson import ObjectId
+from pydantic import BaseModel, Field
+from typing import Dict, Optional
+
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+class ModelReloadRequest(BaseModel):
+    artifact: Optional[str] = None  # File name in models/; defaults to the active artifact
+
+
+@router.get("/models")
+async def list_models(current_user: Dict = Depends(get_current_admin)):
+    """Active model, rollback history and artifacts available on disk"""
+    return model_registry.describe()
+
+
+@router.post("/models/reload")
+async def reload_model(
+    request: ModelReloadRequest,
+    current_user: Dict = Depends(get_current_admin)
+):
+    """
+    Load, warm up and publish a model artifact
+    
+    In-flight requests finish on the model they started with; the previous
+    model stays warm for rollback.
+    """
+    try:
+        loaded = await model_registry.reload(request.artifact)
+    except ModelLoadError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Model reload failed: {str(e)}"
+        )
+    
+    return {"status": "success", "active": loaded.describe()}
+
+
+@router.post("/models/rollback")
+async def rollback_model(current_user: Dict = Depends(get_current_admin)):
+    """Re-publish the previously active model"""
+    try:
+        loaded = model_registry.rollback()
+    except ModelLoadError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    
+    return {"status": "success", "active": loaded.describe()}
+
+
+@router.get("/queries/plans")
+async def get_query_plans(current_user: Dict = Depends(get_current_admin)):
+    """Explain every declared query shape; `ok` is false on COLLSCAN, an uncovered sort or a $group spill"""
+    results = await check_query_plans(get_database())
+    return {"ok": all(result["ok"] for result in results), "shapes": results}
+
+
+@router.get("/queries/slow")
+async def get_slow_queries(
+    minutes: int = Query(60, ge=1),
+    top: int = Query(20, ge=1, le=200),
+    current_user: Dict = Depends(get_current_admin)
+):
+    """Slowest query shapes recorded by the MongoDB profiler"""
+    return await slow_query_report(get_database(), since_minutes=minutes, top=top)
+
+
+@router.post("/stats/recompute")
+async def recompute_stats(current_user: Dict = Depends(get_current_admin)):
+    """Rebuild every user's portfolio stats from the applicants collection"""
+    users = await recompute_all_portfolio_stats()
+    return {"status": "success", "users": users}
+
+
+class RescoreRequest(BaseModel):
+    user_id: Optional[str] = None  # Only this user's applicants; default everyone
+    only_stale: bool = True  # Skip applicants already scored by the active model
+    batch_size: Optional[int] = Field(default=None, ge=1, le=5000)
+    max_rate: Optional[float] = Field(default=None, ge=0)  # Applicants per second; 0 = unthrottled
+
+
+def serialize_rescore_job(job: dict) -> dict:
+    """Re-score job document as returned to clients"""
+    return {
+        "job_id": str(job["_id"]),
+        "status": job["status"],
+        "user_id": job.get("user_id"),
+        "only_stale": job.get("only_stale"),
+        "model_version": job.get("model_version"),
+        "batch_size": job.get("batch_size"),
+        "max_rate": job.get("max_rate"),
+        "total": job.get("total", 0),
+        "processed": job.get("processed", 0),
+        "changed": job.get("changed", 0),
+        "rate_per_second": job.get("rate"),
+        **describe_progress(job),
+        "last_id": str(job["last_id"]) if job.get("last_id") else None,
+        "runs": job.get("runs", 0),
+        "created_at": job.get("created_at"),
+        "updated_at": job.get("updated_at"),
+        "finished_at": job.get("finished_at"),
+        "error": job.get("error"),
+    }
+
+
+def _rescore_job_id(job_id: str) -> ObjectId:
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid job ID format")
+    return ObjectId(job_id)
+
+
+@router.post("/rescore", status_code=202)
+async def start_rescore(request: RescoreRequest, current_user: Dict = Depends(get_current_admin)):
+    """
+    Re-score stored applicants with the active model in the background
+    
+    Poll GET /admin/rescore/{job_id} for progress. A job interrupted by a
+    shutdown or crash resumes from its checkpoint via .../resume.
+    """
+    try:
+        job = await rescore_runner.create(
+            user_id=request.user_id,
+            only_stale=request.only_stale,
+            batch_size=request.batch_size,
+            max_rate=request.max_rate
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    job = await rescore_runner.claim(job["_id"])
+    rescore_runner.start(job)
+    return serialize_rescore_job(job)
+
+
+@router.get("/rescore")
+async def list_rescore_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: Dict = Depends(get_current_admin)
+):
+    """Most recent re-score jobs"""
+    return {"jobs": [serialize_rescore_job(job) for job in await rescore_runner.list(limit)]}
+
+
+@router.get("/rescore/{job_id}")
+async def get_rescore_job(job_id: str, current_user: Dict = Depends(get_current_admin)):
+    """Progress and throughput of a re-score job"""
+    job = await rescore_runner.get(_rescore_job_id(job_id))
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return serialize_rescore_job(job)
+
+
+@router.post("/rescore/{job_id}/resume", status_code=202)
+async def resume_rescore_job(job_id: str, current_user: Dict = Depends(get_current_admin)):
+    """Continue a paused, failed or crashed job from its last checkpoint"""
+    job = await rescore_runner.claim(_rescore_job_id(job_id))
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Job not found, finished, or still running"
+        )
+    rescore_runner.start(job)
+    return serialize_rescore_job(job)
+
+
+@router.post("/rescore/{job_id}/cancel")
+async def cancel_rescore_job(job_id: str, current_user: Dict = Depends(get_current_admin)):
+    """Stop a job for good (a running job stops after its current chunk)"""
+    job = await rescore_runner.cancel(_rescore_job_id(job_id))
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Job not found or already finished")
+    return serialize_rescore_job(job)
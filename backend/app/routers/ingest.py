@@ -1,16 +1,69 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from app.utils.dependencies import get_current_user
 from app.schemas.applicant import (
     ApplicantCreate,
     ApplicantResponse,
+    ApplicantSummary,
+    BulkIngestResponse,
     IngestFinancialRequest,
     IngestSocialRequest,
     IngestGigRequest
 )
-from app.db import get_database
-from typing import Dict, List
+from app.services.bulk_ingest import APPLICANT_KEY, build_applicant_doc, ingest_applicants
+from app.services.portfolio_stats import record_applicants_created
+from app.services.feature_store import compute_features, model_input
+from app.db import get_database, unique_index_missing
+from app.config import settings
+from app.utils.fast_json import TrustedJSONResponse
+from typing import Dict, List, Literal, Optional, Union
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+import base64
+import json
+
+# Content types accepted by the bulk import
+BULK_FORMATS = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/ndjson": "ndjson",
+    "text/csv": "csv",
+}
+
+# Fields read for view=summary (what the dashboard cards show)
+SUMMARY_PROJECTION = {
+    "name": 1,
+    "email": 1,
+    "phone": 1,
+    "gig_data.platforms": 1,
+    "gig_data.average_rating": 1,
+    "credit_score": 1,
+    "risk_tier": 1,
+    "created_at": 1,
+}
+
+# Larger page sizes are clamped to this; the rest is reached with the cursor
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(applicant: Dict) -> str:
+    """Opaque continuation token for the page after this applicant"""
+    position = {"t": applicant["created_at"].isoformat(timespec="milliseconds"), "i": str(applicant["_id"])}
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """(created_at, _id) from a continuation token"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(position["t"]), ObjectId(position["i"])
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
 
 
 router = APIRouter(prefix="/ingest", tags=["data-ingestion"])
@@ -24,35 +77,24 @@ async def create_applicant(
     """Create a new applicant profile"""
     db = get_database()
     
-    # Check if applicant with same email already exists for this user
-    existing = await db.applicants.find_one({
-        "user_id": str(current_user["_id"]),
-        "email": applicant.email
-    })
-    
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Applicant with this email already exists"
-        )
+    applicant_doc = build_applicant_doc(applicant, str(current_user["_id"]), datetime.utcnow())
     
-    now = datetime.utcnow()
-    applicant_doc = {
-        "user_id": str(current_user["_id"]),
-        "name": applicant.name,
-        "email": applicant.email,
-        "phone": applicant.phone,
-        "financial_data": applicant.financial_data.dict() if applicant.financial_data else None,
-        "social_data": applicant.social_data.dict() if applicant.social_data else None,
-        "gig_data": applicant.gig_data.dict() if applicant.gig_data else None,
-        "credit_score": None,
-        "risk_tier": None,
-        "created_at": now,
-        "updated_at": now
-    }
-    
-    result = await db.applicants.insert_one(applicant_doc)
+    duplicate = HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Applicant with this email already exists"
+    )
+    # The unique (user_id, email) index rejects duplicates; if startup could
+    # not create it, check first
+    if unique_index_missing("applicants", APPLICANT_KEY) and await db.applicants.find_one(
+        {"user_id": applicant_doc["user_id"], "email": applicant_doc["email"]}, {"_id": 1}
+    ):
+        raise duplicate
+    try:
+        result = await db.applicants.insert_one(applicant_doc)
+    except DuplicateKeyError:
+        raise duplicate
     applicant_doc["_id"] = str(result.inserted_id)
+    await record_applicants_created(applicant_doc["user_id"])
     
     return ApplicantResponse(
         id=applicant_doc["_id"],
@@ -70,65 +112,167 @@ async def create_applicant(
     )
 
 
-@router.get("/applicants", response_model=List[ApplicantResponse])
+@router.post("/applicants/bulk", response_model=BulkIngestResponse)
+async def bulk_import_applicants(
+    request: Request,
+    format: Optional[str] = None,
+    current_user: Dict = Depends(get_current_user)
+):
+    """
+    Import many applicants from an NDJSON or CSV body
+    
+    The body is read as a stream and written in insert_many chunks, so
+    uploads of any size use bounded memory. The format comes from the
+    Content-Type (application/x-ndjson or text/csv) or `?format=ndjson|csv`.
+    
+    Returns:
+        Counts of inserted, duplicate and invalid rows with line numbers
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = format or BULK_FORMATS.get(content_type)
+    if fmt not in ("ndjson", "csv"):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send application/x-ndjson or text/csv (or pass ?format=ndjson|csv)"
+        )
+    
+    summary = await ingest_applicants(request.stream(), fmt, str(current_user["_id"]))
+    await record_applicants_created(str(current_user["_id"]), summary["inserted"])
+    return BulkIngestResponse(**summary)
+
+
+@router.get("/applicants", response_model=Union[List[ApplicantResponse], List[ApplicantSummary]])
 async def list_applicants(
+    response: Response,
     current_user: Dict = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 50
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1),
+    view: Literal["full", "summary"] = "full",
+    skip: int = Query(0, ge=0, description="Deprecated: use cursor"),
 ):
-    """List all applicants for current user"""
+    """
+    List applicants for current user, newest first
+    
+    Pages are keyset-paginated on (created_at, _id): when more applicants
+    exist, the X-Next-Cursor response header holds the token to pass as
+    `cursor` for the next page. `view=summary` returns only the fields the
+    dashboard cards show. `limit` is capped at MAX_PAGE_SIZE.
+    """
     db = get_database()
+    limit = min(limit, MAX_PAGE_SIZE)
     
-    applicants = await db.applicants.find({
-        "user_id": str(current_user["_id"])
-    }).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
-    
-    return [
-        ApplicantResponse(
-            id=str(app["_id"]),
-            user_id=app["user_id"],
-            name=app["name"],
-            email=app["email"],
-            phone=app.get("phone"),
-            financial_data=app.get("financial_data"),
-            social_data=app.get("social_data"),
-            gig_data=app.get("gig_data"),
-            credit_score=app.get("credit_score"),
-            risk_tier=app.get("risk_tier"),
-            created_at=app["created_at"],
-            updated_at=app["updated_at"]
-        )
-        for app in applicants
-    ]
+    query = {"user_id": str(current_user["_id"])}
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        # Strictly after the last row in (created_at desc, _id desc) order
+        query["created_at"] = {"$lte": created_at}
+        query["$or"] = [{"created_at": {"$lt": created_at}}, {"_id": {"$lt": last_id}}]
+    
+    projection = SUMMARY_PROJECTION if view == "summary" else None
+    find = db.applicants.find(query, projection).sort([("created_at", -1), ("_id", -1)])
+    if skip and not cursor:
+        find = find.skip(skip)
+    # One extra row tells us whether there is a next page
+    applicants = await find.limit(limit + 1).to_list(limit + 1)
+    
+    headers = {}
+    if len(applicants) > limit:
+        applicants = applicants[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(applicants[-1])
+    
+    serialize = applicant_summary_output if view == "summary" else applicant_output
+    if settings.fast_json_responses:
+        # Our own documents: skip building and re-validating response models
+        return TrustedJSONResponse([serialize(app) for app in applicants], headers=headers)
+    
+    response.headers.update(headers)
+    model = ApplicantSummary if view == "summary" else ApplicantResponse
+    return [model(**serialize(app)) for app in applicants]
 
 
-@router.post("/financial")
-async def ingest_financial_data(
-    request: IngestFinancialRequest,
-    current_user: Dict = Depends(get_current_user)
-):
-    """Update financial data for an applicant"""
+def applicant_output(app: Dict) -> Dict:
+    """Stored applicant as returned by the full view (ApplicantResponse fields)"""
+    return {
+        "id": str(app["_id"]),
+        "user_id": app["user_id"],
+        "name": app["name"],
+        "email": app["email"],
+        "phone": app.get("phone"),
+        "financial_data": app.get("financial_data"),
+        "social_data": app.get("social_data"),
+        "gig_data": app.get("gig_data"),
+        "credit_score": app.get("credit_score"),
+        "risk_tier": app.get("risk_tier"),
+        "created_at": app["created_at"],
+        "updated_at": app["updated_at"]
+    }
+
+
+def applicant_summary_output(app: Dict) -> Dict:
+    """Stored applicant as returned by view=summary (ApplicantSummary fields)"""
+    return {
+        "id": str(app["_id"]),
+        "name": app["name"],
+        "email": app["email"],
+        "phone": app.get("phone"),
+        "gig_data": app.get("gig_data"),
+        "credit_score": app.get("credit_score"),
+        "risk_tier": app.get("risk_tier"),
+        "created_at": app["created_at"]
+    }
+
+
+async def update_applicant_section(applicant_id: str, user_id: str, section: str, data: Dict) -> None:
+    """
+    Replace one data section of an applicant and refresh its feature record
+    
+    Raises:
+        HTTPException: 400 for a malformed ID, 404 if not found or not owned
+    """
+    if not ObjectId.is_valid(applicant_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid applicant ID format"
+        )
     db = get_database()
     
-    result = await db.applicants.update_one(
+    applicant = await db.applicants.find_one_and_update(
         {
-            "_id": request.applicant_id,
-            "user_id": str(current_user["_id"])
+            "_id": ObjectId(applicant_id),
+            "user_id": user_id
         },
         {
             "$set": {
-                "financial_data": request.data.dict(),
+                section: data,
                 "updated_at": datetime.utcnow()
             }
-        }
+        },
+        projection={"financial_data": 1, "social_data": 1, "gig_data": 1, "updated_at": 1},
+        return_document=ReturnDocument.AFTER
     )
     
-    if result.matched_count == 0:
+    if applicant is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Applicant not found"
         )
     
+    # Features from the data as written; a newer update stores its own
+    await db.applicants.update_one(
+        {"_id": applicant["_id"], "updated_at": applicant["updated_at"]},
+        {"$set": {"features": compute_features(model_input(applicant))}}
+    )
+
+
+@router.post("/financial")
+async def ingest_financial_data(
+    request: IngestFinancialRequest,
+    current_user: Dict = Depends(get_current_user)
+):
+    """Update financial data for an applicant"""
+    await update_applicant_section(
+        request.applicant_id, str(current_user["_id"]), "financial_data", request.data.dict()
+    )
     return {"status": "success", "message": "Financial data updated"}
 
 
@@ -138,27 +282,9 @@ async def ingest_social_data(
     current_user: Dict = Depends(get_current_user)
 ):
     """Update social data for an applicant"""
-    db = get_database()
-    
-    result = await db.applicants.update_one(
-        {
-            "_id": request.applicant_id,
-            "user_id": str(current_user["_id"])
-        },
-        {
-            "$set": {
-                "social_data": request.data.dict(),
-                "updated_at": datetime.utcnow()
-            }
-        }
+    await update_applicant_section(
+        request.applicant_id, str(current_user["_id"]), "social_data", request.data.dict()
     )
-    
-    if result.matched_count == 0:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Applicant not found"
-        )
-    
     return {"status": "success", "message": "Social data updated"}
 
 
@@ -168,25 +294,7 @@ async def ingest_gig_data(
     current_user: Dict = Depends(get_current_user)
 ):
     """Update gig economy data for an applicant"""
-    db = get_database()
-    
-    result = await db.applicants.update_one(
-        {
-            "_id": request.applicant_id,
-            "user_id": str(current_user["_id"])
-        },
-        {
-            "$set": {
-                "gig_data": request.data.dict(),
-                "updated_at": datetime.utcnow()
-            }
-        }
+    await update_applicant_section(
+        request.applicant_id, str(current_user["_id"]), "gig_data", request.data.dict()
     )
-    
-    if result.matched_count == 0:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Applicant not found"
-        )
-    
     return {"status": "success", "message": "Gig data updated"}
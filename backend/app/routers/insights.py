@@ -1,7 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+import json
 import traceback
-from ..services.insights_service import get_borrower_insights
+from typing import Dict
+from bson import ObjectId
+from ..config import settings
+from ..services.insights_service import GeminiError
+from ..services.insights_cache import (
+    get_borrower_insights_cached,
+    insights_cache,
+    stream_borrower_insights_cached,
+)
+from ..services.insights_jobs import insights_job_queue
 from ..schemas.applicant import Applicant
+from ..utils.dependencies import get_current_user, get_current_admin
 from ..db import get_db
 from sqlalchemy.orm import Session
 
@@ -9,15 +21,123 @@ router = APIRouter(prefix="/insights", tags=["insights"])
 
 # Example: POST /insights/generate with applicant data in body
 @router.post("/generate")
-def generate_insights(applicant: Applicant, db: Session = Depends(get_db)):
+async def generate_insights(
+    applicant: Applicant,
+    db: Session = Depends(get_db),
+    current_user: Dict = Depends(get_current_user)
+):
     try:
         # Convert applicant Pydantic model to dict
         applicant_data = applicant.dict()
         # Optionally, enrich with more data from DB if needed
-        insights = get_borrower_insights(applicant_data)
-        return {"insights": insights}
+        insights, cache_status = await get_borrower_insights_cached(applicant_data)
+        return {"insights": insights, "cache": cache_status}
+    except GeminiError as e:
+        # Upstream unavailable after retries / deadline
+        raise HTTPException(status_code=502, detail=str(e))
     except Exception as e:
         print("\n--- Exception in /insights/generate ---")
         print(traceback.format_exc())
         print("--- End Exception ---\n")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def sse_event(event: str, data) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+# Example: POST /insights/stream with applicant data in body
+@router.post("/stream")
+async def stream_insights(applicant: Applicant, current_user: Dict = Depends(get_current_user)):
+    """
+    Stream the report as Server-Sent Events
+
+    Events:
+        cache     "hit", "coalesced" (replayed from a concurrent request) or "miss"
+        section   {"name", "data"} as soon as each report section is complete
+        complete  the whole report
+        error     {"detail"} if Gemini fails mid-stream
+    """
+    applicant_data = applicant.dict()
+
+    async def event_stream():
+        try:
+            async for event, data in stream_borrower_insights_cached(applicant_data):
+                yield sse_event(event, data)
+        except GeminiError as e:
+            yield sse_event("error", {"detail": str(e)})
+        except Exception as e:
+            print("\n--- Exception in /insights/stream ---")
+            print(traceback.format_exc())
+            print("--- End Exception ---\n")
+            yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # Stop proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/cache/stats")
+async def get_insights_cache_stats(current_user: Dict = Depends(get_current_admin)):
+    """Insights cache size, hit rate and coalesced requests (admin only)"""
+    return insights_cache.stats()
+
+
+def serialize_job(job: dict) -> dict:
+    """Job document as returned to clients"""
+    return {
+        "job_id": str(job["_id"]),
+        "status": job["status"],
+        "attempts": job.get("attempts", 0),
+        "created_at": job["created_at"],
+        "started_at": job.get("started_at"),
+        "finished_at": job.get("finished_at"),
+        "insights": job.get("result"),
+        "cache": job.get("cache"),
+        "error": job.get("error"),
+    }
+
+
+# Example: POST /insights/jobs with applicant data in body, then poll the job
+@router.post("/jobs", status_code=202)
+async def create_insights_job(applicant: Applicant, current_user: Dict = Depends(get_current_user)):
+    """Queue an insights job and return its ID immediately"""
+    job = await insights_job_queue.submit(applicant.dict(), str(current_user["_id"]))
+    return serialize_job(job)
+
+
+@router.get("/jobs/stats")
+async def get_insights_job_stats(current_user: Dict = Depends(get_current_admin)):
+    """Queue depth, wait time, processing time and rate limiter state (admin only)"""
+    return await insights_job_queue.stats()
+
+
+@router.get("/jobs/{job_id}")
+async def get_insights_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, description="Long-poll: seconds to wait for the job to finish"),
+    current_user: Dict = Depends(get_current_user)
+):
+    """
+    Get one of the current user's insights jobs
+
+    With `wait`, the request is held until the job finishes or the wait
+    (capped at INSIGHTS_JOB_MAX_WAIT_SECONDS) runs out.
+    """
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(status_code=400, detail="Invalid job ID")
+
+    user_id = str(current_user["_id"])
+    timeout = min(wait, settings.insights_job_max_wait_seconds)
+    if timeout > 0:
+        job = await insights_job_queue.wait(ObjectId(job_id), user_id, timeout)
+    else:
+        job = await insights_job_queue.get(ObjectId(job_id), user_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return serialize_job(job)
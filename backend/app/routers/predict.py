@@ -1,11 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from app.utils.dependencies import get_current_user
-from app.services.ml_stub import predict_credit_score
+from app.utils.fast_json import TrustedJSONResponse
+from app.services.ml_stub import predict_from_features, get_model_info, feature_matrix
+from app.services.feature_store import model_input as applicant_model_input, feature_record, save_feature_records
+from app.services.model_registry import model_registry
+from app.services.inference_executor import inference_executor, InferenceSaturatedError
+from app.services.batch_scheduler import inference_batcher
+from app.services.prediction_cache import prediction_cache
+from app.services.portfolio_stats import record_rescores, write_scores
+from app.services.audit_writer import audit_writer
+from app.services.prediction_storage import expand_predictions
+from app.services.score_history import record_predictions, get_score_history, score_history_writer
 from app.db import get_database
-from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
+from app.config import settings
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Literal, Optional
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
 
 
 router = APIRouter(prefix="/predict", tags=["prediction"])
@@ -19,6 +31,7 @@ class FeatureImportance(BaseModel):
     feature: str
     importance: float
     value: float
+    contribution: Optional[float] = None
 
 
 class PredictResponse(BaseModel):
@@ -29,6 +42,43 @@ class PredictResponse(BaseModel):
     feature_importances: List[FeatureImportance]
     confidence: float
     created_at: datetime
+    model_version: Optional[str] = None
+    defaulted_features: List[str] = []  # Inputs missing from the applicant; the pipeline default was scored
+    cached: bool = False  # Result served without running the model
+    audit_recorded: bool = True  # A new predictions document was queued for writing
+
+
+class BatchFilter(BaseModel):
+    risk_tier: Optional[str] = None
+    unscored_only: bool = False
+
+
+class BatchPredictRequest(BaseModel):
+    applicant_ids: Optional[List[str]] = None
+    filter: Optional[BatchFilter] = None
+    limit: int = Field(default=100, ge=1)
+
+
+class BatchPredictError(BaseModel):
+    applicant_id: str
+    error: str
+
+
+class BatchPredictResponse(BaseModel):
+    results: List[PredictResponse]
+    errors: List[BatchPredictError]
+
+
+async def run_inference(call):
+    """Await an ML call (executor or batcher), shedding load when saturated"""
+    try:
+        return await call
+    except InferenceSaturatedError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Scoring service is busy, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
 
 
 @router.post("/score", response_model=PredictResponse)
@@ -46,7 +96,8 @@ async def predict_score(
     - Feature importances (which signals contributed most)
     - Confidence score
     
-    Stores prediction in database for audit trail.
+    Stores prediction in database for audit trail (buffered: the record
+    is written shortly after the response, see app/services/audit_writer.py).
     """
     db = get_database()
     
@@ -68,67 +119,357 @@ async def predict_score(
             detail="Applicant not found or access denied"
         )
     
-    # Prepare data for ML model
-    model_input = {
-        "financial_data": applicant.get("financial_data", {}),
-        "social_data": applicant.get("social_data", {}),
-        "gig_data": applicant.get("gig_data", {})
-    }
+    # Input snapshot for the audit record
+    model_input = applicant_model_input(applicant)
+    
+    # Features were computed at ingest; recompute only if missing or from an older pipeline
+    features, recomputed = feature_record(applicant)
+    if recomputed:
+        await save_feature_records([(applicant, features)])
     
-    # Run prediction
-    prediction_result = predict_credit_score(model_input)
+    # Same features + same model => same output, so look up the cache first
+    feature_vector = feature_matrix([features])
+    model_version = model_registry.active_version
+    cached_result = None
+    if model_version:
+        cached_result = await prediction_cache.get(prediction_cache.key(feature_vector, model_version))
     
-    # Store prediction in database
+    # Nothing changed since the last score: return it without a new audit record
+    last_scored_at = applicant.get("last_scored_at")
+    if (
+        cached_result is not None
+        and applicant.get("last_prediction_id")
+        and applicant.get("model_version") == model_version
+        and last_scored_at is not None
+        and applicant.get("updated_at", last_scored_at) <= last_scored_at
+    ):
+        return _predict_response(
+            applicant["last_prediction_id"],
+            request.applicant_id,
+            cached_result,
+            last_scored_at,
+            features["defaulted"],
+            cached=True,
+            audit_recorded=False
+        )
+    
+    # Run prediction (features unchanged but data touched => reuse output, still audit)
+    prediction_result = cached_result or await run_inference(inference_batcher.submit(features))
+    # The model may have been swapped while we waited; record the one that scored
+    model_version = prediction_result["model_version"]
+    
+    now = datetime.utcnow()
+    
+    # Audit record: buffered, its ID is assigned before it is written
     prediction_doc = {
         "user_id": str(current_user["_id"]),
         "applicant_id": request.applicant_id,
         "input_data": model_input,
+        "feature_version": features["version"],
+        "features": features["vector"],
+        "defaulted_features": features["defaulted"],
         "score": prediction_result["score"],
         "risk_tier": prediction_result["risk_tier"],
         "feature_importances": prediction_result["feature_importances"],
         "confidence": prediction_result["confidence"],
-        "created_at": datetime.utcnow()
+        "model_version": model_version,
+        "created_at": now
     }
     
-    result = await db.predictions.insert_one(prediction_doc)
-    prediction_id = str(result.inserted_id)
+    prediction_id = (await record_predictions([prediction_doc]))[0]
     
-    # Update applicant with latest score (use ObjectId)
-    await db.applicants.update_one(
+    # Update applicant with latest score (use ObjectId); the previous
+    # score comes back from the same atomic write for the portfolio stats
+    previous = await db.applicants.find_one_and_update(
         {"_id": ObjectId(request.applicant_id)},
         {
             "$set": {
                 "credit_score": prediction_result["score"],
                 "risk_tier": prediction_result["risk_tier"],
-                "last_scored_at": datetime.utcnow()
+                "last_scored_at": now,
+                "last_prediction_id": prediction_id,
+                "model_version": model_version
             }
-        }
+        },
+        projection={"credit_score": 1, "risk_tier": 1},
+        return_document=ReturnDocument.BEFORE
     )
+    if previous is not None:
+        await record_rescores(str(current_user["_id"]), [(
+            previous.get("credit_score"),
+            previous.get("risk_tier"),
+            prediction_result["score"],
+            prediction_result["risk_tier"]
+        )])
     
+    if cached_result is None:
+        await prediction_cache.set(
+            prediction_cache.key(feature_vector, model_version), prediction_result, model_version
+        )
+    
+    return _predict_response(
+        prediction_id,
+        request.applicant_id,
+        prediction_result,
+        now,
+        features["defaulted"],
+        cached=cached_result is not None,
+        audit_recorded=True
+    )
+
+
+def _predict_response(
+    prediction_id: str,
+    applicant_id: str,
+    prediction_result: Dict[str, Any],
+    created_at: datetime,
+    defaulted_features: List[str],
+    cached: bool = False,
+    audit_recorded: bool = True
+) -> PredictResponse:
+    """Build a PredictResponse from a prediction result dict"""
     return PredictResponse(
         prediction_id=prediction_id,
-        applicant_id=request.applicant_id,
+        applicant_id=applicant_id,
         score=prediction_result["score"],
         risk_tier=prediction_result["risk_tier"],
         feature_importances=[
             FeatureImportance(**fi) for fi in prediction_result["feature_importances"]
         ],
         confidence=prediction_result["confidence"],
-        created_at=prediction_doc["created_at"]
+        created_at=created_at,
+        model_version=prediction_result.get("model_version"),
+        defaulted_features=defaulted_features,
+        cached=cached,
+        audit_recorded=audit_recorded
     )
 
 
+@router.get("/executor/stats")
+async def get_executor_stats(current_user: Dict = Depends(get_current_user)):
+    """Inference executor queue depth, wait time, realized batch sizes, cache and audit writer"""
+    return {
+        **inference_executor.stats(),
+        "batching": inference_batcher.stats(),
+        "cache": prediction_cache.stats(),
+        "audit": audit_writer.stats(),
+        "score_history": score_history_writer.stats()
+    }
+
+
+@router.get("/model")
+async def get_model_explanation(current_user: Dict = Depends(get_current_user)):
+    """Model metadata and global feature importances (computed once per model)"""
+    return get_model_info()
+
+
 @router.get("/history/{applicant_id}")
 async def get_prediction_history(
     applicant_id: str,
+    limit: int = Query(10, ge=1, le=100),
     current_user: Dict = Depends(get_current_user)
 ):
-    """Get prediction history for an applicant"""
+    """Get prediction history for an applicant (latest prediction records, newest first)"""
     db = get_database()
     
     predictions = await db.predictions.find({
         "applicant_id": applicant_id,
         "user_id": str(current_user["_id"])
-    }).sort("created_at", -1).limit(10).to_list(10)
+    }).sort("created_at", -1).limit(limit).to_list(limit)
+    
+    records = {"predictions": [serialize_prediction(doc) for doc in await expand_predictions(predictions)]}
+    if settings.fast_json_responses:
+        return TrustedJSONResponse(records)
+    return records
+
+
+@router.get("/history/{applicant_id}/series")
+async def get_score_series(
+    applicant_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    interval: Literal["raw", "hour", "day", "week", "month"] = "day",
+    limit: int = Query(1000, ge=1, le=5000),
+    current_user: Dict = Depends(get_current_user)
+):
+    """
+    Score history for an applicant over a time range
+    
+    `interval=raw` returns every score; otherwise scores are downsampled
+    server-side to one point per hour/day/week/month with min, avg, max,
+    last score and count. Defaults to daily points for the last year.
+    """
+    if start and end and start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end"
+        )
+    history = await get_score_history(
+        applicant_id,
+        str(current_user["_id"]),
+        start=start,
+        end=end,
+        interval=interval,
+        limit=limit
+    )
+    if settings.fast_json_responses:
+        return TrustedJSONResponse(history)
+    return history
+
+
+def serialize_prediction(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Stored prediction record as returned to clients
+    
+    Same fields as the stored document (input_data and features expanded),
+    with _id as a string.
+    """
+    record = dict(doc)
+    record["_id"] = str(doc["_id"])
+    return record
+
+
+@router.post("/batch", response_model=BatchPredictResponse)
+async def predict_batch(
+    request: BatchPredictRequest,
+    current_user: Dict = Depends(get_current_user)
+):
+    """
+    Predict credit scores for many applicants at once
+    
+    Select applicants either by explicit `applicant_ids` or by `filter`
+    (capped by `limit`). All applicants are loaded with one query, scored
+    with a single vectorized model call, and persisted with one
+    bulk_write (applicants); prediction records go to the audit writer.
+    
+    Returns per-applicant results plus per-applicant errors for IDs that
+    were malformed or not found.
+    """
+    db = get_database()
+    user_id = str(current_user["_id"])
+    max_size = settings.predict_batch_max_size
+    
+    if (request.applicant_ids is None) == (request.filter is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide exactly one of applicant_ids or filter"
+        )
+    
+    errors: List[BatchPredictError] = []
+    
+    if request.applicant_ids is not None:
+        # Preserve request order, drop duplicates
+        requested_ids = list(dict.fromkeys(request.applicant_ids))
+        if len(requested_ids) > max_size:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Batch size exceeds maximum of {max_size} applicants"
+            )
+        
+        object_ids = []
+        for applicant_id in requested_ids:
+            if ObjectId.is_valid(applicant_id):
+                object_ids.append(ObjectId(applicant_id))
+            else:
+                errors.append(BatchPredictError(
+                    applicant_id=applicant_id,
+                    error="Invalid applicant ID format"
+                ))
+        
+        query = {"_id": {"$in": object_ids}, "user_id": user_id}
+        applicants = await db.applicants.find(query).to_list(len(object_ids))
+        
+        found = {str(applicant["_id"]) for applicant in applicants}
+        for oid in object_ids:
+            if str(oid) not in found:
+                errors.append(BatchPredictError(
+                    applicant_id=str(oid),
+                    error="Applicant not found or access denied"
+                ))
+        
+        # Score in request order
+        order = {str(oid): i for i, oid in enumerate(object_ids)}
+        applicants.sort(key=lambda applicant: order[str(applicant["_id"])])
+    else:
+        query = {"user_id": user_id}
+        if request.filter.risk_tier:
+            query["risk_tier"] = request.filter.risk_tier
+        if request.filter.unscored_only:
+            query["credit_score"] = None
+        
+        limit = min(request.limit, max_size)
+        applicants = await db.applicants.find(query).sort("created_at", -1).limit(limit).to_list(limit)
+    
+    if not applicants:
+        return BatchPredictResponse(results=[], errors=errors)
+    
+    model_inputs = [applicant_model_input(applicant) for applicant in applicants]
+    
+    # Stored feature records; missing or stale ones are recomputed and saved
+    feature_records = []
+    recomputed = []
+    for applicant in applicants:
+        features, is_recomputed = feature_record(applicant)
+        feature_records.append(features)
+        if is_recomputed:
+            recomputed.append((applicant, features))
+    await save_feature_records(recomputed)
+    
+    # One vectorized model call for the whole batch
+    prediction_results = await run_inference(
+        inference_executor.run(predict_from_features, feature_records)
+    )
+    
+    now = datetime.utcnow()
+    prediction_docs = [
+        {
+            "user_id": user_id,
+            "applicant_id": str(applicant["_id"]),
+            "input_data": model_input,
+            "feature_version": features["version"],
+            "features": features["vector"],
+            "defaulted_features": features["defaulted"],
+            "score": result["score"],
+            "risk_tier": result["risk_tier"],
+            "feature_importances": result["feature_importances"],
+            "confidence": result["confidence"],
+            "model_version": result["model_version"],
+            "created_at": now
+        }
+        for applicant, model_input, features, result in zip(applicants, model_inputs, feature_records, prediction_results)
+    ]
+    
+    prediction_ids = await record_predictions(prediction_docs)
+    
+    # Old scores come from the write itself, so concurrent rescores of
+    # the same applicants don't make the portfolio stats drift
+    previous = await write_scores(applicants, [
+        {
+            "$set": {
+                "credit_score": result["score"],
+                "risk_tier": result["risk_tier"],
+                "last_scored_at": now,
+                "last_prediction_id": prediction_id,
+                "model_version": result["model_version"]
+            }
+        }
+        for result, prediction_id in zip(prediction_results, prediction_ids)
+    ])
+    await record_rescores(user_id, [
+        (*old, result["score"], result["risk_tier"])
+        for old, result in zip(previous, prediction_results)
+        if old is not None
+    ])
+    
+    # Warm the scoring cache so follow-up /predict/score calls skip inference
+    await prediction_cache.set_many([
+        (prediction_cache.key(feature_vector, result["model_version"]), result, result["model_version"])
+        for feature_vector, result in zip(feature_matrix(feature_records), prediction_results)
+    ])
+    
+    results = [
+        _predict_response(prediction_id, doc["applicant_id"], doc, doc["created_at"], doc["defaulted_features"])
+        for prediction_id, doc in zip(prediction_ids, prediction_docs)
+    ]
     
-    return {"predictions": predictions}
+    return BatchPredictResponse(results=results, errors=errors)
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends
+from app.utils.dependencies import get_current_user
+from app.services.portfolio_stats import get_portfolio_stats, recompute_portfolio_stats
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from datetime import datetime
+
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+class ScoreBucket(BaseModel):
+    range: str
+    count: int
+
+
+class PortfolioStats(BaseModel):
+    total: int
+    scored: int
+    unscored: int
+    average_score: Optional[float] = None
+    tiers: Dict[str, int]
+    buckets: List[ScoreBucket]
+    updated_at: Optional[datetime] = None
+    recomputed_at: Optional[datetime] = None
+
+
+@router.get("/portfolio", response_model=PortfolioStats)
+async def get_portfolio(current_user: Dict = Depends(get_current_user)):
+    """
+    Portfolio totals for the current user
+    
+    Served from a per-user stats document that scoring and ingestion keep
+    up to date, so the cost does not grow with the number of applicants.
+    """
+    return PortfolioStats(**await get_portfolio_stats(str(current_user["_id"])))
+
+
+@router.post("/portfolio/recompute", response_model=PortfolioStats)
+async def recompute_portfolio(current_user: Dict = Depends(get_current_user)):
+    """Rebuild the current user's stats from their applicants"""
+    user_id = str(current_user["_id"])
+    await recompute_portfolio_stats(user_id)
+    return PortfolioStats(**await get_portfolio_stats(user_id))
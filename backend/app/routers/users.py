@@ -2,7 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from app.utils.dependencies import get_current_user
 from app.schemas.user import UserInDB, UserUpdate
 from app.db import get_database
+from app.services.user_cache import invalidate_user
+from app.config import settings
+from app.utils.fast_json import TrustedJSONResponse
 from typing import Dict
+from bson import ObjectId
 
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -11,16 +15,23 @@ router = APIRouter(prefix="/users", tags=["users"])
 @router.get("/me", response_model=UserInDB)
 async def get_current_user_info(current_user: Dict = Depends(get_current_user)):
     """Get current authenticated user's information"""
-    return UserInDB(
-        id=str(current_user["_id"]),
-        email=current_user["email"],
-        name=current_user["name"],
-        picture=current_user.get("picture"),
-        google_id=current_user.get("google_id"),
-        role=current_user.get("role", "user"),
-        created_at=current_user["created_at"],
-        last_login=current_user["last_login"]
-    )
+    if settings.fast_json_responses:
+        return TrustedJSONResponse(user_output(current_user))
+    return UserInDB(**user_output(current_user))
+
+
+def user_output(user: Dict) -> Dict:
+    """Stored user as returned to clients (UserInDB fields)"""
+    return {
+        "id": str(user["_id"]),
+        "email": user["email"],
+        "name": user["name"],
+        "picture": user.get("picture"),
+        "google_id": user.get("google_id"),
+        "role": user.get("role", "user"),
+        "created_at": user["created_at"],
+        "last_login": user["last_login"]
+    }
 
 
 @router.patch("/me", response_model=UserInDB)
@@ -35,20 +46,14 @@ async def update_current_user(
     if not update_data:
         return await get_current_user_info(current_user)
     
+    # current_user["_id"] is a string; the stored _id is an ObjectId
+    user_id = ObjectId(current_user["_id"])
     await db.users.update_one(
-        {"_id": current_user["_id"]},
+        {"_id": user_id},
         {"$set": update_data}
     )
+    invalidate_user(current_user["_id"])
     
-    updated_user = await db.users.find_one({"_id": current_user["_id"]})
+    updated_user = await db.users.find_one({"_id": user_id})
     
-    return UserInDB(
-        id=str(updated_user["_id"]),
-        email=updated_user["email"],
-        name=updated_user["name"],
-        picture=updated_user.get("picture"),
-        google_id=updated_user.get("google_id"),
-        role=updated_user.get("role", "user"),
-        created_at=updated_user["created_at"],
-        last_login=updated_user["last_login"]
-    )
+    return UserInDB(**user_output(updated_user))
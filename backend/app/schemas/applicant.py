@@ -101,6 +101,23 @@ class ApplicantResponse(BaseModel):
         from_attributes = True
 
 
+class GigSummary(BaseModel):
+    platforms: list[str] = Field(default_factory=list)
+    average_rating: float = 0
+
+
+class ApplicantSummary(BaseModel):
+    """Fields shown on dashboard cards (GET /ingest/applicants?view=summary)"""
+    id: str
+    name: str
+    email: str
+    phone: Optional[str] = None
+    gig_data: Optional[GigSummary] = None
+    credit_score: Optional[float] = None
+    risk_tier: Optional[str] = None
+    created_at: datetime
+
+
 class IngestFinancialRequest(BaseModel):
     applicant_id: str
     data: FinancialData
@@ -114,3 +131,18 @@ class IngestSocialRequest(BaseModel):
 class IngestGigRequest(BaseModel):
     applicant_id: str
     data: GigData
+
+
+class BulkIngestError(BaseModel):
+    line: int
+    error: str
+
+
+class BulkIngestResponse(BaseModel):
+    total_rows: int
+    inserted: int
+    duplicates: int
+    invalid: int
+    duplicate_lines: list[int]
+    errors: list[BulkIngestError]
+    truncated: bool = False  # More problem rows than reported
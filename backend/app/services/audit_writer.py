@@ -0,0 +1,272 @@
+"""
+Audit Writer
+
+Prediction records are audit data: the client's response does not depend
+on them, so routes hand them to an in-process buffer instead of waiting for
+an insert. A background task flushes the buffer to `predictions` with
+insert_many (ordered=False) when it reaches `audit_flush_batch_size`
+documents or every `audit_flush_interval_ms`, using the configured write
+concern. Each batch is converted to the compact storage format on the way
+(app/services/prediction_storage.py).
+
+Delivery is at-least-once across graceful restarts:
+- every document gets its ObjectId when it is buffered, so the route can
+  return prediction_id right away and a retried insert of the same
+  document fails with a duplicate key, which counts as written
+- a batch that fails is put back at the front of the buffer and retried;
+  only documents the server rejects outright (validation) are dropped,
+  counted and logged
+- shutdown (lifespan hook) drains the buffer; anything MongoDB would not
+  take by then is spilled to `audit_spill_dir` and replayed on next start
+"""
+
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from bson import ObjectId, json_util
+from pymongo.errors import BulkWriteError
+from pymongo.write_concern import WriteConcern
+
+from app.config import settings
+from app.db import get_database
+from app.services.prediction_storage import compact_predictions
+from app.utils.events import wait_event
+
+DUPLICATE_KEY_ERROR = 11000
+
+# Spill files are named {collection}-spill-{pid}-{ns}.ndjson
+SPILL_SUFFIX = ".ndjson"
+
+
+def parse_write_concern(w: str, journal: bool) -> WriteConcern:
+    """WriteConcern from settings ("majority", a tag set name, or a node count)"""
+    return WriteConcern(w=int(w) if w.isdigit() else w, j=journal or None)
+
+
+class AuditWriter:
+    """Buffers documents for one collection and writes them in batches"""
+
+    def __init__(
+        self,
+        collection: str,
+        batch_size: int,
+        flush_interval_ms: float,
+        max_buffer: int,
+        write_concern: WriteConcern,
+        spill_dir: str,
+        drain_timeout: float,
+        prepare: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None
+    ):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_buffer = max_buffer
+        self.write_concern = write_concern
+        self.spill_dir = Path(spill_dir)
+        self.drain_timeout = drain_timeout
+        # Called with each batch before it is inserted; must be safe to repeat
+        self.prepare = prepare
+        self._buffer: List[Dict[str, Any]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flushed: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+
+        # Counters for this process
+        self.enqueued = 0
+        self.written = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.batches = 0
+        self.failures = 0
+        self.replayed = 0
+        self.spilled = 0
+        self._total_flush = 0.0
+        self._max_flush = 0.0
+
+    async def start(self):
+        """Replay spilled documents and start the flush task (idempotent)"""
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._flushed = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._load_spill()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        if self._buffer:
+            self._wakeup.set()
+
+    async def stop(self):
+        """Stop the flush task, drain the buffer and spill what is left"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+        try:
+            await asyncio.wait_for(self.flush(), timeout=self.drain_timeout)
+        except Exception as e:
+            print(f"✗ Audit drain incomplete: {e}")
+        if self._buffer:
+            self._spill()
+
+    async def record(self, doc: Dict[str, Any]) -> str:
+        """Buffer one document; returns its (pre-assigned) ID"""
+        return (await self.record_many([doc]))[0]
+
+    async def record_many(self, docs: List[Dict[str, Any]]) -> List[str]:
+        """
+        Buffer documents for the next flush
+
+        Args:
+            docs: Documents to insert; `_id` is assigned here
+
+        Returns:
+            The documents' IDs as strings, in order
+        """
+        if self._task is None:
+            # Writer not running (scripts, tests): write through
+            for doc in docs:
+                doc.setdefault("_id", ObjectId())
+            self._buffer.extend(docs)
+            await self.flush()
+            return [str(doc["_id"]) for doc in docs]
+
+        # Bounded memory: wait for a flush while MongoDB is behind
+        while len(self._buffer) >= self.max_buffer:
+            self._flushed.clear()
+            self._wakeup.set()
+            await self._flushed.wait()
+
+        for doc in docs:
+            doc.setdefault("_id", ObjectId())
+        self._buffer.extend(docs)
+        self.enqueued += len(docs)
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+        return [str(doc["_id"]) for doc in docs]
+
+    async def flush(self):
+        """Write everything buffered; raises if a batch cannot be written"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            while self._buffer:
+                batch = self._buffer[:self.batch_size]
+                del self._buffer[:self.batch_size]
+                try:
+                    await self._write(batch)
+                except BaseException:
+                    # Keep order and retry later (cancellation included)
+                    self._buffer[0:0] = batch
+                    raise
+                finally:
+                    if self._flushed is not None:
+                        self._flushed.set()
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        """insert_many one batch; raises only if it has to be written again"""
+        db = get_database()
+        collection = db[self.collection].with_options(write_concern=self.write_concern)
+        started = time.monotonic()
+        try:
+            if self.prepare is not None:
+                await self.prepare(batch)
+            await collection.insert_many(batch, ordered=False)
+            self.written += len(batch)
+        except BulkWriteError as e:
+            if e.details.get("writeConcernErrors"):
+                # Written but not acknowledged as configured: write again
+                raise
+            self.written += e.details.get("nInserted", 0)
+            for error in e.details.get("writeErrors", []):
+                if error.get("code") == DUPLICATE_KEY_ERROR:
+                    # Already written by an earlier attempt
+                    self.duplicates += 1
+                else:
+                    # The server refuses this document; retrying cannot help
+                    self.rejected += 1
+                    print(f"✗ Audit document {batch[error['index']].get('_id')} rejected: {error.get('errmsg')}")
+        finally:
+            elapsed = time.monotonic() - started
+            self.batches += 1
+            self._total_flush += elapsed
+            self._max_flush = max(self._max_flush, elapsed)
+
+    async def _run(self):
+        while True:
+            await wait_event(self._wakeup, timeout=self.flush_interval)
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                print(f"✗ Audit flush failed, retrying: {e}")
+                await asyncio.sleep(self.flush_interval)
+
+    def _spill(self):
+        """Write the unflushed buffer to a spill file for the next start"""
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        path = self.spill_dir / f"{self.collection}-spill-{os.getpid()}-{time.time_ns()}{SPILL_SUFFIX}"
+        with open(path, "w") as f:
+            for doc in self._buffer:
+                f.write(json_util.dumps(doc, json_options=json_util.CANONICAL_JSON_OPTIONS) + "\n")
+        self.spilled += len(self._buffer)
+        print(f"✗ Audit: {len(self._buffer)} unwritten documents spilled to {path}")
+        self._buffer = []
+
+    def _load_spill(self):
+        """Take over spill files from earlier runs (one process per file)"""
+        if not self.spill_dir.is_dir():
+            return
+        for path in sorted(self.spill_dir.glob(f"{self.collection}-spill-*{SPILL_SUFFIX}")):
+            claimed = path.with_suffix(f".replaying-{os.getpid()}")
+            try:
+                # Atomic: when workers start together only one gets the file
+                os.rename(path, claimed)
+            except FileNotFoundError:
+                continue
+            with open(claimed) as f:
+                docs = [json_util.loads(line) for line in f if line.strip()]
+            self._buffer.extend(docs)
+            self.replayed += len(docs)
+            # Safe to remove: stop() spills again whatever is still unwritten
+            claimed.unlink()
+            print(f"✓ Audit: replaying {len(docs)} documents from {path.name}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Buffer depth and write counters"""
+        return {
+            "running": self._task is not None,
+            "buffered": len(self._buffer),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "failures": self.failures,
+            "replayed": self.replayed,
+            "spilled": self.spilled,
+            "avg_flush_ms": round(self._total_flush / self.batches * 1000, 3) if self.batches else 0.0,
+            "max_flush_ms": round(self._max_flush * 1000, 3),
+            "write_concern": self.write_concern.document,
+        }
+
+
+# Shared prediction audit writer (singleton pattern)
+audit_writer = AuditWriter(
+    collection="predictions",
+    batch_size=settings.audit_flush_batch_size,
+    flush_interval_ms=settings.audit_flush_interval_ms,
+    max_buffer=settings.audit_max_buffer,
+    write_concern=parse_write_concern(settings.audit_write_concern_w, settings.audit_write_concern_j),
+    spill_dir=settings.audit_spill_dir,
+    drain_timeout=settings.audit_drain_timeout_seconds,
+    prepare=compact_predictions
+)
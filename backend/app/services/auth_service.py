@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 from app.db import get_database
 from app.utils.security import create_access_token
+from app.services.user_cache import invalidate_user
 from app.schemas.user import UserCreate
 from typing import Dict, Optional
 
@@ -62,6 +63,7 @@ async def get_or_create_user(google_user_info: Dict) -> Dict:
     
     # Ensure _id is string
     user["_id"] = str(user["_id"])
+    invalidate_user(user["_id"])
     
     return user
 
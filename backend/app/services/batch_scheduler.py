@@ -0,0 +1,125 @@
+"""
+Inference Batch Scheduler
+
+Coalesces concurrent single-applicant scoring requests into one matrix
+prediction. Requests arriving within `window_ms` of the first queued
+request (or until `max_batch_size` is reached) are scored together on the
+inference executor, and each awaiting coroutine receives its own result.
+
+Per-request latency is bounded by the window plus one batch inference.
+"""
+
+import asyncio
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.services.inference_executor import inference_executor, InferenceSaturatedError
+from app.services.ml_stub import predict_from_features
+
+
+class InferenceBatcher:
+    """Dynamic micro-batching for predict_from_features"""
+
+    def __init__(self, window_ms: float, max_batch_size: int):
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        # Metrics
+        self._batch_sizes: Counter = Counter()
+        self._batches = 0
+        self._requests = 0
+        self._total_delay = 0.0
+        self._max_delay = 0.0
+
+    async def submit(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue one applicant for scoring and wait for its prediction
+
+        Args:
+            features: The applicant's feature record (app/services/feature_store.py)
+
+        Returns:
+            Prediction dict for this applicant
+        """
+        if self.window <= 0 or self.max_batch_size <= 1:
+            self._record([time.perf_counter()])
+            return (await inference_executor.run(predict_from_features, [features]))[0]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((features, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Dispatch everything queued so far as one batch"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            self._record([queued_at for _, _, queued_at in batch])
+            asyncio.get_running_loop().create_task(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[Dict[str, Any], asyncio.Future, float]]):
+        """Score a batch and fan the results back out to the waiters"""
+        records = [features for features, _, _ in batch]
+        try:
+            results = await inference_executor.run(predict_from_features, records)
+        except InferenceSaturatedError as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except Exception as e:
+            if len(batch) > 1:
+                # Isolate bad rows so one malformed applicant doesn't fail the batch
+                await asyncio.gather(*(self._run([item]) for item in batch))
+            elif not batch[0][1].done():
+                batch[0][1].set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _record(self, queued_at: List[float]):
+        """Update batch size and queueing delay metrics"""
+        now = time.perf_counter()
+        self._batches += 1
+        self._requests += len(queued_at)
+        self._batch_sizes[len(queued_at)] += 1
+        for t in queued_at:
+            delay = now - t
+            self._total_delay += delay
+            self._max_delay = max(self._max_delay, delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """Realized batch sizes and batching delay"""
+        return {
+            "window_ms": self.window * 1000,
+            "max_batch_size": self.max_batch_size,
+            "batches": self._batches,
+            "requests": self._requests,
+            "avg_batch_size": round(self._requests / self._batches, 3) if self._batches else 0.0,
+            "batch_size_histogram": {str(size): count for size, count in sorted(self._batch_sizes.items())},
+            "avg_batching_delay_ms": round(self._total_delay / self._requests * 1000, 3) if self._requests else 0.0,
+            "max_batching_delay_ms": round(self._max_delay * 1000, 3),
+        }
+
+
+# Shared scheduler used by /predict/score (singleton pattern)
+inference_batcher = InferenceBatcher(
+    window_ms=settings.inference_batch_window_ms,
+    max_batch_size=settings.inference_max_batch_size
+)
@@ -0,0 +1,246 @@
+"""
+Bulk Applicant Ingestion
+
+Parses an NDJSON or CSV request body as it streams in, validates each row
+against ApplicantCreate and writes valid rows with insert_many
+(ordered=False) in fixed-size chunks. Duplicates are not pre-queried: the
+unique (user_id, email) index rejects them and the write errors are mapped
+back to line numbers. If startup could not create that index (existing
+duplicates, see app/db.py), each chunk is checked against the collection
+and the emails already seen in the upload before it is inserted.
+
+CSV columns use dotted names for nested fields, e.g.
+    name,email,phone,financial_data.monthly_income,gig_data.platforms
+List fields (gig_data.platforms) are separated with ";". Empty cells are
+treated as missing. Each record must be on a single line.
+"""
+
+import csv
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+
+from app.config import settings
+from app.db import get_database, unique_index_missing
+from app.services.feature_store import compute_features, model_input
+from app.schemas.applicant import ApplicantCreate
+
+DUPLICATE_KEY_ERROR = 11000
+
+# Fields of the unique applicants index that identifies a duplicate
+APPLICANT_KEY = ("user_id", "email")
+
+LIST_COLUMNS = {"gig_data.platforms"}
+
+
+def build_applicant_doc(applicant: ApplicantCreate, user_id: str, now: datetime) -> Dict[str, Any]:
+    """MongoDB document for a new applicant, with its feature record"""
+    doc = {
+        "user_id": user_id,
+        "name": applicant.name,
+        "email": applicant.email,
+        "phone": applicant.phone,
+        "financial_data": applicant.financial_data.dict() if applicant.financial_data else None,
+        "social_data": applicant.social_data.dict() if applicant.social_data else None,
+        "gig_data": applicant.gig_data.dict() if applicant.gig_data else None,
+        "credit_score": None,
+        "risk_tier": None,
+        "created_at": now,
+        "updated_at": now
+    }
+    doc["features"] = compute_features(model_input(doc))
+    return doc
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """Split a byte stream into (line number, raw line) pairs, 1-based"""
+    buffer = b""
+    line_no = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, line
+    if buffer:
+        yield line_no + 1, buffer
+
+
+def csv_row_to_dict(header: List[str], values: List[str]) -> Dict[str, Any]:
+    """Nest dotted CSV columns into the ApplicantCreate shape"""
+    if len(values) != len(header):
+        raise ValueError(f"Expected {len(header)} columns, got {len(values)}")
+    row: Dict[str, Any] = {}
+    for column, value in zip(header, values):
+        value = value.strip()
+        if value == "":
+            continue
+        target = row
+        *parents, field = column.split(".")
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[field] = [item.strip() for item in value.split(";") if item.strip()] if column in LIST_COLUMNS else value
+    return row
+
+
+async def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Yield (line number, parsed row) pairs
+
+    A row that cannot be parsed is yielded as the exception instead of a dict.
+    """
+    header: Optional[List[str]] = None
+    async for line_no, raw in iter_lines(chunks):
+        if not raw.strip():
+            continue
+        try:
+            line = raw.decode("utf-8").rstrip("\r")
+            if line_no == 1:
+                line = line.lstrip("\ufeff")
+            if fmt == "ndjson":
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("Each line must be a JSON object")
+            else:
+                values = next(csv.reader([line]))
+                if header is None:
+                    header = [column.strip() for column in values]
+                    continue
+                record = csv_row_to_dict(header, values)
+        except ValueError as e:
+            record = e
+        yield line_no, record
+
+
+def format_validation_error(error: ValidationError) -> str:
+    """Compact one-line summary of a pydantic validation error"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+class BulkIngestResult:
+    """Running totals for one bulk upload"""
+
+    def __init__(self, max_errors: int):
+        self.max_errors = max_errors
+        self.total_rows = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.duplicate_lines: List[int] = []
+        self.errors: List[Dict[str, Any]] = []
+        self.truncated = False
+
+    def add_invalid(self, line: int, error: str):
+        self.invalid += 1
+        self._add_error(line, error)
+
+    def add_duplicate(self, line: int):
+        self.duplicates += 1
+        if len(self.duplicate_lines) < self.max_errors:
+            self.duplicate_lines.append(line)
+        else:
+            self.truncated = True
+
+    def _add_error(self, line: int, error: str):
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "error": error})
+        else:
+            self.truncated = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total_rows": self.total_rows,
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "duplicate_lines": self.duplicate_lines,
+            "errors": self.errors,
+            "truncated": self.truncated,
+        }
+
+
+async def _drop_existing(docs: List[Dict[str, Any]], lines: List[int], result: BulkIngestResult):
+    """Without the unique index: report and drop rows whose email is taken"""
+    db = get_database()
+    user_id = docs[0]["user_id"]
+    taken = {
+        doc["email"]
+        async for doc in db.applicants.find(
+            {"user_id": user_id, "email": {"$in": [doc["email"] for doc in docs]}},
+            {"email": 1}
+        )
+    }
+    kept_docs, kept_lines = [], []
+    for doc, line in zip(docs, lines):
+        if doc["email"] in taken:
+            result.add_duplicate(line)
+        else:
+            # Later rows in this chunk with the same email are duplicates
+            taken.add(doc["email"])
+            kept_docs.append(doc)
+            kept_lines.append(line)
+    return kept_docs, kept_lines
+
+
+async def _flush(docs: List[Dict[str, Any]], lines: List[int], result: BulkIngestResult):
+    """insert_many one chunk; map duplicate-key errors back to line numbers"""
+    if docs and unique_index_missing("applicants", APPLICANT_KEY):
+        docs, lines = await _drop_existing(docs, lines, result)
+    if not docs:
+        return
+    db = get_database()
+    try:
+        inserted = await db.applicants.insert_many(docs, ordered=False)
+        result.inserted += len(inserted.inserted_ids)
+    except BulkWriteError as e:
+        result.inserted += e.details.get("nInserted", 0)
+        for write_error in e.details.get("writeErrors", []):
+            line = lines[write_error["index"]]
+            if write_error.get("code") == DUPLICATE_KEY_ERROR:
+                result.add_duplicate(line)
+            else:
+                result.add_invalid(line, write_error.get("errmsg", "Write failed"))
+
+
+async def ingest_applicants(chunks: AsyncIterator[bytes], fmt: str, user_id: str) -> Dict[str, Any]:
+    """
+    Stream, validate and insert applicants
+
+    Args:
+        chunks: Request body byte stream
+        fmt: "ndjson" or "csv"
+        user_id: Owner of the new applicants
+
+    Returns:
+        Summary with inserted/duplicate/invalid counts and line numbers
+    """
+    result = BulkIngestResult(max_errors=settings.ingest_bulk_max_errors)
+    chunk_size = settings.ingest_bulk_chunk_size
+    docs: List[Dict[str, Any]] = []
+    lines: List[int] = []
+
+    async for line_no, record in iter_records(chunks, fmt):
+        result.total_rows += 1
+        if isinstance(record, Exception):
+            result.add_invalid(line_no, str(record))
+            continue
+        try:
+            applicant = ApplicantCreate(**record)
+        except ValidationError as e:
+            result.add_invalid(line_no, format_validation_error(e))
+            continue
+
+        docs.append(build_applicant_doc(applicant, user_id, datetime.utcnow()))
+        lines.append(line_no)
+        if len(docs) >= chunk_size:
+            await _flush(docs, lines, result)
+            docs, lines = [], []
+
+    await _flush(docs, lines, result)
+    return result.to_dict()
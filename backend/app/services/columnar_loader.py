@@ -0,0 +1,233 @@
+"""
+Columnar Applicant Loader
+
+Bulk analytics and scoring over many applicants spend most of their time
+building objects: the driver decodes every document into nested dicts,
+then a Python loop picks a few numbers back out of them. This loader reads
+`applicants` with find_raw_batches (a projection limited to the numeric
+fields asked for) and scans each raw BSON batch directly into preallocated
+NumPy columns - no per-row dicts, lists or ObjectIds.
+
+    columns = await load_applicant_columns({"user_id": user_id})
+    X = columns.feature_matrix()        # same as feature_matrix(compute_features(...))
+
+Fields are dotted paths ("financial_data.savings", "credit_score"), at
+most one level deep. For each field there is a float64 column and a
+validity mask (False where the field is missing, null or not a number);
+for each section read there is a mask that is False where the whole
+section is missing. `_id`s are kept as raw 12-byte rows; call object_ids()
+only when the IDs are needed as ObjectIds.
+"""
+
+import struct
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+
+from app.config import settings
+from app.db import get_database
+from app.services.feature_store import FEATURE_SPEC
+
+# The fields the model reads, in FEATURE_NAMES order
+FEATURE_FIELDS = [f"{section}.{field}" for section, field, _, _ in FEATURE_SPEC]
+
+_INT32 = struct.Struct("<i")
+_INT64 = struct.Struct("<q")
+_DOUBLE = struct.Struct("<d")
+
+# BSON element types
+_T_DOUBLE, _T_DOCUMENT, _T_OBJECT_ID = 0x01, 0x03, 0x07
+_T_INT32, _T_INT64, _T_DECIMAL128 = 0x10, 0x12, 0x13
+
+# Marks the _id element in the scan targets
+_ID = object()
+
+# Value sizes of the fixed-size types (double, undefined, ObjectId, bool,
+# datetime, null, int32, timestamp, int64, decimal128, min key, max key)
+_FIXED_SIZES = {
+    0x01: 8, 0x06: 0, 0x07: 12, 0x08: 1, 0x09: 8, 0x0A: 0,
+    0x10: 4, 0x11: 8, 0x12: 8, 0x13: 16, 0x7F: 0, 0xFF: 0,
+}
+
+
+def _value_size(data: bytes, etype: int, pos: int) -> int:
+    """Size of the element value starting at pos"""
+    size = _FIXED_SIZES.get(etype)
+    if size is not None:
+        return size
+    if etype in (0x02, 0x0D, 0x0E):     # string, JavaScript, symbol
+        return 4 + _INT32.unpack_from(data, pos)[0]
+    if etype in (0x03, 0x04, 0x0F):     # document, array, code with scope
+        return _INT32.unpack_from(data, pos)[0]
+    if etype == 0x05:                   # binary: length, subtype, bytes
+        return 5 + _INT32.unpack_from(data, pos)[0]
+    if etype == 0x0B:                   # regex: two cstrings
+        end = data.index(b"\x00", data.index(b"\x00", pos) + 1)
+        return end + 1 - pos
+    if etype == 0x0C:                   # DBPointer: string, ObjectId
+        return 16 + _INT32.unpack_from(data, pos)[0]
+    raise ValueError(f"Unsupported BSON element type 0x{etype:02x}")
+
+
+class ApplicantColumns:
+    """Numeric applicant fields as NumPy columns"""
+
+    def __init__(self, fields: List[str], capacity: int):
+        self.fields = list(fields)
+        self.count = 0
+        self._capacity = max(capacity, 1)
+        self.values: Dict[str, np.ndarray] = {}
+        self.valid: Dict[str, np.ndarray] = {}
+        self.sections: Dict[str, np.ndarray] = {}
+        self._ids = bytearray(12 * self._capacity)
+
+        # Element name -> column field (leaf), or (section, {name -> field})
+        self._targets: Dict[bytes, Any] = {b"_id": _ID}
+        for path in self.fields:
+            parts = path.split(".")
+            if len(parts) > 2:
+                raise ValueError(f"Field paths are at most one level deep: {path}")
+            self.values[path] = np.zeros(self._capacity, dtype=np.float64)
+            self.valid[path] = np.zeros(self._capacity, dtype=bool)
+            if len(parts) == 1:
+                self._targets[parts[0].encode()] = path
+            else:
+                self.sections.setdefault(parts[0], np.zeros(self._capacity, dtype=bool))
+                section = self._targets.setdefault(parts[0].encode(), (parts[0], {}))
+                section[1][parts[1].encode()] = path
+
+    def projection(self) -> Dict[str, int]:
+        """Server-side projection returning only the columns' fields (and _id)"""
+        return {path: 1 for path in self.fields}
+
+    def _grow(self, needed: int):
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        for columns in (self.values, self.valid, self.sections):
+            for name, column in columns.items():
+                grown = np.zeros(capacity, dtype=column.dtype)
+                grown[:self.count] = column[:self.count]
+                columns[name] = grown
+        self._ids.extend(bytes(12 * (capacity - self._capacity)))
+        self._capacity = capacity
+
+    def add_batch(self, data: bytes):
+        """
+        Append the documents of one raw BSON batch
+
+        Args:
+            data: Concatenated BSON documents, as yielded by find_raw_batches
+        """
+        end = len(data)
+        pos = 0
+        while pos < end:
+            doc_size = _INT32.unpack_from(data, pos)[0]
+            if self.count == self._capacity:
+                self._grow(self.count + 1)
+            self._scan(data, pos + 4, pos + doc_size - 1, self._targets, self.count)
+            self.count += 1
+            pos += doc_size
+
+    def _scan(self, data: bytes, pos: int, end: int, targets: Dict[bytes, Any], row: int):
+        """Read the wanted elements of one (sub)document into `row`"""
+        values, valid = self.values, self.valid
+        while pos < end:
+            etype = data[pos]
+            name_end = data.index(b"\x00", pos + 1)
+            target = targets.get(data[pos + 1:name_end])
+            pos = name_end + 1
+
+            if target is None:
+                pos += _value_size(data, etype, pos)
+            elif target is _ID:
+                if etype == _T_OBJECT_ID:
+                    self._ids[12 * row:12 * row + 12] = data[pos:pos + 12]
+                    pos += 12
+                else:
+                    pos += _value_size(data, etype, pos)
+            elif isinstance(target, tuple):
+                if etype == _T_DOCUMENT:
+                    size = _INT32.unpack_from(data, pos)[0]
+                    section, fields = target
+                    self.sections[section][row] = True
+                    self._scan(data, pos + 4, pos + size - 1, fields, row)
+                    pos += size
+                else:
+                    pos += _value_size(data, etype, pos)
+            elif etype == _T_DOUBLE:
+                values[target][row] = _DOUBLE.unpack_from(data, pos)[0]
+                valid[target][row] = True
+                pos += 8
+            elif etype == _T_INT32:
+                values[target][row] = _INT32.unpack_from(data, pos)[0]
+                valid[target][row] = True
+                pos += 4
+            elif etype == _T_INT64:
+                values[target][row] = _INT64.unpack_from(data, pos)[0]
+                valid[target][row] = True
+                pos += 8
+            elif etype == _T_DECIMAL128:
+                values[target][row] = float(Decimal128.from_bid(data[pos:pos + 16]).to_decimal())
+                valid[target][row] = True
+                pos += 16
+            else:
+                # null, strings and other non-numeric values stay invalid
+                pos += _value_size(data, etype, pos)
+
+    def object_ids(self) -> List[ObjectId]:
+        """Applicant IDs as ObjectIds, in row order"""
+        raw = bytes(self._ids[:12 * self.count])
+        return [ObjectId(raw[i:i + 12]) for i in range(0, len(raw), 12)]
+
+    def finish(self) -> "ApplicantColumns":
+        """Trim the columns to the rows read"""
+        for columns in (self.values, self.valid, self.sections):
+            for name in columns:
+                columns[name] = columns[name][:self.count]
+        del self._ids[12 * self.count:]
+        self._capacity = max(self.count, 1)
+        return self
+
+    def feature_matrix(self) -> np.ndarray:
+        """
+        Model input matrix, identical to feature_matrix over compute_features
+
+        Requires the columns to include FEATURE_FIELDS. Missing values take
+        the pipeline's defaults.
+        """
+        matrix = np.empty((self.count, len(FEATURE_SPEC)), dtype=np.float64)
+        for index, (section, field, default, scale) in enumerate(FEATURE_SPEC):
+            path = f"{section}.{field}"
+            values = self.values[path][:self.count]
+            matrix[:, index] = np.where(self.valid[path][:self.count], values, default) / scale
+        return matrix
+
+
+async def load_applicant_columns(
+    query: Optional[Dict[str, Any]] = None,
+    fields: Optional[List[str]] = None,
+    batch_size: Optional[int] = None
+) -> ApplicantColumns:
+    """
+    Load numeric applicant fields into NumPy columns
+
+    Args:
+        query: Applicant filter (default: all applicants)
+        fields: Dotted field paths to load (default: FEATURE_FIELDS)
+        batch_size: Documents per raw batch (default: COLUMNAR_BATCH_SIZE)
+
+    Returns:
+        ApplicantColumns, rows in cursor order (object_ids() gives each row's applicant)
+    """
+    db = get_database()
+    query = query or {}
+    capacity = await db.applicants.count_documents(query)
+    columns = ApplicantColumns(fields or FEATURE_FIELDS, capacity)
+    cursor = db.applicants.find_raw_batches(query, columns.projection())
+    cursor = cursor.batch_size(batch_size or settings.columnar_batch_size)
+    async for batch in cursor:
+        columns.add_batch(batch)
+    return columns.finish()
@@ -0,0 +1,96 @@
+"""
+Explainability Engine
+
+Wraps a loaded CatBoost model with everything needed to explain its
+predictions:
+- global feature importances and model metadata, computed once per model
+- per-applicant SHAP contributions, computed in one vectorized call per batch
+
+Compiled (NumPy) models carry precompiled per-leaf SHAP tables (see
+app/services/tree_compiler.py), so their explainer gives the same
+per-applicant contributions without the CatBoost runtime.
+"""
+
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.config import settings
+
+
+def _normalize(raw) -> List[float]:
+    """Scale importances to sum to 1"""
+    raw = np.asarray(raw, dtype=np.float64)
+    total = raw.sum()
+    return (raw / total if total > 0 else np.full(len(raw), 1 / len(raw))).tolist()
+
+
+class ModelExplainer:
+    """Cached global explanations plus batched SHAP for one loaded model"""
+
+    def __init__(self, model, feature_names: List[str]):
+        self.model = model
+        self.feature_names = feature_names
+
+        # Global importances never change for a loaded model, so compute once
+        self.global_importances = _normalize(model.get_feature_importance())
+
+        params = model.get_all_params()
+        self.metadata: Dict[str, Any] = {
+            "tree_count": model.tree_count_,
+            "model_features": list(model.feature_names_),
+            "feature_names": feature_names,
+            "depth": params.get("depth"),
+            "learning_rate": params.get("learning_rate"),
+            "loss_function": params.get("loss_function"),
+        }
+
+    def explain_batch(self, feature_matrix: np.ndarray) -> np.ndarray:
+        """
+        Compute per-row SHAP contributions for a feature matrix
+
+        Args:
+            feature_matrix: Array of shape (n, n_features)
+
+        Returns:
+            Array of shape (n, n_features); each row sums (with the expected
+            value) to that row's raw model prediction
+        """
+        from catboost import Pool
+
+        shap_values = self.model.get_feature_importance(
+            data=Pool(feature_matrix),
+            type="ShapValues",
+            thread_count=settings.catboost_thread_count
+        )
+        # Last column is the expected value (bias), shared by all rows
+        return np.asarray(shap_values)[:, :-1]
+
+    def describe(self) -> Dict[str, Any]:
+        """Model metadata and global importances for display"""
+        return {
+            **self.metadata,
+            "global_importances": [
+                {"feature": name, "importance": importance}
+                for name, importance in zip(self.feature_names, self.global_importances)
+            ],
+        }
+
+
+class CompiledModelExplainer(ModelExplainer):
+    """Explainer for a CompiledModel: SHAP from its compiled leaf tables"""
+
+    def __init__(self, model, feature_names: List[str]):
+        self.model = model
+        self.feature_names = feature_names
+        self.global_importances = _normalize(model.feature_importances)
+        self.metadata = {
+            **model.metadata,
+            "model_features": list(model.feature_names),
+            "feature_names": feature_names,
+            "backend": "numpy",
+        }
+
+    def explain_batch(self, feature_matrix: np.ndarray) -> np.ndarray:
+        """Per-row SHAP contributions, matching ModelExplainer.explain_batch"""
+        return self.model.shap_values(feature_matrix)
@@ -0,0 +1,121 @@
+"""
+Feature Store
+
+Model features are computed once, when applicant data is written, and
+stored on the applicant as a versioned feature record:
+
+    "features": {
+        "version": FEATURE_PIPELINE_VERSION,
+        "vector": [...],      # normalized model input, FEATURE_NAMES order
+        "values": [...],      # raw values, shown in feature importances
+        "defaulted": [...],   # input fields that were missing (default used)
+        "computed_at": datetime
+    }
+
+Scoring reads `vector` directly. Bump FEATURE_PIPELINE_VERSION whenever
+FEATURE_SPEC (or what the model expects) changes: records with another
+version - or older than the applicant's data, e.g. written before this
+store existed - are recomputed the next time the applicant is scored and
+saved back (lazy recompute).
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from app.db import get_database
+
+FEATURE_PIPELINE_VERSION = 1
+
+# (section, field, default when missing, normalization divisor), in the
+# order of FEATURE_NAMES (app/services/model_registry.py)
+FEATURE_SPEC = [
+    ("financial_data", "monthly_income", 30000, 100000),
+    ("financial_data", "monthly_expenses", 20000, 100000),
+    ("financial_data", "savings", 10000, 50000),
+]
+
+
+def model_input(applicant: Dict[str, Any]) -> Dict[str, Any]:
+    """The applicant data sections the feature pipeline reads"""
+    return {
+        "financial_data": applicant.get("financial_data", {}),
+        "social_data": applicant.get("social_data", {}),
+        "gig_data": applicant.get("gig_data", {})
+    }
+
+
+def compute_features(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Feature record for applicant data
+
+    Args:
+        data: Applicant data with financial_data, social_data, gig_data
+
+    Returns:
+        Versioned feature record (see module docstring)
+    """
+    values: List[float] = []
+    vector: List[float] = []
+    defaulted: List[str] = []
+    for section, field, default, scale in FEATURE_SPEC:
+        raw = (data.get(section) or {}).get(field)
+        if raw is None:
+            defaulted.append(f"{section}.{field}")
+            raw = default
+        value = float(raw)
+        values.append(value)
+        vector.append(value / scale)
+    return {
+        "version": FEATURE_PIPELINE_VERSION,
+        "vector": vector,
+        "values": values,
+        "defaulted": defaulted,
+        "computed_at": datetime.utcnow(),
+    }
+
+
+def is_current(record: Optional[Dict[str, Any]], updated_at: Optional[datetime] = None) -> bool:
+    """True if a stored feature record was built by this pipeline version from the current data"""
+    if not record or record.get("version") != FEATURE_PIPELINE_VERSION:
+        return False
+    return updated_at is None or record["computed_at"] >= updated_at
+
+
+def feature_record(applicant: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+    """
+    Stored feature record, or a freshly computed one if missing or stale
+
+    Returns:
+        (record, recomputed) - save recomputed records with save_feature_records
+    """
+    record = applicant.get("features")
+    if is_current(record, applicant.get("updated_at")):
+        return record, False
+    return compute_features(model_input(applicant)), True
+
+
+async def save_feature_records(records: List[Tuple[Dict[str, Any], Dict[str, Any]]]):
+    """
+    Store lazily recomputed feature records
+
+    A record is only written if the applicant's data has not changed
+    since it was read (the ingest route that changed it stores its own).
+
+    Args:
+        records: (applicant document as read, feature record) pairs
+    """
+    if not records:
+        return
+    db = get_database()
+    await db.applicants.bulk_write(
+        [
+            UpdateOne(
+                {"_id": applicant["_id"], "updated_at": applicant.get("updated_at")},
+                {"$set": {"features": record}}
+            )
+            for applicant, record in records
+        ],
+        ordered=False
+    )
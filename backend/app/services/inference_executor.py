@@ -0,0 +1,129 @@
+"""
+Inference Executor
+
+Runs CPU-bound model inference on a dedicated thread pool so it never
+blocks the asyncio event loop. CatBoost releases the GIL inside predict,
+so a thread pool gives real parallelism without duplicating the model
+in every worker process.
+
+Admission is bounded: once `max_workers + max_queue` calls are pending,
+new calls are rejected with InferenceSaturatedError so the API can shed
+load (503) instead of queueing requests indefinitely.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.config import settings
+
+
+class InferenceSaturatedError(Exception):
+    """Raised when the inference queue is full"""
+
+
+class InferenceExecutor:
+    """Bounded thread pool for model inference with queue metrics"""
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        # Pending = queued + running; only touched from the event loop
+        self._pending = 0
+
+        # Updated from worker threads under _lock
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._total_run = 0.0
+
+    def start(self):
+        """Create the worker pool (idempotent)"""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="inference"
+            )
+
+    def shutdown(self):
+        """Wait for in-flight inference and release the worker threads"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run fn(*args) on the inference pool and await the result
+
+        Raises:
+            InferenceSaturatedError: if the queue is already full
+        """
+        if self._pending >= self.max_workers + self.max_queue:
+            with self._lock:
+                self._rejected += 1
+            raise InferenceSaturatedError(
+                f"Inference queue full ({self._pending} pending)"
+            )
+
+        self.start()
+        submitted_at = time.perf_counter()
+
+        def task():
+            started_at = time.perf_counter()
+            wait = started_at - submitted_at
+            with self._lock:
+                self._running += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            ok = False
+            try:
+                result = fn(*args)
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._total_run += time.perf_counter() - started_at
+                    if ok:
+                        self._completed += 1
+                    else:
+                        self._failed += 1
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, task)
+        finally:
+            self._pending -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth, wait time and throughput counters"""
+        with self._lock:
+            finished = self._completed + self._failed
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queue_depth": max(self._pending - self._running, 0),
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._total_wait / finished * 1000, 3) if finished else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 3),
+                "avg_run_ms": round(self._total_run / finished * 1000, 3) if finished else 0.0,
+            }
+
+
+# Shared executor used by all routers (singleton pattern)
+inference_executor = InferenceExecutor(
+    max_workers=settings.inference_workers,
+    max_queue=settings.inference_max_queue
+)
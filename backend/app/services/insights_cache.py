@@ -0,0 +1,265 @@
+"""
+Insights Cache
+
+Gemini insights are content-addressed: the key is a hash of the
+canonicalized applicant data, the prompt version and the model name, so an
+identical request never pays for a second upstream call.
+
+Tiers:
+- in-memory TTL LRU (per process)
+- MongoDB `insights_cache` collection with a TTL index (shared)
+
+Concurrent identical requests are coalesced (single-flight): the first one
+calls Gemini, the rest await its result. If the first request is cancelled
+(client gone), the waiters are not: one of them takes over the call.
+Streams take part too: a stream that misses leads like any other request,
+and a stream that finds one in flight replays its result as sections.
+"""
+
+import asyncio
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.config import settings
+from app.db import get_database
+from app.services.insights_service import (
+    GEMINI_MODEL,
+    PROMPT_VERSION,
+    get_borrower_insights,
+    stream_borrower_insights,
+)
+from app.utils.cache import TTLCache
+
+
+def insights_cache_key(applicant_data: Dict[str, Any]) -> str:
+    """Stable hash of applicant data + prompt version + model"""
+    canonical = json.dumps(
+        {"data": applicant_data, "prompt_version": PROMPT_VERSION, "model": GEMINI_MODEL},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class InsightsCache:
+    """Two-tier insights cache with single-flight deduplication"""
+
+    def __init__(self, maxsize: int, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._memory = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.shared_hits = 0
+        self.coalesced = 0
+        self.upstream_calls = 0
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Return cached insights or compute them once
+
+        Returns:
+            (insights, status) where status is "hit", "coalesced" or "miss"
+        """
+        while True:
+            insights = self._memory.get(key)
+            if insights is not None:
+                return insights, "hit"
+
+            # Someone is already asking Gemini for exactly this
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            insights = await asyncio.shield(inflight)
+            if insights is not None:
+                self.coalesced += 1
+                return insights, "coalesced"
+            # The leader was cancelled: take over (or follow whoever did)
+
+        future = self._lead(key)
+        try:
+            insights = await self._get_shared(key)
+            status = "hit"
+            if insights is None:
+                self.upstream_calls += 1
+                insights = await compute()
+                status = "miss"
+                if "error" not in insights:
+                    await self._set(key, insights)
+            else:
+                self._memory.set(key, insights)
+            future.set_result(insights)
+            return insights, status
+        except asyncio.CancelledError:
+            self._abandon(future)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._release(key, future)
+
+    def _lead(self, key: str) -> asyncio.Future:
+        """Register this request as the one computing `key`"""
+        future = asyncio.get_running_loop().create_future()
+        # Avoid "exception was never retrieved" when nobody else is waiting
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        return future
+
+    def _abandon(self, future: asyncio.Future):
+        """Leader cancelled: wake the waiters with None so one of them takes over"""
+        if not future.done():
+            future.set_result(None)
+
+    def _release(self, key: str, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    async def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached insights from either tier, without computing"""
+        insights = self._memory.get(key)
+        if insights is None:
+            insights = await self._get_shared(key)
+            if insights is not None:
+                self._memory.set(key, insights)
+        return insights
+
+    async def stream(
+        self,
+        key: str,
+        produce: Callable[[], AsyncIterator[Tuple[str, Any]]]
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Stream cached insights, or produce them once
+
+        Yields:
+            ("cache", "hit" | "coalesced" | "miss") first, then section and
+            complete events; on a miss, the events of produce() as they arrive
+        """
+        while True:
+            insights = self._memory.get(key)
+            if insights is not None:
+                async for event in self._replay("hit", insights):
+                    yield event
+                return
+
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            insights = await asyncio.shield(inflight)
+            if insights is not None:
+                self.coalesced += 1
+                async for event in self._replay("coalesced", insights):
+                    yield event
+                return
+
+        future = self._lead(key)
+        try:
+            insights = await self._get_shared(key)
+            if insights is not None:
+                self._memory.set(key, insights)
+                future.set_result(insights)
+                async for event in self._replay("hit", insights):
+                    yield event
+                return
+
+            yield "cache", "miss"
+            self.upstream_calls += 1
+            async for event, data in produce():
+                if event == "complete":
+                    if "error" not in data:
+                        await self._set(key, data)
+                    future.set_result(data)
+                yield event, data
+            # Ended without a report: let a waiter try
+            self._abandon(future)
+        except (asyncio.CancelledError, GeneratorExit):
+            # Client disconnected mid-stream
+            self._abandon(future)
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            raise
+        finally:
+            self._release(key, future)
+
+    @staticmethod
+    async def _replay(status: str, insights: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+        """A finished report as stream events"""
+        yield "cache", status
+        for name, data in insights.items():
+            yield "section", {"name": name, "data": data}
+        yield "complete", insights
+
+    async def _get_shared(self, key: str):
+        db = get_database()
+        doc = await db.insights_cache.find_one({
+            "_id": key,
+            "created_at": {"$gt": datetime.utcnow() - timedelta(seconds=self.ttl_seconds)}
+        })
+        if doc is None:
+            return None
+        self.shared_hits += 1
+        return doc["insights"]
+
+    async def _set(self, key: str, insights: Dict[str, Any]):
+        """Store in both tiers (parse failures are never cached)"""
+        self._memory.set(key, insights)
+        db = get_database()
+        await db.insights_cache.replace_one(
+            {"_id": key},
+            {
+                "insights": insights,
+                "prompt_version": PROMPT_VERSION,
+                "model": GEMINI_MODEL,
+                "created_at": datetime.utcnow()
+            },
+            upsert=True
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._memory.stats(),
+            "shared_hits": self.shared_hits,
+            "coalesced": self.coalesced,
+            "upstream_calls": self.upstream_calls,
+            "inflight": len(self._inflight),
+        }
+
+
+# Shared cache (singleton pattern)
+insights_cache = InsightsCache(
+    maxsize=settings.insights_cache_size,
+    ttl_seconds=settings.insights_cache_ttl_seconds
+)
+
+
+async def get_borrower_insights_cached(applicant_data: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+    """
+    Insights for an applicant, served from cache when the data is unchanged
+
+    Returns:
+        (insights, cache status: "hit", "coalesced" or "miss")
+    """
+    key = insights_cache_key(applicant_data)
+    return await insights_cache.get_or_compute(key, lambda: get_borrower_insights(applicant_data))
+
+
+async def stream_borrower_insights_cached(applicant_data: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Stream insights section by section, replaying cached reports instantly
+
+    Yields:
+        ("cache", "hit" | "coalesced" | "miss") first, then the events of
+        stream_borrower_insights; a completed stream is cached
+    """
+    key = insights_cache_key(applicant_data)
+    async for event in insights_cache.stream(key, lambda: stream_borrower_insights(applicant_data)):
+        yield event
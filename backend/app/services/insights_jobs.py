@@ -0,0 +1,279 @@
+"""
+Insights Job Queue
+
+Runs Gemini insights outside the HTTP request. A POST stores the job in
+the `insights_jobs` collection and returns its ID; a small pool of
+in-process workers claims queued jobs and processes them under the Gemini
+token bucket, so bursts queue up instead of timing out.
+
+Jobs survive restarts: a job is claimed with a lease, and a job whose
+lease expired (worker died mid-call) is claimed again. Failed attempts are
+retried with backoff up to `insights_job_max_attempts`.
+
+Job states: queued -> running -> done | failed
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app.config import settings
+from app.db import get_database
+from app.services.insights_cache import insights_cache, insights_cache_key
+from app.services.insights_service import gemini_client, get_borrower_insights
+from app.utils.events import wait_event
+
+FINISHED_STATES = ("done", "failed")
+
+# Retry delay doubles per failed attempt: 5s, 10s, 20s ... capped at 60s
+RETRY_BACKOFF_SECONDS = 5
+RETRY_BACKOFF_MAX_SECONDS = 60
+
+
+class InsightsJobQueue:
+    """Mongo-backed job queue with in-process workers"""
+
+    def __init__(self, workers: int, max_attempts: int, lease_seconds: int, poll_interval: float):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._waiters: Dict[str, asyncio.Event] = {}
+        self._waiting: Dict[str, int] = {}  # Long-polls per job ID, to drop unused waiters
+
+        # Counters for jobs processed by this process
+        self.processed = 0
+        self.failed = 0
+        self.retried = 0
+        self._waits = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._total_processing = 0.0
+        self._max_processing = 0.0
+
+    def start(self):
+        """Start the worker tasks (idempotent)"""
+        if self._tasks or self.workers <= 0:
+            return
+        self._wakeup = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Cancel the workers; their running jobs are put back in the queue"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, applicant_data: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+        """
+        Queue an insights job
+
+        Args:
+            applicant_data: Applicant payload for the prompt
+            user_id: Owner; only they can read the job back
+
+        Returns:
+            The stored job document (already done if the report is cached)
+        """
+        db = get_database()
+        key = insights_cache_key(applicant_data)
+        now = datetime.utcnow()
+        job = {
+            "user_id": user_id,
+            "status": "queued",
+            "applicant_data": applicant_data,
+            "cache_key": key,
+            "attempts": 0,
+            "created_at": now,
+            "available_at": now,
+        }
+
+        cached = await insights_cache.lookup(key)
+        if cached is not None:
+            job.update({"status": "done", "result": cached, "cache": "hit", "finished_at": now})
+
+        result = await db.insights_jobs.insert_one(job)
+        job["_id"] = result.inserted_id
+        if job["status"] == "queued" and self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def get(self, job_id: ObjectId, user_id: str) -> Optional[Dict[str, Any]]:
+        """The job, or None if it does not exist or belongs to another user"""
+        db = get_database()
+        return await db.insights_jobs.find_one({"_id": job_id, "user_id": user_id})
+
+    async def wait(self, job_id: ObjectId, user_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Long-poll: return the job once finished, or as-is after `timeout`
+
+        Jobs finished by this process wake the waiter immediately; jobs
+        finished by another process are seen on the next poll.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        key = str(job_id)
+        self._waiting[key] = self._waiting.get(key, 0) + 1
+        try:
+            while True:
+                job = await self.get(job_id, user_id)
+                remaining = deadline - loop.time()
+                if job is None or job["status"] in FINISHED_STATES or remaining <= 0:
+                    return job
+                event = self._waiters.setdefault(key, asyncio.Event())
+                await wait_event(event, timeout=min(self.poll_interval, remaining))
+        finally:
+            # The last long-poll on a job drops its waiter, which _notify
+            # never pops when another process finished the job
+            self._waiting[key] -= 1
+            if not self._waiting[key]:
+                del self._waiting[key]
+                self._waiters.pop(key, None)
+
+    def _notify(self, job_id: ObjectId):
+        event = self._waiters.pop(str(job_id), None)
+        if event is not None:
+            event.set()
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest runnable job (queued, or lease expired)"""
+        db = get_database()
+        now = datetime.utcnow()
+        return await db.insights_jobs.find_one_and_update(
+            {
+                "$or": [
+                    {"status": "queued", "available_at": {"$lte": now}},
+                    {"status": "running", "lease_expires_at": {"$lt": now}},
+                ]
+            },
+            {
+                "$set": {
+                    "status": "running",
+                    "started_at": now,
+                    "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _worker(self):
+        while True:
+            try:
+                # Leave jobs in the queue (visible, durable) until quota allows
+                await gemini_client.rate_limiter.wait_available()
+                job = await self._claim()
+                if job is None:
+                    await wait_event(self._wakeup, timeout=self.poll_interval)
+                    self._wakeup.clear()
+                    continue
+                await self._process(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"✗ Insights worker error: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _process(self, job: Dict[str, Any]):
+        db = get_database()
+        started = time.monotonic()
+        if job["attempts"] == 1:
+            self._record_wait((job["started_at"] - job["created_at"]).total_seconds())
+
+        try:
+            if job["attempts"] > self.max_attempts:
+                raise RuntimeError("Job lease expired too many times")
+            applicant_data = job["applicant_data"]
+            insights, cache_status = await insights_cache.get_or_compute(
+                job["cache_key"], lambda: get_borrower_insights(applicant_data)
+            )
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back rather than waiting for the lease
+            await db.insights_jobs.update_one(
+                {"_id": job["_id"], "status": "running"},
+                {"$set": {"status": "queued", "available_at": datetime.utcnow()},
+                 "$inc": {"attempts": -1}, "$unset": {"lease_expires_at": ""}}
+            )
+            raise
+        except Exception as e:
+            await self._fail(job, f"{type(e).__name__}: {e}")
+            return
+        finally:
+            self._record_processing(time.monotonic() - started)
+
+        await db.insights_jobs.update_one(
+            {"_id": job["_id"]},
+            {"$set": {"status": "done", "result": insights, "cache": cache_status, "finished_at": datetime.utcnow()},
+             "$unset": {"lease_expires_at": "", "error": ""}}
+        )
+        self.processed += 1
+        self._notify(job["_id"])
+
+    async def _fail(self, job: Dict[str, Any], error: str):
+        """Retry with backoff, or mark the job failed after max_attempts"""
+        db = get_database()
+        now = datetime.utcnow()
+        if job["attempts"] >= self.max_attempts:
+            update = {"status": "failed", "error": error, "finished_at": now}
+            self.failed += 1
+        else:
+            backoff = min(RETRY_BACKOFF_MAX_SECONDS, RETRY_BACKOFF_SECONDS * 2 ** (job["attempts"] - 1))
+            update = {"status": "queued", "error": error, "available_at": now + timedelta(seconds=backoff)}
+            self.retried += 1
+        await db.insights_jobs.update_one(
+            {"_id": job["_id"]},
+            {"$set": update, "$unset": {"lease_expires_at": ""}}
+        )
+        if update["status"] == "failed":
+            self._notify(job["_id"])
+
+    def _record_wait(self, seconds: float):
+        self._waits += 1
+        self._total_wait += seconds
+        self._max_wait = max(self._max_wait, seconds)
+
+    def _record_processing(self, seconds: float):
+        self._total_processing += seconds
+        self._max_processing = max(self._max_processing, seconds)
+
+    async def stats(self) -> Dict[str, Any]:
+        """Queue depth (all processes) plus this process's timing counters"""
+        db = get_database()
+        queued = await db.insights_jobs.count_documents({"status": "queued"})
+        running = await db.insights_jobs.count_documents({"status": "running"})
+        oldest = await db.insights_jobs.find_one({"status": "queued"}, sort=[("created_at", 1)])
+        attempts = self.processed + self.failed + self.retried
+        return {
+            "workers": len(self._tasks),
+            "queue_depth": queued,
+            "running": running,
+            "oldest_queued_seconds": (
+                round((datetime.utcnow() - oldest["created_at"]).total_seconds(), 3) if oldest else 0.0
+            ),
+            "processed": self.processed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "avg_wait_ms": round(self._total_wait / self._waits * 1000, 3) if self._waits else 0.0,
+            "max_wait_ms": round(self._max_wait * 1000, 3),
+            "avg_processing_ms": round(self._total_processing / attempts * 1000, 3) if attempts else 0.0,
+            "max_processing_ms": round(self._max_processing * 1000, 3),
+            "rate_limiter": gemini_client.rate_limiter.stats(),
+        }
+
+
+# Shared queue (singleton pattern)
+insights_job_queue = InsightsJobQueue(
+    workers=settings.insights_job_workers,
+    max_attempts=settings.insights_job_max_attempts,
+    lease_seconds=settings.insights_job_lease_seconds,
+    poll_interval=settings.insights_job_poll_interval
+)
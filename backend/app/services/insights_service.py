@@ -1,46 +1,218 @@
+import asyncio
+import json as pyjson
+import random
+import re
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import httpx
 
-import requests
 from app.config import settings
+from app.utils.json_stream import ObjectMemberStream
+from app.utils.rate_limit import TokenBucket
+
+GEMINI_MODEL = "gemini-2.5-flash-lite"
+
+# Bump whenever build_prompt changes so cached insights are not reused
+PROMPT_VERSION = "2"
+
+# Top-level keys of the report, in the order Gemini is asked to emit them
+REPORT_CATEGORIES = [
+    "Financial Health",
+    "Work Performance",
+    "Behavioral Signals",
+    "Identity & Fraud",
+    "Network Insights",
+    "Risk Assessment",
+]
+DASHBOARD_KEY = "dashboard_output"
+
+# Retry on rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class GeminiError(Exception):
+    """Raised when the Gemini API call fails after all retries"""
 
-GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1/models/gemini-2.5-flash-lite:generateContent"
 
-def get_borrower_insights(applicant_data: dict) -> dict:
+class GeminiClient:
     """
-    Calls Gemini API with applicant data and returns structured insights for dashboard.
+    Shared async client for the Gemini API
+
+    One pooled httpx.AsyncClient (keep-alive connections) for the whole
+    process, with connect/read/total timeouts, jittered exponential backoff
+    on 429/5xx, a semaphore capping concurrent upstream calls and a token
+    bucket keeping every attempt (retries included) within the quota.
+
+    The bucket lives in this process, so each of the WEB_CONCURRENCY workers
+    gets an equal share of the deployment's quota and burst.
     """
-    GEMINI_API_KEY = settings.gemini_api_key
-    if not GEMINI_API_KEY:
-        raise ValueError("GEMINI_API_KEY not set in environment.")
-    # Compose prompt for Gemini
-    prompt = f"""
-    Given the following applicant data, generate a detailed Borrower Intelligence Report organized into these 6 categories: Financial Health, Work Performance, Behavioral Signals, Identity & Fraud, Network Insights, Risk Assessment. For each, provide the same metrics and format as the sample dashboard. Also provide a final dashboard output with recommendation, reasoning, suggested terms, confidence, and top 5 factors influencing decision.
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        workers = max(settings.web_concurrency, 1)
+        self.rate_limiter = TokenBucket(
+            rate_per_second=settings.gemini_rate_per_minute / 60 / workers,
+            capacity=max(settings.gemini_rate_burst // workers, 1)
+        )
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(
+                    connect=settings.gemini_connect_timeout,
+                    read=settings.gemini_read_timeout,
+                    write=settings.gemini_connect_timeout,
+                    pool=settings.gemini_total_timeout
+                ),
+                limits=httpx.Limits(
+                    max_connections=settings.gemini_max_connections,
+                    max_keepalive_connections=settings.gemini_max_connections
+                ),
+                headers={"Content-Type": "application/json"}
+            )
+            self._semaphore = asyncio.Semaphore(settings.gemini_max_concurrency)
+        return self._client
+
+    async def aclose(self):
+        """Close pooled connections (called at shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._semaphore = None
+
+    async def generate_content(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        POST a generateContent request with retries and an overall deadline
+
+        Returns:
+            Parsed JSON response from Gemini
+        """
+        client = self._get_client()
+        url = f"{settings.gemini_api_url}/models/{GEMINI_MODEL}:generateContent"
+        params = {"key": settings.gemini_api_key}
+
+        async def call():
+            # Waiting for a concurrency slot counts against the total deadline
+            async with self._semaphore:
+                return await self._post_with_retries(client, url, params, payload)
+
+        try:
+            return await asyncio.wait_for(call(), timeout=settings.gemini_total_timeout)
+        except asyncio.TimeoutError:
+            raise GeminiError(f"Gemini call exceeded {settings.gemini_total_timeout}s")
+
+    async def stream_generate_content(self, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Stream a streamGenerateContent (SSE) request, yielding text as it arrives
+
+        Retries only happen before the first byte; once text has been yielded
+        a failure is raised as GeminiError. The total deadline covers queueing,
+        retries and the whole stream.
+        """
+        client = self._get_client()
+        url = f"{settings.gemini_api_url}/models/{GEMINI_MODEL}:streamGenerateContent"
+        params = {"key": settings.gemini_api_key, "alt": "sse"}
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.gemini_total_timeout
+
+        def remaining() -> float:
+            left = deadline - loop.time()
+            if left <= 0:
+                raise GeminiError(f"Gemini call exceeded {settings.gemini_total_timeout}s")
+            return left
+
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=remaining())
+        except asyncio.TimeoutError:
+            raise GeminiError(f"Gemini call exceeded {settings.gemini_total_timeout}s")
+        try:
+            try:
+                response = await asyncio.wait_for(
+                    self._post_with_retries(client, url, params, payload, stream=True),
+                    timeout=remaining()
+                )
+            except asyncio.TimeoutError:
+                raise GeminiError(f"Gemini call exceeded {settings.gemini_total_timeout}s")
+            try:
+                async for line in response.aiter_lines():
+                    remaining()
+                    if not line.startswith("data:"):
+                        continue
+                    chunk = pyjson.loads(line[5:])
+                    for candidate in chunk.get("candidates", [])[:1]:
+                        for part in candidate.get("content", {}).get("parts", []):
+                            if part.get("text"):
+                                yield part["text"]
+            except httpx.TransportError as e:
+                raise GeminiError(f"Gemini stream interrupted ({type(e).__name__}: {e})")
+            finally:
+                await response.aclose()
+        finally:
+            self._semaphore.release()
+
+    async def _post_with_retries(self, client, url, params, payload, stream: bool = False):
+        """POST with retries; returns parsed JSON, or the open response when streaming"""
+        last_error = None
+        for attempt in range(settings.gemini_max_retries + 1):
+            if attempt:
+                # Full jitter: sleep anywhere in [0, base * 2**attempt], capped
+                backoff = min(settings.gemini_backoff_max, settings.gemini_backoff_base * 2 ** attempt)
+                await asyncio.sleep(random.uniform(0, backoff))
+            await self.rate_limiter.acquire()
+            try:
+                request = client.build_request("POST", url, params=params, json=payload)
+                response = await client.send(request, stream=stream)
+            except httpx.TransportError as e:
+                last_error = f"{type(e).__name__}: {e}"
+                continue
+
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                await response.aclose()
+                last_error = f"HTTP {response.status_code}"
+                continue
+
+            if stream:
+                if response.is_error:
+                    await response.aread()
+                    await response.aclose()
+                response.raise_for_status()
+                return response
+            response.raise_for_status()
+            return response.json()
+
+        raise GeminiError(f"Gemini call failed after {settings.gemini_max_retries + 1} attempts ({last_error})")
+
+
+# Shared client (singleton pattern)
+gemini_client = GeminiClient()
+
+
+def build_prompt(applicant_data: dict) -> str:
+    """Compose the Borrower Intelligence Report prompt for Gemini"""
+    categories = ", ".join(REPORT_CATEGORIES)
+    keys = ", ".join(f'"{key}"' for key in REPORT_CATEGORIES + [DASHBOARD_KEY])
+    return f"""
+    Given the following applicant data, generate a detailed Borrower Intelligence Report organized into these 6 categories: {categories}. For each, provide the same metrics and format as the sample dashboard. Also provide a final dashboard output with recommendation, reasoning, suggested terms, confidence, and top 5 factors influencing decision.
 
     Respond ONLY with a valid JSON object, no markdown, no explanation, no code block, no extra text. The response must be directly parsable as JSON.
+    The top-level keys must be exactly, in this order: {keys}.
 
     Applicant Data: {applicant_data}
     """
-    headers = {"Content-Type": "application/json"}
-    payload = {
-        "contents": [{"parts": [{"text": prompt}]}],
-        "generationConfig": {"temperature": 0.2, "maxOutputTokens": 2048}
-    }
-    response = requests.post(
-        f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
-        headers=headers,
-        json=payload
-    )
-    response.raise_for_status()
-    result = response.json()
-    # Extract the model's reply (handle plain text, markdown, or fallback)
-    import re, json as pyjson
+
+
+def parse_insights(result: dict) -> dict:
+    """Extract the model's reply (handle plain text, markdown, or fallback)"""
     try:
         text = result["candidates"][0]["content"]["parts"][0]["text"]
         # Try to extract JSON from a markdown code block
-        match = re.search(r"```json\\s*(.*?)```", text, re.DOTALL)
+        match = re.search(r"```json\s*(.*?)```", text, re.DOTALL)
         if match:
             return pyjson.loads(match.group(1))
         # Try to extract JSON from any code block
-        match = re.search(r"```[a-zA-Z]*\\s*(.*?)```", text, re.DOTALL)
+        match = re.search(r"```[a-zA-Z]*\s*(.*?)```", text, re.DOTALL)
         if match:
             return pyjson.loads(match.group(1))
         # Try to parse as JSON directly
@@ -56,4 +228,61 @@ def get_borrower_insights(applicant_data: dict) -> dict:
             except Exception:
                 pass
         # Fallback: return the raw text for debugging
-        return {"error": "Failed to parse Gemini response", "raw": result, "raw_text": raw_text}
\ No newline at end of file
+        return {"error": "Failed to parse Gemini response", "raw": result, "raw_text": raw_text}
+
+
+def build_payload(applicant_data: dict) -> dict:
+    """generateContent request body for an applicant"""
+    return {
+        "contents": [{"parts": [{"text": build_prompt(applicant_data)}]}],
+        "generationConfig": {"temperature": 0.2, "maxOutputTokens": 2048}
+    }
+
+
+async def get_borrower_insights(applicant_data: dict) -> dict:
+    """
+    Calls Gemini API with applicant data and returns structured insights for dashboard.
+    """
+    if not settings.gemini_api_key:
+        raise ValueError("GEMINI_API_KEY not set in environment.")
+    result = await gemini_client.generate_content(build_payload(applicant_data))
+    return parse_insights(result)
+
+
+async def stream_borrower_insights(applicant_data: dict) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Stream insights section by section as Gemini produces them
+
+    Yields:
+        ("section", {"name", "data"}) for each completed top-level section,
+        then ("complete", insights) with the whole report, or
+        ("complete", parse-failure dict) if the stream was not valid JSON
+    """
+    if not settings.gemini_api_key:
+        raise ValueError("GEMINI_API_KEY not set in environment.")
+
+    parser = ObjectMemberStream()
+    insights: Dict[str, Any] = {}
+    text = []
+    parse_failed = False
+    async with aclosing(gemini_client.stream_generate_content(build_payload(applicant_data))) as stream:
+        async for chunk in stream:
+            text.append(chunk)
+            if parse_failed:
+                continue
+            try:
+                members = parser.feed(chunk)
+            except ValueError:
+                # Not clean JSON: keep reading, then use the tolerant parser
+                parse_failed = True
+                continue
+            for name, data in members:
+                insights[name] = data
+                yield "section", {"name": name, "data": data}
+
+    if parser.done and not parse_failed:
+        yield "complete", insights
+        return
+    # Stream ended early or was not a bare JSON object
+    result = {"candidates": [{"content": {"parts": [{"text": "".join(text)}]}}]}
+    yield "complete", parse_insights(result)
@@ -2,28 +2,27 @@
 ML Service - CatBoost Model Implementation
 
 This service loads and uses the trained CatBoost model for credit scoring.
+The active model is owned by the model registry (hot reload, rollback).
+
+With MODEL_BACKEND=numpy the model is loaded from its compiled NumPy
+artifact (see scripts/compile_model.py) and catboost is never imported.
 """
 
-import os
-from pathlib import Path
+import logging
 from typing import Dict, Any, List
-from catboost import CatBoostRegressor
 import numpy as np
+from app.config import settings
+from app.services.model_registry import model_registry, FEATURE_NAMES, LoadedModel
+from app.services.feature_store import compute_features
 
+logger = logging.getLogger(__name__)
 
-# Get the project root directory
-BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
-MODEL_PATH = os.path.join(BASE_DIR, "models", "catboost_model_best.cbm")
 
 # Load the model at module initialization (singleton pattern)
 try:
-    model = CatBoostRegressor()
-    model.load_model(MODEL_PATH)
-    print(f"✓ CatBoost model loaded successfully from {MODEL_PATH}")
-    print(f"  Model features: {model.feature_names_}")
+    model_registry.load()
 except Exception as e:
-    print(f"✗ Error loading CatBoost model: {e}")
-    model = None
+    logger.error("Error loading %s model: %s", settings.model_backend, e)
 
 
 def normalize_features(data: Dict[str, Any]) -> np.ndarray:
@@ -36,27 +35,25 @@ def normalize_features(data: Dict[str, Any]) -> np.ndarray:
     Returns:
         Numpy array of features ready for model prediction
     """
-    financial = data.get("financial_data", {}) or {}
-    social = data.get("social_data", {}) or {}
-    gig = data.get("gig_data", {}) or {}
-    
-    # Extract raw features with defaults
-    monthly_income = float(financial.get("monthly_income", 30000))
-    monthly_expenses = float(financial.get("monthly_expenses", 20000))
-    savings = float(financial.get("savings", 10000))
-    
-    # Avoid division by zero
-    income = max(monthly_income, 1)
-    
-    # Calculate derived features matching your model training
-    # Adjust based on what features your model was trained with
-    features = [
-        monthly_income / 100000,  # Normalize income
-        monthly_expenses / 100000,  # Normalize expenses
-        savings / 50000,  # Normalize savings
-    ]
+    return normalize_features_batch([data])
+
+
+def normalize_features_batch(records: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Build one feature matrix for a batch of applicants
     
-    return np.array(features).reshape(1, -1)
+    Args:
+        records: List of applicant data dicts (same shape as normalize_features)
+        
+    Returns:
+        Numpy array of shape (len(records), n_features)
+    """
+    return feature_matrix([compute_features(data) for data in records])
+
+
+def feature_matrix(features: List[Dict[str, Any]]) -> np.ndarray:
+    """Stack feature records (app/services/feature_store.py) into a model input matrix"""
+    return np.array([record["vector"] for record in features], dtype=np.float64).reshape(len(features), -1)
 
 
 def classify_risk_tier(score: int) -> str:
@@ -81,46 +78,76 @@ def predict_credit_score(data: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Dictionary with score, risk_tier, feature_importances, and confidence
     """
+    return predict_credit_scores([data])[0]
+
+
+def predict_credit_scores(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Predict credit scores for a batch of applicants with a single model call
     
-    if model is None:
-        raise Exception("CatBoost model not loaded. Please check model file path.")
+    Args:
+        records: List of applicant data dicts
+        
+    Returns:
+        List of prediction dicts, in the same order as records
+    """
+    return predict_from_features([compute_features(data) for data in records])
+
+
+def predict_from_features(features: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Predict credit scores from precomputed feature records with a single model call
     
-    # Get feature vector
-    feature_vector = normalize_features(data)
+    Args:
+        features: Feature records (see app/services/feature_store.py)
+        
+    Returns:
+        List of prediction dicts, in the same order as features
+    """
     
-    # Get prediction
-    raw_score = model.predict(feature_vector)[0]
+    # Capture the active model once so a concurrent swap can't mix versions
+    loaded = model_registry.active
+    if loaded is None:
+        raise Exception("CatBoost model not loaded. Please check model file path.")
     
-    # Ensure score is in valid range (300-850 for FICO scale)
-    score = int(np.clip(raw_score, 300, 850))
+    if not features:
+        return []
     
-    # Determine risk tier
-    risk_tier = classify_risk_tier(score)
+    # Stack the stored vectors and run one vectorized prediction
+    matrix = feature_matrix(features)
+    raw_scores = loaded.model.predict(matrix, thread_count=settings.catboost_thread_count)
     
-    # Get feature importances from the model
-    try:
-        feature_importances_values = model.get_feature_importance()
-    except:
-        # If feature importance fails, create uniform distribution
-        feature_importances_values = [33.33, 33.33, 33.34]
+    # Ensure scores are in valid range (300-850 for FICO scale)
+    scores = np.clip(raw_scores, 300, 850).astype(int)
     
-    # Feature names for display (match the model's 3 features)
-    feature_names = ["Normalized Income", "Normalized Expenses", "Normalized Savings"]
+    # Per-applicant SHAP contributions, one vectorized call for the batch
+    contributions = loaded.explainer.explain_batch(matrix)
     
-    # Get actual feature values from input
-    financial = data.get("financial_data", {}) or {}
-    feature_values = [
-        float(financial.get("monthly_income", 30000)),
-        float(financial.get("monthly_expenses", 20000)),
-        float(financial.get("savings", 10000))
+    return [
+        _build_result(int(score), record["values"], row_contributions, loaded)
+        for score, record, row_contributions in zip(scores, features, contributions)
     ]
+
+
+def _build_result(
+    score: int,
+    feature_values: List[float],
+    contributions: np.ndarray,
+    loaded: LoadedModel
+) -> Dict[str, Any]:
+    """Assemble the prediction dict returned to callers"""
+    # Determine risk tier
+    risk_tier = classify_risk_tier(score)
     
-    # Create feature importance list
+    # Create feature importance list; importance is each feature's share
+    # of the total absolute contribution
     feature_importances = []
-    for fname, importance, value in zip(feature_names, feature_importances_values, feature_values):
+    total = float(np.abs(contributions).sum())
+    for fname, contribution, value in zip(FEATURE_NAMES, contributions, feature_values):
         feature_importances.append({
             "feature": fname,
-            "importance": float(importance / 100),  # Normalize to 0-1 range
+            "importance": abs(float(contribution)) / total if total > 0 else 0.0,
+            "contribution": float(contribution),  # Signed effect in score points
             "value": float(value)
         })
     
@@ -134,5 +161,14 @@ def predict_credit_score(data: Dict[str, Any]) -> Dict[str, Any]:
         "score": score,
         "risk_tier": risk_tier,
         "feature_importances": feature_importances,
-        "confidence": round(confidence, 2)
+        "confidence": round(confidence, 2),
+        "model_version": loaded.version
     }
+
+
+def get_model_info() -> Dict[str, Any]:
+    """Model metadata and cached global feature importances"""
+    loaded = model_registry.active
+    if loaded is None:
+        raise Exception("CatBoost model not loaded. Please check model file path.")
+    return {**loaded.describe(), **loaded.explainer.describe()}
@@ -0,0 +1,260 @@
+"""
+Model Registry
+
+Owns the model that serves predictions. Artifacts live in `models/`:
+- `*.cbm` files are loaded with the CatBoost runtime
+- `*.npz` files are compiled models (see scripts/compile_model.py)
+
+Each artifact is identified by a short content hash (its version). Loading
+a model warms it up with a few predictions before it is published, and
+publishing is a single reference swap: requests that already hold the old
+LoadedModel finish on it, new requests see the new one. Recently active
+models are kept warm in memory so rollback is instant.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.services.explainability import ModelExplainer, CompiledModelExplainer
+from app.services.tree_compiler import CompiledModel
+
+logger = logging.getLogger(__name__)
+
+
+# Get the project root directory
+BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
+MODELS_DIR = BASE_DIR / "models"
+
+# Feature names for display (match the model's 3 features)
+FEATURE_NAMES = ["Normalized Income", "Normalized Expenses", "Normalized Savings"]
+
+ARTIFACT_EXTENSIONS = {".cbm": "catboost", ".npz": "numpy"}
+
+
+def artifact_version(path: str) -> str:
+    """Short content hash identifying a model artifact"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def default_artifact() -> str:
+    """Artifact served at startup for the configured backend"""
+    name = "catboost_model_best.npz" if settings.model_backend == "numpy" else "catboost_model_best.cbm"
+    return str(MODELS_DIR / name)
+
+
+class ModelLoadError(Exception):
+    """Raised when an artifact cannot be loaded or fails warm-up"""
+
+
+class LoadedModel:
+    """A loaded, warmed-up model plus its explainer and provenance"""
+
+    def __init__(self, path: str, backend: str, model, explainer, version: str):
+        self.path = path
+        self.backend = backend
+        self.model = model
+        self.explainer = explainer
+        self.version = version
+        self.loaded_at = datetime.utcnow()
+        self._stat = _file_stat(path)
+
+    def describe(self) -> Dict[str, Any]:
+        """Provenance summary for admin endpoints"""
+        return {
+            "version": self.version,
+            "artifact": os.path.basename(self.path),
+            "backend": self.backend,
+            "loaded_at": self.loaded_at,
+        }
+
+
+def _file_stat(path: str):
+    """(mtime, size) used by the file watcher to detect redeploys"""
+    try:
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
+
+def load_artifact(path: str) -> LoadedModel:
+    """
+    Load a model artifact from disk (does not publish it)
+
+    Args:
+        path: Path to a .cbm or .npz artifact
+
+    Returns:
+        LoadedModel ready for warm-up
+    """
+    backend = ARTIFACT_EXTENSIONS.get(Path(path).suffix)
+    if backend is None:
+        raise ModelLoadError(f"Unsupported model artifact: {path}")
+    if not os.path.exists(path):
+        raise ModelLoadError(f"Model file doesn't exist: {path}")
+
+    if backend == "numpy":
+        # Memory-mapped tables are shared by every worker via the page cache
+        model = CompiledModel.load(path, mmap=settings.model_mmap)
+        explainer = CompiledModelExplainer(model, FEATURE_NAMES)
+        # Compiled artifacts carry the version of the .cbm they came from
+        version = model.metadata.get("model_version") or artifact_version(path)
+    else:
+        from catboost import CatBoostRegressor
+
+        model = CatBoostRegressor()
+        model.load_model(path)
+        # Global importances and metadata are computed once per loaded model
+        explainer = ModelExplainer(model, FEATURE_NAMES)
+        version = artifact_version(path)
+
+    return LoadedModel(path, backend, model, explainer, version)
+
+
+def warm_up(loaded: LoadedModel, rows: int = 8):
+    """Run a few predictions and explanations so the first request is not cold"""
+    n_features = len(FEATURE_NAMES)
+    sample = np.tile(np.linspace(0.05, 1.5, rows)[:, np.newaxis], (1, n_features))
+    predictions = np.asarray(loaded.model.predict(sample, thread_count=settings.catboost_thread_count))
+    if predictions.shape != (rows,) or not np.all(np.isfinite(predictions)):
+        raise ModelLoadError(f"Warm-up produced invalid predictions for {loaded.path}")
+    loaded.explainer.explain_batch(sample)
+
+
+class ModelRegistry:
+    """Holds the active model and a short history for rollback"""
+
+    def __init__(self, history_size: int):
+        self.history_size = history_size
+        self._active: Optional[LoadedModel] = None
+        self._history: List[LoadedModel] = []
+        self._lock = threading.Lock()
+        self._watch_task: Optional[asyncio.Task] = None
+
+    @property
+    def active(self) -> Optional[LoadedModel]:
+        """Currently published model; capture once per request"""
+        return self._active
+
+    @property
+    def active_version(self) -> Optional[str]:
+        loaded = self._active
+        return loaded.version if loaded else None
+
+    def load(self, artifact: Optional[str] = None) -> LoadedModel:
+        """
+        Load, warm up and publish an artifact
+
+        Args:
+            artifact: File name inside models/ (defaults to the configured artifact)
+
+        Returns:
+            The newly active LoadedModel
+        """
+        path = self._resolve(artifact)
+        loaded = load_artifact(path)
+        warm_up(loaded)
+        self._publish(loaded)
+        logger.info("Model %s (%s) loaded from %s", loaded.version, loaded.backend, path)
+        return loaded
+
+    def rollback(self) -> LoadedModel:
+        """Re-publish the previously active model"""
+        with self._lock:
+            if not self._history:
+                raise ModelLoadError("No previous model to roll back to")
+            previous = self._history.pop()
+            self._active = previous
+        logger.info("Rolled back to model %s", previous.version)
+        return previous
+
+    def _publish(self, loaded: LoadedModel):
+        """Atomically swap in a new model, keeping the old one for rollback"""
+        with self._lock:
+            if self._active is not None:
+                self._history.append(self._active)
+                del self._history[:-self.history_size]
+            self._active = loaded
+
+    def _resolve(self, artifact: Optional[str]) -> str:
+        """Map an artifact name to a path, refusing anything outside models/"""
+        if artifact is None:
+            return self._active.path if self._active else default_artifact()
+        path = (MODELS_DIR / artifact).resolve()
+        if path.parent != MODELS_DIR.resolve():
+            raise ModelLoadError(f"Artifact must be a file inside {MODELS_DIR}")
+        return str(path)
+
+    def available_artifacts(self) -> List[Dict[str, Any]]:
+        """Model artifacts on disk that can be loaded"""
+        artifacts = []
+        for path in sorted(MODELS_DIR.iterdir()) if MODELS_DIR.exists() else []:
+            if path.suffix in ARTIFACT_EXTENSIONS and path.is_file():
+                stat = path.stat()
+                artifacts.append({
+                    "artifact": path.name,
+                    "backend": ARTIFACT_EXTENSIONS[path.suffix],
+                    "size_bytes": stat.st_size,
+                    "modified_at": datetime.utcfromtimestamp(stat.st_mtime),
+                })
+        return artifacts
+
+    def describe(self) -> Dict[str, Any]:
+        """Active model, rollback history and artifacts on disk"""
+        active = self._active
+        return {
+            "active": active.describe() if active else None,
+            "history": [loaded.describe() for loaded in reversed(self._history)],
+            "available": self.available_artifacts(),
+        }
+
+    async def reload(self, artifact: Optional[str] = None) -> LoadedModel:
+        """Load an artifact off the event loop (file IO and warm-up block)"""
+        return await asyncio.to_thread(self.load, artifact)
+
+    def start_watcher(self, interval_seconds: float):
+        """Reload the active artifact whenever its file changes on disk"""
+        if interval_seconds > 0 and self._watch_task is None:
+            self._watch_task = asyncio.get_running_loop().create_task(self._watch(interval_seconds))
+
+    async def stop_watcher(self):
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+
+    async def _watch(self, interval_seconds: float):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            active = self._active
+            path = active.path if active else default_artifact()
+            stat = _file_stat(path)
+            if stat is None or (active is not None and stat == active._stat):
+                continue
+            try:
+                await self.reload(os.path.basename(path))
+            except Exception as e:
+                logger.error("Model reload from watcher failed: %s", e)
+                # Don't retry the same broken file every tick
+                if active is not None:
+                    active._stat = stat
+
+
+# Shared registry (singleton pattern)
+model_registry = ModelRegistry(history_size=settings.model_history_size)
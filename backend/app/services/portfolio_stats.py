@@ -0,0 +1,269 @@
+"""
+Portfolio Statistics
+
+Each user has one `portfolio_stats` document with applicant totals, tier
+counts, score histogram buckets and the running score sum. Routes keep it
+current with atomic `$inc` updates as applicants are created and scored,
+so GET /stats/portfolio is a single document read however large the
+portfolio is.
+
+recompute_portfolio_stats rebuilds a document from the applicants
+collection (one aggregation) to repair any drift; it also runs lazily the
+first time a user without a stats document asks for stats. Every $inc also
+bumps the document's `generation`, and a rebuild only replaces the
+generation it started from (rerunning the aggregation otherwise), so
+updates made while it runs are not lost.
+
+Score updates must pair each applicant's new score with the exact score it
+replaced; write_scores does that for batch writes.
+"""
+
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from app.db import get_database
+
+logger = logging.getLogger(__name__)
+
+# Aggregations a rebuild runs before leaving the document to concurrent writers
+RECOMPUTE_ATTEMPTS = 5
+
+RISK_TIERS = ["low", "medium", "high", "very_high"]
+
+# (label, lower bound inclusive, upper bound exclusive) on the 300-850 scale
+SCORE_BUCKETS = [
+    ("300-549", None, 550),
+    ("550-649", 550, 650),
+    ("650-749", 650, 750),
+    ("750-850", 750, None),
+]
+
+
+def score_bucket(score: float) -> str:
+    """Histogram bucket label for a score"""
+    for label, low, high in SCORE_BUCKETS:
+        if (low is None or score >= low) and (high is None or score < high):
+            return label
+    return SCORE_BUCKETS[-1][0]
+
+
+def rescore_delta(old_score: Optional[float], old_tier: Optional[str], new_score: float, new_tier: str) -> Counter:
+    """$inc fields for one applicant moving from its old score to a new one"""
+    delta = Counter()
+    if old_score is None:
+        delta["scored"] += 1
+        delta["unscored"] -= 1
+    else:
+        delta["score_sum"] -= old_score
+        delta[f"buckets.{score_bucket(old_score)}"] -= 1
+    if old_tier:
+        delta[f"tiers.{old_tier}"] -= 1
+    delta["score_sum"] += new_score
+    delta[f"buckets.{score_bucket(new_score)}"] += 1
+    delta[f"tiers.{new_tier}"] += 1
+    return delta
+
+
+async def _apply(user_id: str, delta: Counter):
+    increments = {field: value for field, value in delta.items() if value}
+    if not increments:
+        return
+    db = get_database()
+    result = await db.portfolio_stats.update_one(
+        {"_id": user_id},
+        {"$inc": {**increments, "generation": 1}, "$set": {"updated_at": datetime.utcnow()}}
+    )
+    if result.matched_count == 0:
+        # No baseline to increment yet: build it (includes this change)
+        await recompute_portfolio_stats(user_id)
+
+
+async def record_applicants_created(user_id: str, count: int = 1):
+    """Count newly created (unscored) applicants"""
+    await _apply(user_id, Counter({"total": count, "unscored": count}))
+
+
+async def record_rescores(user_id: str, changes: Iterable[Tuple[Optional[float], Optional[str], float, str]]):
+    """
+    Apply score changes in one update
+
+    Args:
+        user_id: Portfolio owner
+        changes: (old_score, old_tier, new_score, new_tier) per applicant
+    """
+    delta = Counter()
+    for change in changes:
+        delta.update(rescore_delta(*change))
+    await _apply(user_id, delta)
+
+
+async def write_scores(
+    applicants: List[Dict[str, Any]],
+    updates: List[Dict[str, Any]]
+) -> List[Optional[Tuple[Optional[float], Optional[str]]]]:
+    """
+    Write new scores to many applicants and return the scores they replaced
+
+    One unordered bulk_write whose updates only match applicants still
+    holding the credit_score/risk_tier they were read with. Rows rescored
+    concurrently since the read (they lack this write's last_prediction_id)
+    are rewritten one by one with find_one_and_update, which returns the
+    score actually replaced.
+
+    Args:
+        applicants: Applicant documents as read (with _id, credit_score, risk_tier)
+        updates: Update document per applicant; must $set last_prediction_id
+
+    Returns:
+        (old_score, old_tier) per applicant, None where the applicant is gone
+    """
+    db = get_database()
+    previous: List[Optional[Tuple[Optional[float], Optional[str]]]] = [
+        (applicant.get("credit_score"), applicant.get("risk_tier")) for applicant in applicants
+    ]
+    if not applicants:
+        return previous
+    result = await db.applicants.bulk_write(
+        [
+            UpdateOne(
+                {
+                    "_id": applicant["_id"],
+                    "credit_score": applicant.get("credit_score"),
+                    "risk_tier": applicant.get("risk_tier")
+                },
+                update
+            )
+            for applicant, update in zip(applicants, updates)
+        ],
+        ordered=False
+    )
+    if result.matched_count == len(applicants):
+        return previous
+
+    prediction_ids = [update["$set"]["last_prediction_id"] for update in updates]
+    written = {
+        doc["_id"]
+        async for doc in db.applicants.find(
+            {"_id": {"$in": [applicant["_id"] for applicant in applicants]},
+             "last_prediction_id": {"$in": prediction_ids}},
+            {"_id": 1}
+        )
+    }
+    for index, (applicant, update) in enumerate(zip(applicants, updates)):
+        if applicant["_id"] in written:
+            continue
+        before = await db.applicants.find_one_and_update(
+            {"_id": applicant["_id"]},
+            update,
+            projection={"credit_score": 1, "risk_tier": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        previous[index] = None if before is None else (before.get("credit_score"), before.get("risk_tier"))
+    return previous
+
+
+async def recompute_portfolio_stats(user_id: str) -> Dict[str, Any]:
+    """
+    Rebuild a user's stats document from the applicants collection
+
+    Reruns the aggregation (up to RECOMPUTE_ATTEMPTS times) while $inc
+    updates keep landing between reading the document and replacing it.
+    """
+    db = get_database()
+    scored = {"$ne": ["$credit_score", None]}
+    group: Dict[str, Any] = {
+        "_id": None,
+        "total": {"$sum": 1},
+        "scored": {"$sum": {"$cond": [scored, 1, 0]}},
+        "score_sum": {"$sum": {"$ifNull": ["$credit_score", 0]}},
+    }
+    for tier in RISK_TIERS:
+        group[f"tier_{tier}"] = {"$sum": {"$cond": [{"$eq": ["$risk_tier", tier]}, 1, 0]}}
+    for i, (label, low, high) in enumerate(SCORE_BUCKETS):
+        conditions: List[Any] = [scored]
+        if low is not None:
+            conditions.append({"$gte": ["$credit_score", low]})
+        if high is not None:
+            conditions.append({"$lt": ["$credit_score", high]})
+        group[f"bucket_{i}"] = {"$sum": {"$cond": [{"$and": conditions}, 1, 0]}}
+
+    for _ in range(RECOMPUTE_ATTEMPTS):
+        current = await db.portfolio_stats.find_one({"_id": user_id}, {"generation": 1})
+        rows = await db.applicants.aggregate([
+            {"$match": {"user_id": user_id}},
+            {"$group": group},
+        ]).to_list(1)
+        row = rows[0] if rows else {}
+
+        now = datetime.utcnow()
+        stats = {
+            "total": row.get("total", 0),
+            "scored": row.get("scored", 0),
+            "unscored": row.get("total", 0) - row.get("scored", 0),
+            "score_sum": row.get("score_sum", 0),
+            "tiers": {tier: row.get(f"tier_{tier}", 0) for tier in RISK_TIERS},
+            "buckets": {label: row.get(f"bucket_{i}", 0) for i, (label, _, _) in enumerate(SCORE_BUCKETS)},
+            "generation": (current or {}).get("generation", 0),
+            "updated_at": now,
+            "recomputed_at": now,
+        }
+        if current is None:
+            try:
+                await db.portfolio_stats.insert_one({"_id": user_id, **stats})
+            except DuplicateKeyError:
+                continue  # Created meanwhile: rebuild against that one
+            return {"_id": user_id, **stats}
+        # Only if no $inc landed while aggregating
+        result = await db.portfolio_stats.replace_one(
+            {"_id": user_id, "generation": current.get("generation")}, stats
+        )
+        if result.matched_count:
+            return {"_id": user_id, **stats}
+
+    logger.warning(
+        "Portfolio stats for %s not rebuilt: updated concurrently %d times", user_id, RECOMPUTE_ATTEMPTS
+    )
+    return await db.portfolio_stats.find_one({"_id": user_id})
+
+
+async def recompute_all_portfolio_stats() -> int:
+    """Rebuild every user's stats document; returns the number of users"""
+    db = get_database()
+    user_ids = await db.applicants.distinct("user_id")
+    for user_id in user_ids:
+        await recompute_portfolio_stats(user_id)
+    # Users whose applicants are all gone
+    await db.portfolio_stats.delete_many({"_id": {"$nin": user_ids}})
+    return len(user_ids)
+
+
+async def get_portfolio_stats(user_id: str) -> Dict[str, Any]:
+    """
+    Portfolio summary for a user, read from the stats document
+
+    Returns:
+        Totals, average score, tier counts and ordered histogram buckets
+    """
+    db = get_database()
+    stats = await db.portfolio_stats.find_one({"_id": user_id})
+    if stats is None:
+        stats = await recompute_portfolio_stats(user_id)
+
+    scored = stats.get("scored", 0)
+    tiers = stats.get("tiers", {})
+    buckets = stats.get("buckets", {})
+    return {
+        "total": stats.get("total", 0),
+        "scored": scored,
+        "unscored": stats.get("unscored", 0),
+        "average_score": round(stats.get("score_sum", 0) / scored, 1) if scored else None,
+        "tiers": {tier: tiers.get(tier, 0) for tier in RISK_TIERS},
+        "buckets": [{"range": label, "count": buckets.get(label, 0)} for label, _, _ in SCORE_BUCKETS],
+        "updated_at": stats.get("updated_at"),
+        "recomputed_at": stats.get("recomputed_at"),
+    }
@@ -0,0 +1,113 @@
+"""
+Prediction Cache
+
+Caches model output keyed by a stable hash of the normalized feature vector
+plus the model version, so re-scoring an applicant whose features have not
+changed skips inference.
+
+Two tiers:
+- an in-process LRU with TTL (always on)
+- an optional Mongo-backed shared tier (`prediction_cache` collection with a
+  TTL index), so workers and restarts share results
+"""
+
+import hashlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from pymongo import ReplaceOne
+
+from app.config import settings
+from app.db import get_database
+from app.utils.cache import TTLCache
+
+
+class PredictionCache:
+    """Two-tier cache of model output by feature-vector hash"""
+
+    def __init__(self, maxsize: int, ttl_seconds: int, shared: bool):
+        self.ttl_seconds = ttl_seconds
+        self.shared = shared
+        self._memory = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+        self.shared_hits = 0
+
+    @staticmethod
+    def key(feature_vector: np.ndarray, model_version: str) -> str:
+        """Stable hash of a feature vector and the model that would score it"""
+        digest = hashlib.sha256()
+        digest.update(model_version.encode())
+        digest.update(np.ascontiguousarray(feature_vector, dtype="<f8").tobytes())
+        return digest.hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached prediction result (memory first, then Mongo)"""
+        result = self._memory.get(key)
+        if result is not None or not self.shared:
+            return result
+
+        db = get_database()
+        doc = await db.prediction_cache.find_one({
+            "_id": key,
+            "expires_at": {"$gt": datetime.utcnow()}
+        })
+        if doc is None:
+            return None
+
+        self.shared_hits += 1
+        self._memory.set(key, doc["result"])
+        return doc["result"]
+
+    async def set(self, key: str, result: Dict[str, Any], model_version: str):
+        """Store a prediction result in every enabled tier"""
+        self._memory.set(key, result)
+        if not self.shared:
+            return
+
+        db = get_database()
+        await db.prediction_cache.replace_one(
+            {"_id": key},
+            {
+                "result": result,
+                "model_version": model_version,
+                "expires_at": datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+            },
+            upsert=True
+        )
+
+    async def set_many(self, entries: List[Tuple[str, Dict[str, Any], str]]):
+        """
+        Store many prediction results: one memory-tier update and one
+        bulk_write of upserts
+
+        Args:
+            entries: (key, result, model_version) per prediction
+        """
+        if not entries:
+            return
+        self._memory.set_many((key, result) for key, result, _ in entries)
+        if not self.shared:
+            return
+
+        expires_at = datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+        db = get_database()
+        await db.prediction_cache.bulk_write([
+            ReplaceOne(
+                {"_id": key},
+                {"result": result, "model_version": model_version, "expires_at": expires_at},
+                upsert=True
+            )
+            for key, result, model_version in entries
+        ], ordered=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Memory tier counters plus shared-tier hits"""
+        return {**self._memory.stats(), "shared": self.shared, "shared_hits": self.shared_hits}
+
+
+# Shared cache used by the prediction routes (singleton pattern)
+prediction_cache = PredictionCache(
+    maxsize=settings.prediction_cache_size,
+    ttl_seconds=settings.prediction_cache_ttl_seconds,
+    shared=settings.prediction_cache_shared
+)
@@ -0,0 +1,137 @@
+"""
+Prediction Storage
+
+Compact format for `predictions` documents. Instead of a full copy of the
+applicant's nested input dicts, each prediction stores:
+- `input_hash`: sha256 of the canonical input JSON; the input itself is
+  stored once in `input_snapshots` (`_id` = hash), so re-scoring an
+  unchanged applicant adds no new copy
+- `features`: the model's feature vector as packed little-endian float32
+  (FEATURE_NAMES order)
+
+The audit writer compacts each batch just before it is inserted
+(compact_predictions); readers call expand_predictions to get `input_data`
+and the feature list back. Documents written in the old format (with
+`input_data`) are left as they are by expand_predictions and converted by
+scripts/compact_predictions.py.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Set
+
+import numpy as np
+from bson import Binary
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.config import settings
+from app.db import get_database
+from app.services.feature_store import compute_features
+from app.utils.cache import TTLCache
+
+DUPLICATE_KEY_ERROR = 11000
+
+FEATURE_DTYPE = np.dtype("<f4")
+
+# Snapshots this process knows are stored; skips the upsert round trip
+# when the same applicant is scored again (singleton pattern)
+known_snapshots = TTLCache(maxsize=settings.input_snapshot_cache_size, ttl_seconds=86400)
+
+
+def input_hash(input_data: Dict[str, Any]) -> str:
+    """Content hash of a model input (key order does not matter)"""
+    canonical = json.dumps(input_data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def pack_features(vector: np.ndarray) -> Binary:
+    """Feature vector as packed little-endian float32 bytes"""
+    return Binary(np.ascontiguousarray(vector, dtype=FEATURE_DTYPE).tobytes())
+
+
+def unpack_features(packed: bytes) -> List[float]:
+    """Inverse of pack_features"""
+    return np.frombuffer(packed, dtype=FEATURE_DTYPE).astype(float).tolist()
+
+
+async def store_snapshots(snapshots: Dict[str, Dict[str, Any]]) -> Set[str]:
+    """
+    Store input snapshots that are not stored yet
+
+    Args:
+        snapshots: Input data by input_hash
+
+    Returns:
+        Hashes of the snapshots that were newly inserted
+    """
+    missing = {key: data for key, data in snapshots.items() if known_snapshots.get(key) is None}
+    if not missing:
+        return set()
+
+    db = get_database()
+    now = datetime.utcnow()
+    keys = list(missing)
+    inserted: Set[str] = set()
+    try:
+        result = await db.input_snapshots.bulk_write(
+            [
+                UpdateOne({"_id": key}, {"$setOnInsert": {"data": missing[key], "created_at": now}}, upsert=True)
+                for key in keys
+            ],
+            ordered=False
+        )
+        inserted = {keys[index] for index in result.upserted_ids}
+    except BulkWriteError as e:
+        # Concurrent upserts of the same snapshot: the other writer stored it
+        if any(error.get("code") != DUPLICATE_KEY_ERROR for error in e.details.get("writeErrors", [])):
+            raise
+        inserted = {keys[upsert["index"]] for upsert in e.details.get("upserted", [])}
+
+    for key in keys:
+        known_snapshots.set(key, True)
+    return inserted
+
+
+async def compact_predictions(docs: List[Dict[str, Any]]):
+    """
+    Convert prediction documents to the compact format in place
+
+    Snapshots are stored before any document is changed, so a batch whose
+    insert fails can be compacted again (documents already converted are
+    skipped).
+    """
+    pending = [doc for doc in docs if "input_data" in doc]
+    if not pending:
+        return
+
+    inputs = [doc["input_data"] for doc in pending]
+    hashes = [input_hash(data) for data in inputs]
+    await store_snapshots(dict(zip(hashes, inputs)))
+
+    for doc, key in zip(pending, hashes):
+        # Routes pass the stored feature vector; derive it for older records
+        vector = doc.get("features")
+        if vector is None:
+            vector = compute_features(doc["input_data"])["vector"]
+        del doc["input_data"]
+        doc["input_hash"] = key
+        doc["features"] = pack_features(vector)
+
+
+async def expand_predictions(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Add `input_data` (from its snapshot) and unpacked `features` to stored predictions"""
+    keys = {doc["input_hash"] for doc in docs if "input_hash" in doc}
+    snapshots: Dict[str, Any] = {}
+    if keys:
+        db = get_database()
+        async for snapshot in db.input_snapshots.find({"_id": {"$in": list(keys)}}):
+            snapshots[snapshot["_id"]] = snapshot["data"]
+
+    for doc in docs:
+        if "input_hash" in doc:
+            doc["input_data"] = snapshots.get(doc["input_hash"])
+        if "features" in doc:
+            doc["features"] = unpack_features(doc["features"])
+    return docs
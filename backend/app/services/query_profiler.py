@@ -0,0 +1,231 @@
+"""
+Query Profiler
+
+Two checks on how MongoDB runs our queries:
+- check_query_plans: runs `explain` on every declared query shape
+  (app/query_shapes.py) and flags collection scans, in-memory sorts of
+  documents (plan SORT stages and pipeline $sort stages the index does not
+  cover) and $group stages that spilled to disk
+- slow_query_report: groups the entries the database profiler wrote to
+  `system.profile` by query shape and ranks them by total time
+
+The profiler is enabled with MONGO_PROFILE_SLOW_MS (see app/db.py) or
+`scripts/slow_query_report.py --enable`.
+"""
+
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.query_shapes import QUERY_SHAPES
+
+# Plan stages that mean a query is not served by an index
+PROBLEM_STAGES = {
+    "COLLSCAN": "collection scan",
+    "SORT": "in-memory sort",
+}
+
+# Stages whose output is grouped rows, not documents: sorting those is
+# expected (small, after the index did its work)
+GROUP_STAGES = {"GROUP", "$group", "$bucket", "$bucketAuto", "$sortByCount", "$count"}
+
+# Fields of a profiled command that describe the query
+QUERY_FIELDS = ("filter", "q", "query", "pipeline", "sort", "updates", "deletes")
+
+
+def plan_stages(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten an explain plan tree into its stages (root first)"""
+    stages = [plan]
+    for child in ("inputStage", "outerStage", "innerStage"):
+        if child in plan:
+            stages.extend(plan_stages(plan[child]))
+    for child in plan.get("inputStages", []):
+        stages.extend(plan_stages(child))
+    return stages
+
+
+def pipeline_stages(explained: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    """(name, stage) for each aggregation stage of an explain, in pipeline order"""
+    return [
+        (next(key for key in stage if key.startswith("$")), stage)
+        for stage in explained.get("stages", [])
+    ]
+
+
+def _spilled(stage: Dict[str, Any], body: Dict[str, Any]) -> bool:
+    return any(
+        item.get("usedDisk") or item.get("spills", 0) > 0
+        for item in (stage, body) if isinstance(item, dict)
+    )
+
+
+def plan_problems(plan: Dict[str, Any], execution: Dict[str, Any], pipeline: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+    """
+    Problems in an explained query
+
+    Args:
+        plan: Winning plan tree
+        execution: executionStages tree (executionStats verbosity), or {}
+        pipeline: Aggregation stages left after the plan, in pipeline order
+    """
+    problems = set()
+    for stage in plan_stages(plan):
+        name = stage.get("stage")
+        if name == "SORT" and any(s.get("stage") in GROUP_STAGES for s in plan_stages(stage)):
+            continue  # Sorts grouped rows (pushed-down $group)
+        if name in PROBLEM_STAGES:
+            problems.add(PROBLEM_STAGES[name])
+    if execution:
+        for stage in plan_stages(execution):
+            if stage.get("stage") == "GROUP" and _spilled(stage, {}):
+                problems.add("$group spilled to disk")
+
+    grouped = False
+    for name, stage in pipeline:
+        if name in GROUP_STAGES:
+            grouped = True
+        if name == "$sort" and not grouped:
+            problems.add("$sort not covered by an index")
+        if name == "$group" and _spilled(stage, stage[name]):
+            problems.add("$group spilled to disk")
+    return sorted(problems)
+
+
+async def explain_shape(db: AsyncIOMotorDatabase, shape: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Explain one query shape (a find, or an aggregation if it has a pipeline)
+
+    Returns:
+        The shape's name, plan and pipeline stages, indexes used and any problems
+    """
+    if shape.get("pipeline"):
+        command = {"aggregate": shape["collection"], "pipeline": shape["pipeline"], "cursor": {}}
+        # $group spills are only reported once the pipeline has run
+        verbosity = "executionStats"
+    else:
+        command = {"find": shape["collection"], "filter": shape["filter"]}
+        if shape.get("sort"):
+            command["sort"] = dict(shape["sort"])
+        if shape.get("limit"):
+            command["limit"] = shape["limit"]
+        verbosity = "queryPlanner"
+
+    explained = await db.command("explain", command, verbosity=verbosity)
+    # Aggregations (and finds on time-series collections, which are views)
+    # explain as pipeline stages, the first holding the query plan
+    pipeline = pipeline_stages(explained)
+    cursor = explained
+    if pipeline and pipeline[0][0] == "$cursor":
+        cursor = pipeline.pop(0)[1]["$cursor"]
+    winning = cursor["queryPlanner"]["winningPlan"]
+    # Slot-based engine (MongoDB 7+) nests the classic plan under queryPlan
+    winning = winning.get("queryPlan", winning)
+    execution = cursor.get("executionStats", {}).get("executionStages", {})
+
+    stages = plan_stages(winning)
+    problems = plan_problems(winning, execution, pipeline)
+    return {
+        "name": shape["name"],
+        "collection": shape["collection"],
+        "used_by": shape.get("used_by"),
+        # Output first, like the plan tree: "$sort <- $group <- FETCH <- IXSCAN"
+        "stages": [name for name, _ in reversed(pipeline)] + [s.get("stage") for s in stages],
+        "indexes": sorted({s["indexName"] for s in stages if "indexName" in s}),
+        "ok": not problems,
+        "problems": problems,
+    }
+
+
+async def check_query_plans(db: AsyncIOMotorDatabase) -> List[Dict[str, Any]]:
+    """Explain every declared query shape"""
+    return [await explain_shape(db, shape) for shape in QUERY_SHAPES]
+
+
+def query_shape(value: Any) -> Any:
+    """Replace literal values with "?" so equal-shaped queries group together"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        # Keep the structure of $or/$and branches and pipelines, not $in values
+        if value and all(isinstance(item, dict) for item in value):
+            return [query_shape(item) for item in value]
+        return ["?"]
+    return "?"
+
+
+def _profile_shape(entry: Dict[str, Any]) -> str:
+    command = entry.get("command", {})
+    parts = {
+        # Sort direction is part of the shape
+        field: command[field] if field == "sort" else query_shape(command[field])
+        for field in QUERY_FIELDS if field in command
+    }
+    return json.dumps(parts, sort_keys=True)
+
+
+async def set_profiling(db: AsyncIOMotorDatabase, slow_ms: int):
+    """Profile operations slower than slow_ms (0 turns profiling off)"""
+    if slow_ms > 0:
+        await db.command("profile", 1, slowms=slow_ms)
+    else:
+        await db.command("profile", 0)
+
+
+async def slow_query_report(db: AsyncIOMotorDatabase, since_minutes: int = 60, top: int = 20) -> Dict[str, Any]:
+    """
+    Summarize slow operations recorded by the profiler
+
+    Args:
+        db: Database whose system.profile to read
+        since_minutes: Only consider operations this recent
+        top: Number of query shapes to return
+
+    Returns:
+        Profiler status and query shapes ranked by total time
+    """
+    status = await db.command("profile", -1)
+    since = datetime.utcnow() - timedelta(minutes=since_minutes)
+
+    groups: Dict[tuple, Dict[str, Any]] = {}
+    async for entry in db["system.profile"].find({"ts": {"$gte": since}}):
+        if entry.get("ns", "").endswith(".system.profile"):
+            continue
+        key = (entry.get("ns"), entry.get("op"), _profile_shape(entry))
+        group = groups.setdefault(key, {
+            "ns": key[0],
+            "op": key[1],
+            "shape": json.loads(key[2]),
+            "count": 0,
+            "total_ms": 0,
+            "max_ms": 0,
+            "docs_examined": 0,
+            "keys_examined": 0,
+            "returned": 0,
+            "plans": set(),
+        })
+        millis = entry.get("millis", 0)
+        group["count"] += 1
+        group["total_ms"] += millis
+        group["max_ms"] = max(group["max_ms"], millis)
+        group["docs_examined"] += entry.get("docsExamined", 0)
+        group["keys_examined"] += entry.get("keysExamined", 0)
+        group["returned"] += entry.get("nreturned", 0)
+        if entry.get("planSummary"):
+            group["plans"].add(entry["planSummary"])
+
+    ranked = sorted(groups.values(), key=lambda group: group["total_ms"], reverse=True)[:top]
+    for group in ranked:
+        group["avg_ms"] = round(group["total_ms"] / group["count"], 3)
+        # Documents read per document returned; >> 1 means a poor index
+        group["examined_per_returned"] = round(group["docs_examined"] / max(group["returned"], 1), 2)
+        group["plans"] = sorted(group["plans"])
+        group["collscan"] = any("COLLSCAN" in plan for plan in group["plans"])
+
+    return {
+        "profiling_level": status.get("was"),
+        "slow_ms": status.get("slowms"),
+        "since": since,
+        "shapes": ranked,
+    }
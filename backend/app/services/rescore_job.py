@@ -0,0 +1,425 @@
+"""
+Portfolio Re-scoring Job
+
+Refreshes stored `credit_score` / `risk_tier` after a model change without
+one /predict/score call per applicant. A job streams applicants in `_id`
+order through a batched cursor, scores each chunk with one vectorized model
+call on the shared inference executor, writes the chunk with one
+bulk_write and records its predictions (and score history) through the
+audit writers.
+
+Jobs live in the `rescore_jobs` collection. After every chunk the job
+stores the last processed `_id` (checkpoint) and extends its lease, so a
+job whose process died can be resumed from where it stopped - by the CLI
+(scripts/rescore_applicants.py) or POST /admin/rescore/{job_id}/resume.
+Throttling waits sleep in slices of at most a third of the lease and renew
+it between slices, so a live job's lease never expires while it waits.
+
+Throttling, so re-scoring does not starve interactive traffic:
+- `max_rate` caps applicants scored per second (0 = unthrottled)
+- before each chunk the job waits while interactive inference calls are
+  queued on the executor (up to `rescore_max_yield_seconds`)
+
+Job states: queued -> running -> done | failed | cancelled
+            running -> paused (shutdown) -> running (resume)
+"""
+
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import CursorNotFound
+
+from app.config import settings
+from app.db import get_database
+from app.services.score_history import record_predictions
+from app.services.inference_executor import inference_executor, InferenceSaturatedError
+from app.services.ml_stub import predict_from_features
+from app.services.feature_store import model_input, feature_record, save_feature_records
+from app.services.model_registry import model_registry
+from app.services.portfolio_stats import (
+    record_rescores, recompute_portfolio_stats, recompute_all_portfolio_stats, write_scores
+)
+
+FINISHED_STATES = ("done", "failed", "cancelled")
+RESUMABLE_STATES = ("queued", "paused", "failed")
+
+# Only what scoring and the stats delta need
+APPLICANT_PROJECTION = {
+    "user_id": 1,
+    "financial_data": 1,
+    "social_data": 1,
+    "gig_data": 1,
+    "credit_score": 1,
+    "risk_tier": 1,
+    "features": 1,
+    "updated_at": 1,
+}
+
+
+def rescore_query(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Applicants a job still has to score"""
+    query: Dict[str, Any] = {}
+    if job.get("last_id") is not None:
+        query["_id"] = {"$gt": job["last_id"]}
+    if job.get("user_id"):
+        query["user_id"] = job["user_id"]
+    if job.get("only_stale"):
+        query["model_version"] = {"$ne": job["model_version"]}
+    return query
+
+
+class RescoreRunner:
+    """Creates, runs and resumes re-scoring jobs"""
+
+    def __init__(self, batch_size: int, max_rate: float, lease_seconds: int, yield_ms: float, max_yield_seconds: float):
+        self.batch_size = batch_size
+        self.max_rate = max_rate
+        self.lease_seconds = lease_seconds
+        self.yield_interval = yield_ms / 1000
+        self.max_yield_seconds = max_yield_seconds
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def create(
+        self,
+        user_id: Optional[str] = None,
+        only_stale: bool = True,
+        batch_size: Optional[int] = None,
+        max_rate: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Store a new queued job
+
+        Args:
+            user_id: Only this user's applicants (default: everyone's)
+            only_stale: Skip applicants already scored by the active model
+            batch_size: Applicants per chunk (default: RESCORE_BATCH_SIZE)
+            max_rate: Applicants per second, 0 = unthrottled (default: RESCORE_MAX_RATE)
+
+        Returns:
+            The job document
+
+        Raises:
+            RuntimeError: if no model is loaded
+        """
+        if model_registry.active_version is None:
+            raise RuntimeError("No model loaded")
+        db = get_database()
+        job = {
+            "status": "queued",
+            "user_id": user_id,
+            "only_stale": only_stale,
+            "batch_size": batch_size or self.batch_size,
+            "max_rate": self.max_rate if max_rate is None else max_rate,
+            "model_version": model_registry.active_version,
+            "last_id": None,
+            "processed": 0,
+            "changed": 0,
+            "runs": 0,
+            "created_at": datetime.utcnow(),
+        }
+        job["total"] = await db.applicants.count_documents(rescore_query(job))
+        result = await db.rescore_jobs.insert_one(job)
+        job["_id"] = result.inserted_id
+        return job
+
+    async def claim(self, job_id: ObjectId) -> Optional[Dict[str, Any]]:
+        """
+        Take a job for this process: queued, paused, failed, or running
+        with an expired lease (its process died). None if not claimable.
+        """
+        db = get_database()
+        now = datetime.utcnow()
+        previous = await db.rescore_jobs.find_one_and_update(
+            {
+                "_id": job_id,
+                "$or": [
+                    {"status": {"$in": list(RESUMABLE_STATES)}},
+                    {"status": "running", "lease_expires_at": {"$lt": now}},
+                ]
+            },
+            {
+                "$set": {
+                    "status": "running",
+                    "run_started_at": now,
+                    "run_processed": 0,
+                    "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                    # Resume with the model that is active now
+                    "model_version": model_registry.active_version,
+                    "updated_at": now,
+                },
+                "$inc": {"runs": 1},
+                "$unset": {"error": "", "finished_at": ""},
+            },
+            return_document=ReturnDocument.BEFORE
+        )
+        if previous is None:
+            return None
+        if previous["status"] == "running":
+            # Died between a chunk's writes and its checkpoint: the stats
+            # delta of that chunk may be missing, so rebuild them at the end
+            await db.rescore_jobs.update_one({"_id": job_id}, {"$set": {"recompute_stats": True}})
+        return await db.rescore_jobs.find_one({"_id": job_id})
+
+    def start(self, job: Dict[str, Any]):
+        """Run a claimed job in the background of this process"""
+        job_id = str(job["_id"])
+        task = asyncio.get_running_loop().create_task(self.run(job))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def stop(self):
+        """Pause jobs running in this process (shutdown); they can be resumed"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def cancel(self, job_id: ObjectId) -> Optional[Dict[str, Any]]:
+        """Stop a job for good; a running job stops after its current chunk"""
+        db = get_database()
+        return await db.rescore_jobs.find_one_and_update(
+            {"_id": job_id, "status": {"$nin": list(FINISHED_STATES)}},
+            {"$set": {"status": "cancelled", "finished_at": datetime.utcnow()},
+             "$unset": {"lease_expires_at": ""}},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def get(self, job_id: ObjectId) -> Optional[Dict[str, Any]]:
+        db = get_database()
+        return await db.rescore_jobs.find_one({"_id": job_id})
+
+    async def list(self, limit: int = 20) -> List[Dict[str, Any]]:
+        db = get_database()
+        return await db.rescore_jobs.find().sort("created_at", -1).limit(limit).to_list(limit)
+
+    async def run(self, job: Dict[str, Any], progress=None) -> Dict[str, Any]:
+        """
+        Score a claimed job to completion, checkpointing after every chunk
+
+        Args:
+            job: Job document returned by claim()
+            progress: Optional callback called with the job after each chunk
+
+        Returns:
+            The final job document
+        """
+        db = get_database()
+        job_id = job["_id"]
+        try:
+            while True:
+                cursor = db.applicants.find(rescore_query(job), APPLICANT_PROJECTION) \
+                    .sort("_id", 1).batch_size(job["batch_size"])
+                chunk: List[Dict[str, Any]] = []
+                try:
+                    async for applicant in cursor:
+                        chunk.append(applicant)
+                        if len(chunk) >= job["batch_size"]:
+                            if not await self._process_chunk(job, chunk):
+                                return await self.get(job_id)
+                            chunk = []
+                            if progress:
+                                progress(job)
+                except CursorNotFound:
+                    # Cursor timed out while throttled: reopen after the checkpoint
+                    continue
+                finally:
+                    await cursor.close()
+                if chunk and not await self._process_chunk(job, chunk):
+                    return await self.get(job_id)
+                break
+
+            if job.get("recompute_stats"):
+                if job.get("user_id"):
+                    await recompute_portfolio_stats(job["user_id"])
+                else:
+                    await recompute_all_portfolio_stats()
+            await db.rescore_jobs.update_one(
+                {"_id": job_id, "status": "running"},
+                {"$set": {"status": "done", "finished_at": datetime.utcnow(), "recompute_stats": False},
+                 "$unset": {"lease_expires_at": ""}}
+            )
+        except asyncio.CancelledError:
+            # Shutting down: leave the job resumable from its checkpoint
+            await db.rescore_jobs.update_one(
+                {"_id": job_id, "status": "running"},
+                {"$set": {"status": "paused", "updated_at": datetime.utcnow()},
+                 "$unset": {"lease_expires_at": ""}}
+            )
+            raise
+        except Exception as e:
+            print(f"✗ Re-score job {job_id} failed: {e}")
+            await db.rescore_jobs.update_one(
+                {"_id": job_id, "status": "running"},
+                {"$set": {"status": "failed", "error": f"{type(e).__name__}: {e}", "finished_at": datetime.utcnow()},
+                 "$unset": {"lease_expires_at": ""}}
+            )
+        return await self.get(job_id)
+
+    async def _process_chunk(self, job: Dict[str, Any], applicants: List[Dict[str, Any]]) -> bool:
+        """Score, write and checkpoint one chunk; False if the job was stopped"""
+        db = get_database()
+        await self._yield_to_interactive(job)
+
+        model_inputs = [model_input(applicant) for applicant in applicants]
+        feature_records = []
+        recomputed = []
+        for applicant in applicants:
+            features, is_recomputed = feature_record(applicant)
+            feature_records.append(features)
+            if is_recomputed:
+                recomputed.append((applicant, features))
+        # Pipeline version bumps are picked up here too
+        await save_feature_records(recomputed)
+        results = await self._score(job, feature_records)
+
+        now = datetime.utcnow()
+        prediction_ids = await record_predictions([
+            {
+                "user_id": applicant["user_id"],
+                "applicant_id": str(applicant["_id"]),
+                "input_data": inputs,
+                "feature_version": features["version"],
+                "features": features["vector"],
+                "defaulted_features": features["defaulted"],
+                "score": result["score"],
+                "risk_tier": result["risk_tier"],
+                "feature_importances": result["feature_importances"],
+                "confidence": result["confidence"],
+                "model_version": result["model_version"],
+                "created_at": now
+            }
+            for applicant, inputs, features, result in zip(applicants, model_inputs, feature_records, results)
+        ])
+        previous = await write_scores(applicants, [
+            {
+                "$set": {
+                    "credit_score": result["score"],
+                    "risk_tier": result["risk_tier"],
+                    "last_scored_at": now,
+                    "last_prediction_id": prediction_id,
+                    "model_version": result["model_version"]
+                }
+            }
+            for result, prediction_id in zip(results, prediction_ids)
+        ])
+
+        changes = defaultdict(list)
+        changed = 0
+        for applicant, old, result in zip(applicants, previous, results):
+            if old is None:
+                continue
+            changes[applicant["user_id"]].append((*old, result["score"], result["risk_tier"]))
+            if old != (result["score"], result["risk_tier"]):
+                changed += 1
+        for user_id, user_changes in changes.items():
+            await record_rescores(user_id, user_changes)
+
+        # Checkpoint; matches nothing if the job was cancelled meanwhile
+        checkpoint_at = datetime.utcnow()
+        elapsed = max((checkpoint_at - job["run_started_at"]).total_seconds(), 1e-6)
+        run_processed = job["run_processed"] + len(applicants)
+        updated = await db.rescore_jobs.find_one_and_update(
+            {"_id": job["_id"], "status": "running"},
+            {
+                "$set": {
+                    "last_id": applicants[-1]["_id"],
+                    "run_processed": run_processed,
+                    "rate": round(run_processed / elapsed, 1),
+                    "lease_expires_at": checkpoint_at + timedelta(seconds=self.lease_seconds),
+                    "updated_at": checkpoint_at,
+                },
+                "$inc": {"processed": len(applicants), "changed": changed},
+            },
+            return_document=ReturnDocument.AFTER
+        )
+        if updated is None:
+            return False
+        job.update(updated)
+
+        await self._pace(job, elapsed)
+        return True
+
+    async def _score(self, job: Dict[str, Any], feature_records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """One vectorized model call; waits (instead of failing) while the executor is saturated"""
+        while True:
+            try:
+                return await inference_executor.run(predict_from_features, feature_records)
+            except InferenceSaturatedError:
+                await self._sleep(job, self.yield_interval or 0.05)
+
+    async def _yield_to_interactive(self, job: Dict[str, Any]):
+        """Wait while interactive inference calls are queued"""
+        if self.yield_interval <= 0:
+            return
+        waited = 0.0
+        while inference_executor.stats()["queue_depth"] > 0 and waited < self.max_yield_seconds:
+            if not await self._sleep(job, self.yield_interval):
+                return
+            waited += self.yield_interval
+
+    async def _pace(self, job: Dict[str, Any], elapsed: float):
+        """Sleep so the run stays at or under max_rate applicants per second"""
+        if job.get("max_rate", 0) > 0:
+            ahead = job["run_processed"] / job["max_rate"] - elapsed
+            if ahead > 0:
+                await self._sleep(job, ahead)
+
+    async def _sleep(self, job: Dict[str, Any], seconds: float) -> bool:
+        """
+        Sleep without letting the job's lease expire
+
+        Sleeps in slices of at most a third of the lease, renewing the lease
+        before a slice once less than two thirds of it is left. False (and
+        no more sleeping) if the job stopped running, e.g. was cancelled.
+        """
+        slice_seconds = self.lease_seconds / 3
+        while seconds > 0:
+            if not await self._renew_lease(job):
+                return False
+            step = min(seconds, slice_seconds)
+            await asyncio.sleep(step)
+            seconds -= step
+        return True
+
+    async def _renew_lease(self, job: Dict[str, Any]) -> bool:
+        """Extend the lease if a third of it has passed; False if the job stopped running"""
+        now = datetime.utcnow()
+        expires_at = job.get("lease_expires_at")
+        if expires_at is not None and expires_at - now > timedelta(seconds=self.lease_seconds * 2 / 3):
+            return True
+        db = get_database()
+        lease_expires_at = now + timedelta(seconds=self.lease_seconds)
+        result = await db.rescore_jobs.update_one(
+            {"_id": job["_id"], "status": "running"},
+            {"$set": {"lease_expires_at": lease_expires_at}}
+        )
+        if result.matched_count == 0:
+            return False
+        job["lease_expires_at"] = lease_expires_at
+        return True
+
+def describe_progress(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Progress fields derived from a job document"""
+    total = job.get("total") or 0
+    processed = job.get("processed", 0)
+    rate = job.get("rate") or 0
+    remaining = max(total - processed, 0)
+    return {
+        "percent": round(min(processed / total, 1.0) * 100, 1) if total else 100.0,
+        "remaining": remaining,
+        "eta_seconds": round(remaining / rate, 1) if rate and job.get("status") == "running" else None,
+    }
+
+
+# Shared runner (singleton pattern)
+rescore_runner = RescoreRunner(
+    batch_size=settings.rescore_batch_size,
+    max_rate=settings.rescore_max_rate,
+    lease_seconds=settings.rescore_lease_seconds,
+    yield_ms=settings.rescore_yield_ms,
+    max_yield_seconds=settings.rescore_max_yield_seconds
+)
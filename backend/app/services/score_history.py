@@ -0,0 +1,146 @@
+"""
+Score History
+
+Every score is also written as a point to `score_history`, a MongoDB
+time-series collection (timeField `ts`, metaField `meta` = applicant_id +
+user_id), so MongoDB buckets each applicant's points together and range
+queries read a few compressed buckets instead of prediction documents.
+
+Points are buffered and written by their own AuditWriter, next to the
+prediction records. get_score_history returns the raw points in a time
+range, or downsamples them server-side with one aggregation (min / avg /
+max / last per hour, day, week or month), so a year of daily history is
+at most 366 small rows.
+
+Time-series collections do not enforce unique `_id`s: a batch retried
+after a lost acknowledgement can add duplicate points, which shifts a
+bucket's count but not its min / max / last.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.db import get_database
+from app.services.audit_writer import AuditWriter, audit_writer, parse_write_concern
+
+INTERVALS = ("raw", "hour", "day", "week", "month")
+
+# Default range when the request gives no start
+DEFAULT_RANGE_DAYS = 365
+
+
+def history_point(prediction: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Time-series point for a prediction document (its _id must be set)
+
+    Predictions written before model versions were recorded have no
+    model_version; their points get null.
+    """
+    return {
+        "ts": prediction["created_at"],
+        "meta": {"applicant_id": prediction["applicant_id"], "user_id": prediction["user_id"]},
+        "score": prediction["score"],
+        "risk_tier": prediction["risk_tier"],
+        "confidence": prediction.get("confidence"),
+        "model_version": prediction.get("model_version"),
+        "prediction_id": str(prediction["_id"]),
+    }
+
+
+async def record_predictions(docs: List[Dict[str, Any]]) -> List[str]:
+    """
+    Buffer prediction records and their score history points
+
+    Returns:
+        The predictions' IDs, in order
+    """
+    prediction_ids = await audit_writer.record_many(docs)
+    await score_history_writer.record_many([history_point(doc) for doc in docs])
+    return prediction_ids
+
+
+async def get_score_history(
+    applicant_id: str,
+    user_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    interval: str = "day",
+    limit: int = 1000
+) -> Dict[str, Any]:
+    """
+    Score history for one applicant
+
+    Args:
+        applicant_id: Applicant whose scores to read
+        user_id: Owner (points of other users' applicants never match)
+        start: Inclusive range start (default: end - 365 days)
+        end: Exclusive range end (default: now)
+        interval: "raw" for every point, or the bucket size to downsample to
+        limit: Maximum points or buckets returned (the most recent ones)
+
+    Returns:
+        The range, interval and points in time order
+    """
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=DEFAULT_RANGE_DAYS)
+    match = {
+        "meta.applicant_id": applicant_id,
+        "meta.user_id": user_id,
+        "ts": {"$gte": start, "$lt": end},
+    }
+    db = get_database()
+
+    if interval == "raw":
+        cursor = db.score_history.find(
+            match, {"_id": 0, "ts": 1, "score": 1, "risk_tier": 1, "confidence": 1, "model_version": 1, "prediction_id": 1}
+        ).sort("ts", -1).limit(limit)
+        points = await cursor.to_list(limit)
+        points.reverse()
+    else:
+        points = await db.score_history.aggregate([
+            {"$match": match},
+            {"$sort": {"ts": 1}},
+            {"$group": {
+                "_id": {"$dateTrunc": {"date": "$ts", "unit": interval}},
+                "min": {"$min": "$score"},
+                "avg": {"$avg": "$score"},
+                "max": {"$max": "$score"},
+                "last": {"$last": "$score"},
+                "risk_tier": {"$last": "$risk_tier"},
+                "count": {"$sum": 1},
+            }},
+            {"$sort": {"_id": -1}},
+            {"$limit": limit},
+            {"$sort": {"_id": 1}},
+            {"$project": {
+                "_id": 0,
+                "ts": "$_id",
+                "min": 1,
+                "avg": {"$round": ["$avg", 1]},
+                "max": 1,
+                "last": 1,
+                "risk_tier": 1,
+                "count": 1,
+            }},
+        ]).to_list(limit)
+
+    return {
+        "applicant_id": applicant_id,
+        "interval": interval,
+        "start": start,
+        "end": end,
+        "points": points,
+    }
+
+
+# Score history points, written next to the prediction records (singleton pattern)
+score_history_writer = AuditWriter(
+    collection="score_history",
+    batch_size=settings.audit_flush_batch_size,
+    flush_interval_ms=settings.audit_flush_interval_ms,
+    max_buffer=settings.audit_max_buffer,
+    write_concern=parse_write_concern(settings.audit_write_concern_w, settings.audit_write_concern_j),
+    spill_dir=settings.audit_spill_dir,
+    drain_timeout=settings.audit_drain_timeout_seconds
+)
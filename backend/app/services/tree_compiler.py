@@ -0,0 +1,360 @@
+"""
+Oblivious Tree Compiler
+
+Exports a trained CatBoost model into compact NumPy arrays and evaluates
+them without the CatBoost runtime.
+
+CatBoost trees are oblivious: every level of a tree uses the same split,
+so a tree of depth D is just D (feature, threshold) pairs plus 2**D leaf
+values. A row's leaf index is built bit by bit:
+
+    leaf = sum((x[feature[d]] > threshold[d]) << d for d in range(D))
+
+Compiling only needs catboost (it reads the model's JSON export); scoring
+a compiled model needs nothing but NumPy, so inference workers can start
+without importing catboost at all.
+
+Per-applicant SHAP contributions are compiled too. For each feature the
+compiler precomputes, per tree and leaf, that feature's path-dependent
+Shapley value (the game CatBoost's ShapValues solves, using the leaf
+weights as covers). Explaining a row is then the same leaf lookup as
+scoring it, once per feature.
+
+Artifacts are uncompressed .npz files, so the arrays can also be
+memory-mapped straight out of the zip: every worker process then shares
+one copy of the tree tables through the OS page cache.
+"""
+
+import json
+import math
+import os
+import struct
+import tempfile
+import zipfile
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+COMPILED_FORMAT_VERSION = 2
+
+
+class CompiledModel:
+    """Vectorized evaluator for a compiled oblivious-tree ensemble"""
+
+    def __init__(
+        self,
+        split_features: np.ndarray,
+        thresholds: np.ndarray,
+        leaf_values: np.ndarray,
+        contribution_tables: np.ndarray,
+        scale: float,
+        bias: float,
+        feature_importances: np.ndarray,
+        feature_names: List[str],
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        self.split_features = split_features  # (trees, depth) int32
+        self.thresholds = thresholds  # (trees, depth) float32
+        self.leaf_values = leaf_values  # (trees, 2**depth) float64
+        self.contribution_tables = contribution_tables  # (features, trees, 2**depth) float64
+        self.scale = float(scale)
+        self.bias = float(bias)
+        self.feature_importances = feature_importances
+        self.feature_names = feature_names
+        self.metadata = metadata or {}
+
+        self.tree_count = split_features.shape[0]
+        self.depth = split_features.shape[1]
+        # Offset of each tree's first leaf in the flattened leaf table
+        self._leaf_offsets = (np.arange(self.tree_count, dtype=np.int64) << self.depth)[np.newaxis, :]
+
+    def predict(self, feature_matrix: np.ndarray, thread_count: Optional[int] = None, chunk_size: int = 512) -> np.ndarray:
+        """
+        Score a batch of rows
+
+        Args:
+            feature_matrix: Array of shape (n, n_features)
+            thread_count: Ignored; accepted for compatibility with CatBoostRegressor.predict
+            chunk_size: Rows evaluated at once (bounds the (rows, trees) index buffer)
+
+        Returns:
+            Array of shape (n,) with raw predictions
+        """
+        # CatBoost compares float32 feature values against float32 borders
+        X = np.asarray(feature_matrix, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        flat_leaves = self.leaf_values.reshape(-1)
+        out = np.empty(X.shape[0], dtype=np.float64)
+
+        for start in range(0, X.shape[0], chunk_size):
+            rows = X[start:start + chunk_size]
+            out[start:start + rows.shape[0]] = flat_leaves[self._leaf_index(rows)].sum(axis=1)
+
+        return self.scale * out + self.bias
+
+    def shap_values(self, feature_matrix: np.ndarray, chunk_size: int = 512) -> np.ndarray:
+        """
+        Per-row SHAP contributions, matching CatBoost's ShapValues
+
+        Args:
+            feature_matrix: Array of shape (n, n_features)
+            chunk_size: Rows evaluated at once
+
+        Returns:
+            Array of shape (n, n_features) in raw prediction units (without
+            the expected value column CatBoost appends)
+        """
+        X = np.asarray(feature_matrix, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        tables = self.contribution_tables.reshape(self.contribution_tables.shape[0], -1)
+        out = np.empty((X.shape[0], tables.shape[0]), dtype=np.float64)
+
+        for start in range(0, X.shape[0], chunk_size):
+            rows = X[start:start + chunk_size]
+            leaf_index = self._leaf_index(rows)
+            for feature, table in enumerate(tables):
+                out[start:start + rows.shape[0], feature] = table[leaf_index].sum(axis=1)
+
+        return self.scale * out
+
+    def _leaf_index(self, rows: np.ndarray) -> np.ndarray:
+        """(rows, trees) indexes into the flattened leaf tables"""
+        leaf_index = np.zeros((rows.shape[0], self.tree_count), dtype=np.int64)
+        for level in range(self.depth):
+            bits = rows[:, self.split_features[:, level]] > self.thresholds[:, level]
+            leaf_index |= bits.astype(np.int64) << level
+        return leaf_index + self._leaf_offsets
+
+    def save(self, path: str):
+        """Write the compiled arrays to an uncompressed .npz artifact"""
+        np.savez(
+            path,
+            format_version=np.array(COMPILED_FORMAT_VERSION),
+            split_features=self.split_features,
+            thresholds=self.thresholds,
+            leaf_values=self.leaf_values,
+            contribution_tables=self.contribution_tables,
+            scale_and_bias=np.array([self.scale, self.bias]),
+            feature_importances=self.feature_importances,
+            feature_names=np.array(self.feature_names),
+            metadata=np.array(json.dumps(self.metadata))
+        )
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = False) -> "CompiledModel":
+        """
+        Load a compiled artifact written by save()
+
+        Args:
+            path: Path to the .npz artifact
+            mmap: Memory-map the tree tables read-only instead of copying
+                them into process memory
+        """
+        data = _mmap_npz(path) if mmap else None
+        with np.load(path) as npz:
+            if data is None:
+                data = {name: npz[name] for name in npz.files}
+            else:
+                # Small arrays (and any compressed member) are copied as usual
+                data = {**{name: npz[name] for name in npz.files if name not in data}, **data}
+
+        version = int(data["format_version"])
+        if version != COMPILED_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported compiled model format version: {version} "
+                "(recompile with scripts/compile_model.py)"
+            )
+        scale, bias = data["scale_and_bias"]
+        return cls(
+            split_features=data["split_features"],
+            thresholds=data["thresholds"],
+            leaf_values=data["leaf_values"],
+            contribution_tables=data["contribution_tables"],
+            scale=scale,
+            bias=bias,
+            feature_importances=data["feature_importances"],
+            feature_names=[str(name) for name in data["feature_names"]],
+            metadata=json.loads(str(data["metadata"]))
+        )
+
+
+MMAP_MEMBERS = ("split_features", "thresholds", "leaf_values", "contribution_tables")
+
+
+def _mmap_npz(path: str) -> Dict[str, np.ndarray]:
+    """
+    Memory-map the large arrays of an uncompressed .npz in place
+
+    np.savez stores members uncompressed, so each .npy payload sits at a
+    fixed offset inside the zip and can be mapped directly.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            name = info.filename[:-len(".npy")]
+            if name not in MMAP_MEMBERS or info.compress_type != zipfile.ZIP_STORED:
+                continue
+
+            # Skip the zip local file header to reach the .npy payload
+            f.seek(info.header_offset)
+            header = f.read(30)
+            name_length, extra_length = struct.unpack("<HH", header[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+
+            npy_version = np.lib.format.read_magic(f)
+            if npy_version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+
+            arrays[name] = np.memmap(
+                path,
+                dtype=dtype,
+                mode="r",
+                offset=f.tell(),
+                shape=shape,
+                order="F" if fortran_order else "C"
+            )
+    return arrays
+
+
+def compile_contribution_tables(
+    split_features: np.ndarray,
+    leaf_values: np.ndarray,
+    leaf_weights: np.ndarray,
+    n_features: int
+) -> np.ndarray:
+    """
+    Per-feature SHAP value of every leaf of every tree
+
+    A row's path-dependent SHAP value for feature i in one tree only depends
+    on which leaf the row reaches, so it can be tabulated per leaf. The
+    tables are exact Shapley values of v(S) = E[tree | features in S known],
+    where unknown splits follow both children weighted by their cover -
+    the game TreeSHAP (and CatBoost's ShapValues) solves. Enumerating the
+    subsets S costs 2**n_features per tree, which is cheap for the
+    model's handful of features.
+
+    Args:
+        split_features: (trees, depth) feature of each level
+        leaf_values: (trees, 2**depth) leaf values
+        leaf_weights: (trees, 2**depth) training rows per leaf (covers)
+        n_features: Number of model features
+
+    Returns:
+        Array of shape (n_features, trees, 2**depth)
+    """
+    trees, depth = split_features.shape
+    leaves = 1 << depth
+
+    # CatBoost walks an oblivious tree from its last split (the leaf
+    # index's high bit) down to its first, so a node at `level` is fixed by
+    # the bits of the levels above it. Cover split of each level's nodes
+    # between their children: (trees, nodes, 2)
+    ratios = []
+    for level in range(depth):
+        parent = leaf_weights.reshape(trees, -1, 2 << level).sum(axis=2)
+        children = leaf_weights.reshape(trees, -1, 2, 1 << level).sum(axis=3)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratio = children / parent[:, :, np.newaxis]
+        ratios.append(np.where(parent[:, :, np.newaxis] > 0, ratio, 0.5))
+
+    def expected(known: int) -> np.ndarray:
+        """(trees, 2**depth) E[tree | leaf's bits on the levels of known features]"""
+        values = leaf_values.astype(np.float64)
+        # Average out unknown levels bottom-up, so each level's cover
+        # ratios still see the bits of the levels above it
+        for level in range(depth):
+            unknown = ((known >> split_features[:, level]) & 1) == 0
+            if not unknown.any():
+                continue
+            shaped = values.reshape(trees, -1, 2, 1 << level)
+            averaged = (shaped * ratios[level][:, :, :, np.newaxis]).sum(axis=2, keepdims=True)
+            averaged = np.broadcast_to(averaged, shaped.shape).reshape(trees, leaves)
+            values = np.where(unknown[:, np.newaxis], averaged, values)
+        return values
+
+    expectations = [expected(subset) for subset in range(1 << n_features)]
+    weights = [
+        math.factorial(size) * math.factorial(n_features - size - 1) / math.factorial(n_features)
+        for size in range(n_features)
+    ]
+
+    tables = np.zeros((n_features, trees, leaves), dtype=np.float64)
+    for feature in range(n_features):
+        bit = 1 << feature
+        for subset in range(1 << n_features):
+            if subset & bit:
+                continue
+            weight = weights[bin(subset).count("1")]
+            tables[feature] += weight * (expectations[subset | bit] - expectations[subset])
+    return tables
+
+
+def compile_catboost_model(model) -> CompiledModel:
+    """
+    Compile a loaded CatBoost model into NumPy arrays
+
+    Args:
+        model: A fitted/loaded CatBoostRegressor with float features only
+
+    Returns:
+        CompiledModel producing the same raw predictions as model.predict
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "model.json")
+        model.save_model(json_path, format="json")
+        with open(json_path) as f:
+            exported = json.load(f)
+
+    if "oblivious_trees" not in exported:
+        raise ValueError("Only oblivious (SymmetricTree) models can be compiled")
+
+    trees = exported["oblivious_trees"]
+    depth = max((len(tree["splits"]) for tree in trees), default=0)
+
+    split_features = np.zeros((len(trees), depth), dtype=np.int32)
+    # Padding levels use +inf so they always take the 0 bit
+    thresholds = np.full((len(trees), depth), np.inf, dtype=np.float32)
+    leaf_values = np.zeros((len(trees), 1 << depth), dtype=np.float64)
+    leaf_weights = np.zeros((len(trees), 1 << depth), dtype=np.float64)
+
+    for t, tree in enumerate(trees):
+        if len(tree["leaf_values"]) != 1 << len(tree["splits"]):
+            raise ValueError("Only single-dimension regression models are supported")
+        for level, split in enumerate(tree["splits"]):
+            if split.get("split_type") != "FloatFeature":
+                raise ValueError(f"Unsupported split type: {split.get('split_type')}")
+            split_features[t, level] = split["float_feature_index"]
+            thresholds[t, level] = split["border"]
+        leaf_values[t, :len(tree["leaf_values"])] = tree["leaf_values"]
+        leaf_weights[t, :len(tree["leaf_weights"])] = tree["leaf_weights"]
+
+    scale, biases = exported.get("scale_and_bias", [1, [0]])
+    bias = biases[0] if isinstance(biases, list) else biases
+
+    feature_names = list(model.feature_names_)
+    params = model.get_all_params()
+    return CompiledModel(
+        split_features=split_features,
+        thresholds=thresholds,
+        leaf_values=leaf_values,
+        contribution_tables=compile_contribution_tables(
+            split_features, leaf_values, leaf_weights, len(feature_names)
+        ),
+        scale=scale,
+        bias=bias,
+        feature_importances=np.asarray(model.get_feature_importance(), dtype=np.float64),
+        feature_names=feature_names,
+        metadata={
+            "tree_count": model.tree_count_,
+            "depth": params.get("depth"),
+            "learning_rate": params.get("learning_rate"),
+            "loss_function": params.get("loss_function"),
+        }
+    )
@@ -0,0 +1,34 @@
+"""
+User Cache
+
+Authenticated requests resolve their user from this in-process cache
+before going to MongoDB. Entries are short-lived and dropped whenever this
+process writes the user document (PATCH /users/me, get_or_create_user), so
+a worker never serves its own stale writes; other workers pick up changes
+within the TTL.
+"""
+
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.utils.cache import TTLCache
+
+
+# Users by ID string (singleton pattern)
+user_cache = TTLCache(maxsize=settings.user_cache_size, ttl_seconds=settings.user_cache_ttl_seconds)
+
+
+def get_cached_user(user_id: str) -> Optional[Dict[str, Any]]:
+    """Cached user document, or None (a copy, so callers may modify it)"""
+    user = user_cache.get(user_id)
+    return dict(user) if user is not None else None
+
+
+def cache_user(user: Dict[str, Any]):
+    """Cache a user document whose _id is already a string"""
+    user_cache.set(user["_id"], dict(user))
+
+
+def invalidate_user(user_id: str):
+    """Drop a user after it was written"""
+    user_cache.pop(str(user_id))
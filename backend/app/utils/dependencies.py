@@ -2,6 +2,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.utils.security import verify_token
 from app.db import get_database
+from app.services.user_cache import get_cached_user, cache_user
 from typing import Dict
 from bson import ObjectId
 
@@ -15,6 +16,9 @@ async def get_current_user(
     """
     Dependency to get current authenticated user from JWT token
     
+    Token verification and the user document are both cached, so the
+    usual path does no crypto and no database round trip.
+    
     Usage in routes:
         @router.get("/protected")
         async def protected_route(current_user: Dict = Depends(get_current_user)):
@@ -30,6 +34,10 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    user = get_cached_user(user_id)
+    if user is not None:
+        return user
+    
     # Fetch user from database (convert string ID to ObjectId)
     db = get_database()
     try:
@@ -49,5 +57,24 @@ async def get_current_user(
     
     # Convert ObjectId to string for JSON serialization
     user["_id"] = str(user["_id"])
+    cache_user(user)
     
     return user
+
+
+async def get_current_admin(current_user: Dict = Depends(get_current_user)) -> Dict:
+    """
+    Dependency that additionally requires the admin role
+    
+    Usage in routes:
+        @router.post("/admin-only")
+        async def admin_route(current_user: Dict = Depends(get_current_admin)):
+            ...
+    """
+    if current_user.get("role") != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required",
+        )
+    
+    return current_user
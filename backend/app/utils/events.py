@@ -0,0 +1,22 @@
+import asyncio
+
+
+async def wait_event(event: asyncio.Event, timeout: float) -> bool:
+    """
+    Wait up to `timeout` seconds for `event`; True if it was set
+
+    Use instead of asyncio.wait_for(event.wait(), timeout) in loops that are
+    stopped by cancelling them: before Python 3.12, wait_for swallows a
+    cancellation that arrives just as the event is set or the timeout fires,
+    and the loop never stops.
+
+    Usage:
+        if await wait_event(self._wakeup, timeout=1.0):
+            ...
+    """
+    waiter = asyncio.ensure_future(event.wait())
+    try:
+        await asyncio.wait([waiter], timeout=timeout)
+    finally:
+        waiter.cancel()
+    return event.is_set()
@@ -0,0 +1,43 @@
+"""
+Fast JSON responses
+
+Read endpoints normally build a Pydantic model per document, FastAPI
+validates it again through response_model, and the result goes through
+jsonable_encoder and json.dumps. For documents this service wrote itself
+that is most of the request's CPU time.
+
+With FAST_JSON_RESPONSES=true those endpoints build plain dicts from the
+stored documents and return a TrustedJSONResponse, which FastAPI sends as
+is: no validation, encoded by orjson (datetimes natively, ObjectIds as
+their hex string). The fields are the same as on the validated path, but
+numbers are sent as stored (e.g. 30000 rather than 30000.0) and missing
+nested fields are not filled with schema defaults.
+"""
+
+from typing import Any
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import Response
+
+
+def _default(value: Any) -> Any:
+    """Encode the BSON types orjson does not know"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """orjson encoding with ObjectId support"""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class TrustedJSONResponse(Response):
+    """JSON response for content built from our own documents (not validated)"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
@@ -0,0 +1,114 @@
+"""
+Incremental JSON parsing
+
+Streams of model output arrive in arbitrary text chunks. ObjectMemberStream
+scans the top-level JSON object as it grows and emits each member
+(key, value) the moment its value is complete, so callers can act on the
+first section long before the closing brace arrives.
+
+Text before the opening brace (e.g. a ```json fence) and after the closing
+brace is ignored.
+"""
+
+import json
+from typing import Any, List, Optional, Tuple
+
+
+class ObjectMemberStream:
+    """Emit top-level members of a streamed JSON object as they complete"""
+
+    def __init__(self):
+        self._buffer: List[str] = []   # Text of the member currently being read
+        self._depth = 0                # Nesting depth; 1 = inside the top-level object
+        self._in_string = False
+        self._escaped = False
+        self._key: Optional[str] = None
+        self._expect = "key"           # "key" | "value" while at depth 1
+        self.started = False
+        self.done = False
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """
+        Consume a chunk of text
+
+        Args:
+            text: Next chunk of the streamed document
+
+        Returns:
+            Members whose values were completed by this chunk, in order
+        """
+        completed = []
+        for char in text:
+            if self.done:
+                break
+            if not self.started:
+                if char == "{":
+                    self.started = True
+                    self._depth = 1
+                continue
+            member = self._consume(char)
+            if member is not None:
+                completed.append(member)
+        return completed
+
+    def _consume(self, char: str) -> Optional[Tuple[str, Any]]:
+        if self._in_string:
+            self._buffer.append(char)
+            if self._escaped:
+                self._escaped = False
+            elif char == "\\":
+                self._escaped = True
+            elif char == '"':
+                self._in_string = False
+                if self._depth == 1 and self._expect == "key":
+                    self._key = json.loads("".join(self._buffer))
+                    self._buffer.clear()
+            return None
+
+        if self._depth == 1:
+            if self._expect == "key":
+                if char == '"':
+                    self._in_string = True
+                    self._buffer.append(char)
+                elif char == ":":
+                    self._expect = "value"
+                elif char == "}":
+                    self.done = True
+                return None
+
+            # Reading a value at the top level
+            if char in ",}":
+                member = self._finish_member()
+                if char == "}":
+                    self.done = True
+                return member
+            if char in "{[":
+                self._depth += 1
+            elif char == '"':
+                self._in_string = True
+            if not (char.isspace() and not self._buffer):
+                self._buffer.append(char)
+            return None
+
+        # Inside a nested value
+        self._buffer.append(char)
+        if char == '"':
+            self._in_string = True
+        elif char in "{[":
+            self._depth += 1
+        elif char in "}]":
+            self._depth -= 1
+            if self._depth == 1:
+                # Containers are complete at their closing bracket
+                return self._finish_member()
+        return None
+
+    def _finish_member(self) -> Optional[Tuple[str, Any]]:
+        raw = "".join(self._buffer).strip()
+        self._buffer.clear()
+        key, self._key = self._key, None
+        self._expect = "key"
+        if key is None or not raw:
+            # Separator after a container member that was already emitted
+            return None
+        return key, json.loads(raw)
@@ -0,0 +1,70 @@
+import asyncio
+import time
+from typing import Any, Dict
+
+
+class TokenBucket:
+    """
+    Async token bucket rate limiter
+
+    Tokens refill continuously at `rate_per_second` up to `capacity` (the
+    allowed burst). A rate of 0 disables limiting. Intended for use from
+    the asyncio event loop.
+
+    Usage:
+        bucket = TokenBucket(rate_per_second=1.0, capacity=5)
+        await bucket.acquire()  # waits until a token is available
+    """
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self.acquired = 0
+        self.total_wait = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def _delay(self) -> float:
+        """Seconds until a whole token is available (0 if one is now)"""
+        self._refill()
+        return max(0.0, (1.0 - self._tokens) / self.rate)
+
+    async def wait_available(self):
+        """Wait until a token could be taken, without taking it"""
+        if not self.enabled:
+            return
+        while (delay := self._delay()) > 0:
+            await asyncio.sleep(delay)
+
+    async def acquire(self):
+        """Take one token, waiting for the bucket to refill if needed"""
+        if not self.enabled:
+            self.acquired += 1
+            return
+        started_at = time.monotonic()
+        while (delay := self._delay()) > 0:
+            await asyncio.sleep(delay)
+        self._tokens -= 1.0
+        self.acquired += 1
+        self.total_wait += time.monotonic() - started_at
+
+    def stats(self) -> Dict[str, Any]:
+        """Configured rate, current tokens and wait counters"""
+        if self.enabled:
+            self._refill()
+        return {
+            "rate_per_minute": round(self.rate * 60, 3),
+            "burst": self.capacity,
+            "tokens": round(self._tokens, 3),
+            "acquired": self.acquired,
+            "avg_wait_ms": round(self.total_wait / self.acquired * 1000, 3) if self.acquired else 0.0,
+        }
@@ -1,7 +1,16 @@
+import time
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from jose import JWTError, jwt
 from app.config import settings
+from app.utils.cache import TTLCache
+
+
+# Verified token -> user_id, kept until the token expires (singleton pattern)
+verified_tokens = TTLCache(
+    maxsize=settings.token_cache_size,
+    ttl_seconds=settings.access_token_expire_minutes * 60
+)
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -31,17 +40,28 @@ def verify_token(token: str) -> Optional[str]:
     """
     Verify JWT token and extract user_id
     
+    Successful verifications are memoized until the token's expiry, so
+    repeat requests with the same token skip signature checking.
+    
     Args:
         token: JWT token string
     
     Returns:
         user_id if valid, None if invalid
     """
+    user_id = verified_tokens.get(token)
+    if user_id is not None:
+        return user_id
+    
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         user_id: str = payload.get("sub")
         if user_id is None:
             return None
-        return user_id
     except JWTError:
         return None
+    
+    expires_in = payload["exp"] - time.time() if "exp" in payload else verified_tokens.ttl
+    if expires_in > 0:
+        verified_tokens.set(token, user_id, ttl_seconds=min(expires_in, verified_tokens.ttl))
+    return user_id
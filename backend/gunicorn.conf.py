@@ -0,0 +1,30 @@
+"""
+Gunicorn configuration for multi-worker serving
+
+Usage (from backend directory):
+    gunicorn -c gunicorn.conf.py app.main:app
+
+With preload_app the application - and with it the model - is imported
+once in the master process before workers are forked, so the model's
+memory is shared copy-on-write instead of loaded once per worker.
+Set PRELOAD_APP=false to load independently in each worker.
+"""
+
+import gc
+import os
+
+
+bind = f"{os.getenv('APP_HOST', '0.0.0.0')}:{os.getenv('APP_PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+# The app splits per-process limits (the Gemini quota) by the worker count
+os.environ["WEB_CONCURRENCY"] = str(workers)
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = os.getenv("PRELOAD_APP", "true").lower() == "true"
+timeout = 60
+
+
+def pre_fork(server, worker):
+    """Freeze everything allocated in the master (model included)"""
+    # Frozen objects are skipped by the GC, so collections in the workers
+    # don't write to - and un-share - the pages holding them
+    gc.freeze()
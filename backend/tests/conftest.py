@@ -0,0 +1,92 @@
+"""
+Shared test setup
+
+Settings are read at import time, so stand-in values for the required
+ones are set before any app module is imported. Database tests use an
+in-memory mongomock-motor client in place of a mongod; API tests call
+the app through TestClient without its lifespan (no mongod, no background
+writers - buffered writers write through).
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+# Make `app` importable wherever pytest is started from
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+for key, value in {
+    "SECRET_KEY": "test-secret-key-with-at-least-32-characters",
+    "MONGODB_URI": "mongodb://localhost:27017",
+    "GOOGLE_CLIENT_ID": "test",
+    "GOOGLE_CLIENT_SECRET": "test",
+    "GOOGLE_OAUTH_REDIRECT_URI": "http://localhost/auth/google/callback",
+    "GEMINI_API_KEY": "test",
+}.items():
+    os.environ.setdefault(key, value)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """In-memory database installed as app.db's connection"""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    import mongomock.collection
+    from app import db as app_db
+
+    # Newer pymongo passes `sort` to bulk operations, which mongomock rejects
+    patched = []
+    for name in ("add_update", "add_replace", "add_delete"):
+        original = getattr(mongomock.collection.BulkOperationBuilder, name, None)
+        if original:
+            def without_sort(self, *args, _original=original, **kwargs):
+                kwargs.pop("sort", None)
+                return _original(self, *args, **kwargs)
+            setattr(mongomock.collection.BulkOperationBuilder, name, without_sort)
+            patched.append((name, original))
+    # The mock's with_options returns a synchronous collection
+    monkeypatch.setattr(
+        mongomock_motor.AsyncMongoMockCollection, "with_options",
+        lambda self, **kwargs: self, raising=False
+    )
+
+    previous = app_db.mongodb.client, app_db.mongodb.db
+    app_db.mongodb.client = mongomock_motor.AsyncMongoMockClient()
+    app_db.mongodb.db = app_db.mongodb.client["test"]
+    yield app_db.mongodb.db
+
+    app_db.mongodb.client, app_db.mongodb.db = previous
+    for name, original in patched:
+        setattr(mongomock.collection.BulkOperationBuilder, name, original)
+
+
+@pytest.fixture
+def user(db):
+    """A signed-in user: {"id": str, "headers": {...}}"""
+    from bson import ObjectId
+    from app.utils.security import create_access_token
+
+    user_id = ObjectId()
+    now = datetime.utcnow()
+    asyncio.run(db.users.insert_one({
+        "_id": user_id,
+        "email": f"user-{user_id}@example.com",
+        "name": "Test User",
+        "role": "user",
+        "created_at": now,
+        "last_login": now,
+    }))
+    token = create_access_token({"sub": str(user_id)})
+    return {"id": str(user_id), "headers": {"Authorization": f"Bearer {token}"}}
+
+
+@pytest.fixture
+def api(db):
+    """TestClient for the app (lifespan not run)"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    return TestClient(app)
@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+from bson import ObjectId, json_util
+from pymongo.write_concern import WriteConcern
+
+from app.services.audit_writer import AuditWriter
+
+
+@pytest.fixture
+def make_writer(db, tmp_path):
+    def make(**overrides):
+        options = dict(
+            collection="audit",
+            batch_size=3,
+            flush_interval_ms=20,
+            max_buffer=100,
+            write_concern=WriteConcern(),
+            spill_dir=str(tmp_path),
+            drain_timeout=1.0,
+        )
+        options.update(overrides)
+        return AuditWriter(**options)
+    return make
+
+
+def test_write_through_when_not_started(db, make_writer):
+    writer = make_writer()
+
+    async def scenario():
+        ids = await writer.record_many([{"n": 1}, {"n": 2}])
+        return ids, await db.audit.find().to_list(None)
+
+    ids, docs = asyncio.run(scenario())
+
+    assert [str(doc["_id"]) for doc in docs] == ids
+    assert writer.stats()["written"] == 2
+
+
+def test_flushes_full_batches_and_on_the_interval(db, make_writer):
+    writer = make_writer(flush_interval_ms=200)
+
+    async def scenario():
+        await writer.start()
+        ids = await writer.record_many([{"n": n} for n in range(3)])
+        await asyncio.sleep(0.05)
+        full_batch = await db.audit.count_documents({})
+
+        ids.append(await writer.record({"n": 3}))
+        await asyncio.sleep(0.05)
+        before_interval = await db.audit.count_documents({})
+        await asyncio.sleep(0.3)
+        docs = await db.audit.find().sort("n", 1).to_list(None)
+        await writer.stop()
+        return ids, full_batch, before_interval, docs
+
+    ids, full_batch, before_interval, docs = asyncio.run(scenario())
+
+    # A full batch does not wait for the interval, a partial one does
+    assert full_batch == 3
+    assert before_interval == 3
+    assert [str(doc["_id"]) for doc in docs] == ids
+    assert writer.stats()["buffered"] == 0
+
+
+def test_rewritten_documents_count_as_duplicates(db, make_writer):
+    writer = make_writer()
+    existing = {"_id": ObjectId(), "n": 1}
+    asyncio.run(db.audit.insert_one(dict(existing)))
+
+    asyncio.run(writer.record_many([dict(existing), {"n": 2}]))
+
+    stats = writer.stats()
+    assert stats["written"] == 1
+    assert stats["duplicates"] == 1
+    assert stats["buffered"] == 0
+    assert asyncio.run(db.audit.count_documents({})) == 2
+
+
+def test_prepare_is_called_with_each_batch(db, make_writer):
+    batches = []
+
+    async def prepare(batch):
+        batches.append([doc["n"] for doc in batch])
+        for doc in batch:
+            doc["prepared"] = True
+
+    writer = make_writer(prepare=prepare)
+    asyncio.run(writer.record_many([{"n": n} for n in range(4)]))
+
+    assert batches == [[0, 1, 2], [3]]
+    assert asyncio.run(db.audit.count_documents({"prepared": True})) == 4
+
+
+def test_stop_spills_what_cannot_be_written_and_start_replays_it(db, make_writer, tmp_path, monkeypatch):
+    writer = make_writer(drain_timeout=0.1)
+    collection = type(db.audit)
+
+    async def unavailable(self, *args, **kwargs):
+        raise ConnectionError("mongod unavailable")
+
+    async def record_while_down():
+        with monkeypatch.context() as m:
+            m.setattr(collection, "insert_many", unavailable)
+            await writer.start()
+            ids = await writer.record_many([{"n": n} for n in range(2)])
+            await asyncio.sleep(0.05)
+            await writer.stop()
+        return ids
+
+    ids = asyncio.run(record_while_down())
+
+    stats = writer.stats()
+    assert stats["failures"] >= 1
+    assert stats["spilled"] == 2
+    assert stats["buffered"] == 0
+    [spill] = list(tmp_path.glob("audit-spill-*.ndjson"))
+    spilled = [json_util.loads(line) for line in spill.read_text().splitlines()]
+    assert [str(doc["_id"]) for doc in spilled] == ids
+
+    restarted = make_writer()
+
+    async def replay():
+        await restarted.start()
+        await asyncio.sleep(0.05)
+        await restarted.stop()
+        return await db.audit.find().sort("n", 1).to_list(None)
+
+    docs = asyncio.run(replay())
+
+    assert [str(doc["_id"]) for doc in docs] == ids
+    assert restarted.stats()["replayed"] == 2
+    assert restarted.stats()["spilled"] == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_spill_files_are_replayed_by_one_writer_only(db, make_writer, tmp_path):
+    doc = {"_id": ObjectId(), "n": 1}
+    (tmp_path / "audit-spill-1-1.ndjson").write_text(json_util.dumps(doc) + "\n")
+    first, second = make_writer(), make_writer()
+
+    async def scenario():
+        await first.start()
+        await second.start()
+        await asyncio.sleep(0.05)
+        await first.stop()
+        await second.stop()
+        return await db.audit.count_documents({})
+
+    assert asyncio.run(scenario()) == 1
+    assert first.stats()["replayed"] + second.stats()["replayed"] == 1
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from app.services import batch_scheduler
+from app.services.batch_scheduler import InferenceBatcher
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Record the batches scored; a record with "bad" fails its whole batch"""
+    batches = []
+
+    def predict(features):
+        batches.append([record["id"] for record in features])
+        if any(record.get("bad") for record in features):
+            raise ValueError("malformed features")
+        return [{"score": 600 + record["id"]} for record in features]
+
+    monkeypatch.setattr(batch_scheduler, "predict_from_features", predict)
+    return batches
+
+
+async def submit_all(batcher, records):
+    return await asyncio.gather(*(batcher.submit(record) for record in records), return_exceptions=True)
+
+
+def test_concurrent_requests_share_one_batch(calls):
+    batcher = InferenceBatcher(window_ms=20, max_batch_size=8)
+    results = asyncio.run(submit_all(batcher, [{"id": i} for i in range(3)]))
+
+    assert results == [{"score": 600}, {"score": 601}, {"score": 602}]
+    assert calls == [[0, 1, 2]]
+    assert batcher.stats()["batch_size_histogram"] == {"3": 1}
+
+
+def test_full_batch_is_dispatched_without_waiting_for_the_window(calls):
+    batcher = InferenceBatcher(window_ms=60000, max_batch_size=2)
+    results = asyncio.run(asyncio.wait_for(submit_all(batcher, [{"id": 0}, {"id": 1}]), timeout=5))
+    assert results == [{"score": 600}, {"score": 601}]
+
+
+def test_failing_row_only_fails_its_own_request(calls):
+    batcher = InferenceBatcher(window_ms=20, max_batch_size=8)
+    records = [{"id": 0}, {"id": 1, "bad": True}, {"id": 2}]
+    results = asyncio.run(submit_all(batcher, records))
+
+    assert results[0] == {"score": 600}
+    assert isinstance(results[1], ValueError)
+    assert results[2] == {"score": 602}
+    # The batch failed once, then each row was retried on its own
+    assert calls[0] == [0, 1, 2]
+    assert sorted(calls[1:]) == [[0], [1], [2]]
+
+
+def test_batching_disabled_scores_each_request_alone(calls):
+    batcher = InferenceBatcher(window_ms=0, max_batch_size=8)
+    results = asyncio.run(submit_all(batcher, [{"id": 0}, {"id": 1}]))
+    assert results == [{"score": 600}, {"score": 601}]
+    assert sorted(calls) == [[0], [1]]
@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+import pytest
+
+from app import db as app_db
+from app.services.bulk_ingest import APPLICANT_KEY, ingest_applicants
+
+
+async def body(text: str, chunk_size: int = 7):
+    """Request body split at arbitrary byte boundaries"""
+    data = text.encode()
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+
+def ndjson(*rows):
+    return "\n".join(row if isinstance(row, str) else json.dumps(row) for row in rows) + "\n"
+
+
+def applicant(email, **fields):
+    return {"name": "Asha Rao", "email": email, **fields}
+
+
+@pytest.fixture(params=["index", "no_index"])
+def applicants(request, db, monkeypatch):
+    """applicants collection with the unique index, or started without it"""
+    if request.param == "index":
+        asyncio.run(db.applicants.create_index([("user_id", 1), ("email", 1)], unique=True))
+    else:
+        monkeypatch.setattr(app_db, "missing_unique_indexes", {("applicants", APPLICANT_KEY)})
+    return db.applicants
+
+
+def test_reports_duplicates_and_invalid_rows_by_line(applicants, monkeypatch):
+    monkeypatch.setattr("app.services.bulk_ingest.settings.ingest_bulk_chunk_size", 2)
+    asyncio.run(applicants.insert_one({"user_id": "u1", "email": "taken@example.com"}))
+    text = ndjson(
+        applicant("a@example.com"),
+        "{not json",
+        applicant("taken@example.com"),
+        applicant("b@example.com", financial_data={"monthly_income": -5}),
+        applicant("a@example.com"),
+        "",
+        applicant("c@example.com"),
+        applicant("c@example.com"),
+        ["not", "an", "object"],
+    )
+
+    summary = asyncio.run(ingest_applicants(body(text), "ndjson", "u1"))
+
+    assert summary["total_rows"] == 8
+    assert summary["inserted"] == 2
+    assert summary["duplicates"] == 3
+    assert summary["duplicate_lines"] == [3, 5, 8]
+    assert [error["line"] for error in summary["errors"]] == [2, 4, 9]
+    assert summary["invalid"] == 3
+    assert "financial_data.monthly_income" in summary["errors"][1]["error"]
+    emails = sorted(doc["email"] for doc in asyncio.run(applicants.find({"user_id": "u1"}).to_list(None)))
+    assert emails == ["a@example.com", "c@example.com", "taken@example.com"]
+
+
+def test_same_email_for_another_user_is_not_a_duplicate(applicants):
+    asyncio.run(applicants.insert_one({"user_id": "u2", "email": "a@example.com"}))
+    summary = asyncio.run(ingest_applicants(body(ndjson(applicant("a@example.com"))), "ndjson", "u1"))
+    assert summary["inserted"] == 1
+    assert summary["duplicates"] == 0
+
+
+def test_csv_rows_and_line_numbers(applicants):
+    text = (
+        "\ufeffname,email,financial_data.monthly_income,financial_data.monthly_expenses,"
+        "financial_data.savings,gig_data.platforms\n"
+        "Asha Rao,a@example.com,30000,12000,5000,Swiggy; Zomato\n"
+        "Ravi,b@example.com\n"
+        "Ravi,a@example.com,25000,10000,0,\n"
+    )
+    summary = asyncio.run(ingest_applicants(body(text), "csv", "u1"))
+
+    assert summary["inserted"] == 1
+    assert summary["errors"] == [{"line": 3, "error": "Expected 6 columns, got 2"}]
+    assert summary["duplicate_lines"] == [4]
+    doc = asyncio.run(applicants.find_one({"email": "a@example.com"}))
+    assert doc["financial_data"]["monthly_income"] == 30000
+    assert doc["gig_data"]["platforms"] == ["Swiggy", "Zomato"]
+    assert doc["features"]
+
+
+def test_create_applicant_rejects_duplicate_email(api, user, applicants):
+    new = applicant("a@example.com")
+    assert api.post("/ingest/applicant", headers=user["headers"], json=new).status_code == 201
+    response = api.post("/ingest/applicant", headers=user["headers"], json=new)
+    assert response.status_code == 409
+    assert asyncio.run(applicants.count_documents({"user_id": user["id"]})) == 1
@@ -0,0 +1,98 @@
+import pytest
+
+from app.utils import cache as cache_module
+from app.utils.cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_get_returns_value_until_expiry(clock):
+    cache = TTLCache(maxsize=10, ttl_seconds=60)
+    cache.set("a", 1)
+    clock[0] += 59
+    assert cache.get("a") == 1
+    clock[0] += 1
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_per_entry_ttl_overrides_default(clock):
+    cache = TTLCache(maxsize=10, ttl_seconds=60)
+    cache.set("short", 1, ttl_seconds=5)
+    cache.set("long", 2)
+    clock[0] += 10
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(maxsize=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_setting_an_existing_key_refreshes_it(clock):
+    cache = TTLCache(maxsize=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("a", 10)
+    cache.set("c", 3)
+    assert cache.get("a") == 10
+    assert cache.get("b") is None
+
+
+def test_pop_clear_and_stats(clock):
+    cache = TTLCache(maxsize=10, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.pop("a") == 1
+    assert cache.pop("a") is None
+    cache.get("b")
+    cache.get("missing")
+    assert cache.stats() == {
+        "size": 1,
+        "maxsize": 10,
+        "ttl_seconds": 60,
+        "hits": 1,
+        "misses": 1,
+        "hit_rate": 0.5,
+    }
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_set_many_stores_in_order_and_evicts_oldest(clock):
+    cache = TTLCache(maxsize=3, ttl_seconds=60)
+    cache.set("a", 0)
+    cache.set_many([("b", 1), ("c", 2), ("d", 3)])
+    assert cache.get("a") is None
+    assert [cache.get(key) for key in "bcd"] == [1, 2, 3]
+    clock[0] += 60
+    assert cache.get("b") is None
+
+
+def test_prediction_cache_set_many_fills_both_tiers(db):
+    import asyncio
+    from app.services.prediction_cache import PredictionCache
+
+    entries = [(f"key-{i}", {"score": 600 + i}, "v1") for i in range(3)]
+
+    async def scenario():
+        await PredictionCache(maxsize=10, ttl_seconds=60, shared=True).set_many(entries)
+        # Another worker's cache finds them in the shared tier
+        other = PredictionCache(maxsize=10, ttl_seconds=60, shared=True)
+        return [await other.get(key) for key, _, _ in entries], other.shared_hits
+
+    results, shared_hits = asyncio.run(scenario())
+    assert results == [result for _, result, _ in entries]
+    assert shared_hits == 3
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.routers.ingest import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    applicant = {"_id": ObjectId(), "created_at": datetime(2024, 5, 17, 8, 30, 15, 123000)}
+    cursor = encode_cursor(applicant)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (applicant["created_at"], applicant["_id"])
+
+
+def test_cursor_keeps_millisecond_precision_like_mongodb():
+    # BSON dates store milliseconds, so microseconds are dropped
+    applicant = {"_id": ObjectId(), "created_at": datetime(2024, 5, 17, 8, 30, 15, 123456)}
+    created_at, _ = decode_cursor(encode_cursor(applicant))
+    assert created_at == datetime(2024, 5, 17, 8, 30, 15, 123000)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", "eyJ0IjogIngiLCAiaSI6ICJ5In0"])
+def test_invalid_cursor_is_a_bad_request(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
@@ -0,0 +1,180 @@
+import asyncio
+
+import pytest
+
+from app.services.insights_cache import InsightsCache
+
+REPORT = {"summary": "Steady income", "risks": ["Thin savings"]}
+
+
+@pytest.fixture
+def cache(db):
+    return InsightsCache(maxsize=10, ttl_seconds=60)
+
+
+class Upstream:
+    """compute() stand-in that blocks until released and counts calls"""
+
+    def __init__(self, result=REPORT):
+        self.result = result
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_concurrent_requests_share_one_upstream_call(cache):
+    async def scenario():
+        upstream = Upstream()
+        tasks = [asyncio.create_task(cache.get_or_compute("k", upstream)) for _ in range(3)]
+        await settle()
+        upstream.release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert upstream.calls == 1
+        assert sorted(status for _, status in results) == ["coalesced", "coalesced", "miss"]
+        assert all(insights == REPORT for insights, _ in results)
+        assert await cache.get_or_compute("k", upstream) == (REPORT, "hit")
+        assert cache.stats()["inflight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_leader_hands_over_to_a_waiter(cache):
+    async def scenario():
+        upstream = Upstream()
+        leader = asyncio.create_task(cache.get_or_compute("k", upstream))
+        await settle()
+        followers = [asyncio.create_task(cache.get_or_compute("k", upstream)) for _ in range(2)]
+        await settle()
+
+        leader.cancel()
+        await settle()
+        upstream.release.set()
+        results = await asyncio.gather(*followers)
+
+        assert leader.cancelled()
+        # One follower took over the call, the other waited for it
+        assert upstream.calls == 2
+        assert sorted(status for _, status in results) == ["coalesced", "miss"]
+        assert all(insights == REPORT for insights, _ in results)
+
+    asyncio.run(scenario())
+
+
+def test_upstream_failure_reaches_waiters_and_is_not_cached(cache):
+    async def scenario():
+        upstream = Upstream(RuntimeError("Gemini unavailable"))
+        tasks = [asyncio.create_task(cache.get_or_compute("k", upstream)) for _ in range(2)]
+        await settle()
+        upstream.release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert upstream.calls == 1
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert await cache.lookup("k") is None
+
+    asyncio.run(scenario())
+
+
+def test_parse_failures_are_not_cached(cache):
+    async def scenario():
+        upstream = Upstream({"error": "Could not parse response"})
+        upstream.release.set()
+        assert (await cache.get_or_compute("k", upstream))[1] == "miss"
+        assert (await cache.get_or_compute("k", upstream))[1] == "miss"
+        assert upstream.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_shared_tier_serves_other_processes(db):
+    async def scenario():
+        upstream = Upstream()
+        upstream.release.set()
+        await InsightsCache(maxsize=10, ttl_seconds=60).get_or_compute("k", upstream)
+        other_process = InsightsCache(maxsize=10, ttl_seconds=60)
+        assert await other_process.get_or_compute("k", upstream) == (REPORT, "hit")
+        assert upstream.calls == 1
+
+    asyncio.run(scenario())
+
+
+class StreamUpstream:
+    """stream_borrower_insights stand-in: one section per release"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        for name, data in REPORT.items():
+            await self.release.wait()
+            yield "section", {"name": name, "data": data}
+        yield "complete", REPORT
+
+
+async def collect(events):
+    return [event async for event in events]
+
+
+def replayed(status):
+    return [
+        ("cache", status),
+        *(("section", {"name": name, "data": data}) for name, data in REPORT.items()),
+        ("complete", REPORT),
+    ]
+
+
+def test_concurrent_streams_share_one_upstream_call(cache):
+    async def scenario():
+        upstream = StreamUpstream()
+        leader = asyncio.create_task(collect(cache.stream("k", upstream)))
+        await settle()
+        follower = asyncio.create_task(collect(cache.stream("k", upstream)))
+        # A plain request joins the stream's flight as well
+        request = asyncio.create_task(cache.get_or_compute("k", upstream))
+        await settle()
+        upstream.release.set()
+
+        assert await leader == replayed("miss")
+        assert await follower == replayed("coalesced")
+        assert await request == (REPORT, "coalesced")
+        assert upstream.calls == 1
+        assert await collect(cache.stream("k", upstream)) == replayed("hit")
+
+    asyncio.run(scenario())
+
+
+def test_disconnected_stream_hands_over_to_a_waiter(cache):
+    async def scenario():
+        upstream = StreamUpstream()
+        leader = asyncio.create_task(collect(cache.stream("k", upstream)))
+        await settle()
+        follower = asyncio.create_task(collect(cache.stream("k", upstream)))
+        await settle()
+
+        leader.cancel()
+        await settle()
+        upstream.release.set()
+
+        assert await follower == [
+            ("cache", "miss"),
+            *(("section", {"name": name, "data": data}) for name, data in REPORT.items()),
+            ("complete", REPORT),
+        ]
+        assert upstream.calls == 2
+        assert cache.stats()["inflight"] == 0
+
+    asyncio.run(scenario())
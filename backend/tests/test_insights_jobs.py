@@ -0,0 +1,135 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services import insights_jobs
+from app.services.insights_cache import InsightsCache
+from app.services.insights_jobs import InsightsJobQueue
+
+REPORT = {"summary": "Steady income"}
+
+
+@pytest.fixture
+def gemini(db, monkeypatch):
+    """get_borrower_insights stand-in; set `error` to make calls fail"""
+    state = {"calls": 0, "error": None}
+
+    async def get_borrower_insights(applicant_data):
+        state["calls"] += 1
+        if state["error"]:
+            raise state["error"]
+        return REPORT
+
+    monkeypatch.setattr(insights_jobs, "get_borrower_insights", get_borrower_insights)
+    monkeypatch.setattr(insights_jobs, "insights_cache", InsightsCache(maxsize=10, ttl_seconds=60))
+    return state
+
+
+@pytest.fixture
+def queue():
+    return InsightsJobQueue(workers=0, max_attempts=2, lease_seconds=30, poll_interval=0.01)
+
+
+def applicant(name):
+    return {"name": name, "financial_data": {"monthly_income": 30000}}
+
+
+def test_jobs_are_claimed_oldest_first_and_only_once(db, gemini, queue):
+    async def scenario():
+        first = await queue.submit(applicant("A"), "u1")
+        second = await queue.submit(applicant("B"), "u1")
+        await db.insights_jobs.update_one({"_id": first["_id"]}, {"$set": {"created_at": datetime.utcnow() + timedelta(seconds=1)}})
+
+        claims = [await queue._claim() for _ in range(3)]
+
+        assert [claim["_id"] for claim in claims[:2]] == [second["_id"], first["_id"]]
+        assert claims[2] is None
+        assert all(claim["status"] == "running" and claim["attempts"] == 1 for claim in claims[:2])
+
+    asyncio.run(scenario())
+
+
+def test_expired_lease_is_claimed_again(db, gemini, queue):
+    async def scenario():
+        job = await queue.submit(applicant("A"), "u1")
+        assert (await queue._claim())["_id"] == job["_id"]
+        assert await queue._claim() is None
+
+        await db.insights_jobs.update_one(
+            {"_id": job["_id"]},
+            {"$set": {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}}
+        )
+        reclaimed = await queue._claim()
+        assert reclaimed["_id"] == job["_id"]
+        assert reclaimed["attempts"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_job_past_max_attempts_fails_without_calling_gemini(db, gemini, queue):
+    async def scenario():
+        job = await queue.submit(applicant("A"), "u1")
+        await db.insights_jobs.update_one({"_id": job["_id"]}, {"$set": {"attempts": 2}})
+        await queue._process(await queue._claim())
+        return await queue.get(job["_id"], "u1")
+
+    job = asyncio.run(scenario())
+    assert job["status"] == "failed"
+    assert "lease expired" in job["error"]
+    assert gemini["calls"] == 0
+
+
+def test_failed_attempt_is_retried_with_backoff(db, gemini, queue):
+    gemini["error"] = RuntimeError("Gemini unavailable")
+
+    async def scenario():
+        job = await queue.submit(applicant("A"), "u1")
+        before = datetime.utcnow()
+        await queue._process(await queue._claim())
+        retried = await queue.get(job["_id"], "u1")
+        assert retried["status"] == "queued"
+        # Stored datetimes keep milliseconds
+        backoff = timedelta(seconds=insights_jobs.RETRY_BACKOFF_SECONDS, milliseconds=-1)
+        assert retried["available_at"] >= before + backoff
+        assert "lease_expires_at" not in retried
+        # Not runnable until the backoff passes
+        assert await queue._claim() is None
+
+        await db.insights_jobs.update_one({"_id": job["_id"]}, {"$set": {"available_at": datetime.utcnow()}})
+        await queue._process(await queue._claim())
+        return await queue.get(job["_id"], "u1")
+
+    job = asyncio.run(scenario())
+    assert job["status"] == "failed"
+    assert job["error"] == "RuntimeError: Gemini unavailable"
+    assert queue.retried == 1 and queue.failed == 1
+
+
+def test_worker_completes_job_and_wakes_long_poll(db, gemini):
+    queue = InsightsJobQueue(workers=1, max_attempts=2, lease_seconds=30, poll_interval=0.01)
+
+    async def scenario():
+        queue.start()
+        try:
+            job = await queue.submit(applicant("A"), "u1")
+            done = await queue.wait(job["_id"], "u1", timeout=5)
+            # Identical data is served from the cache without a job run
+            again = await queue.submit(applicant("A"), "u1")
+            return done, again
+        finally:
+            await queue.stop()
+
+    done, again = asyncio.run(scenario())
+    assert done["status"] == "done"
+    assert done["result"] == REPORT
+    assert again["status"] == "done" and again["cache"] == "hit"
+    assert gemini["calls"] == 1
+
+
+def test_jobs_are_private_to_their_owner(db, gemini, queue):
+    async def scenario():
+        job = await queue.submit(applicant("A"), "u1")
+        return await queue.get(job["_id"], "u2")
+
+    assert asyncio.run(scenario()) is None
@@ -0,0 +1,55 @@
+import json
+
+from app.utils.json_stream import ObjectMemberStream
+
+
+def feed_in_chunks(text, size):
+    stream = ObjectMemberStream()
+    members = []
+    for start in range(0, len(text), size):
+        members.extend(stream.feed(text[start:start + size]))
+    return stream, members
+
+
+DOCUMENT = {
+    "summary": "Steady \"gig\" income {not a brace}",
+    "strengths": ["savings", "rating"],
+    "risk": {"level": "low", "factors": [{"name": "debt", "weight": 0.2}]},
+    "score": 712,
+    "approved": True,
+    "note": None,
+}
+
+
+def test_members_match_json_loads_for_any_chunking():
+    text = json.dumps(DOCUMENT)
+    for size in (1, 2, 7, len(text)):
+        stream, members = feed_in_chunks(text, size)
+        assert members == list(DOCUMENT.items())
+        assert stream.done
+
+
+def test_member_is_emitted_as_soon_as_its_value_completes():
+    stream = ObjectMemberStream()
+    assert stream.feed('{"a": [1, 2') == []
+    assert stream.feed("]") == [("a", [1, 2])]
+    assert stream.feed(', "b": 3') == []
+    assert stream.feed("}") == [("b", 3)]
+
+
+def test_text_around_the_object_is_ignored():
+    stream, members = feed_in_chunks('```json\n{"a": 1, "b": "x"}\n```\n{"c": 2}', 3)
+    assert members == [("a", 1), ("b", "x")]
+    assert stream.started and stream.done
+
+
+def test_incomplete_document():
+    stream = ObjectMemberStream()
+    assert stream.feed('Sure! {"a": 1, "b": {"c"') == [("a", 1)]
+    assert stream.started and not stream.done
+
+
+def test_empty_object():
+    stream = ObjectMemberStream()
+    assert stream.feed("{ }") == []
+    assert stream.done
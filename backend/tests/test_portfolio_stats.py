@@ -0,0 +1,125 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.services import portfolio_stats
+from app.services.portfolio_stats import (
+    get_portfolio_stats,
+    record_applicants_created,
+    record_rescores,
+    recompute_portfolio_stats,
+    write_scores,
+)
+
+
+async def add_applicants(db, user_id, scores):
+    """Insert applicants with these (score, tier) pairs (None = unscored)"""
+    docs = [
+        {"user_id": user_id, "email": f"a{i}@example.com", "credit_score": score, "risk_tier": tier,
+         "created_at": datetime.utcnow()}
+        for i, (score, tier) in enumerate(scores)
+    ]
+    await db.applicants.insert_many(docs)
+    return docs
+
+
+def stored(db, user_id):
+    stats = asyncio.run(get_portfolio_stats(user_id))
+    stats.pop("updated_at")
+    stats.pop("recomputed_at")
+    return stats
+
+
+def test_deltas_match_a_rebuild(db):
+    async def scenario():
+        await add_applicants(db, "u1", [(None, None)] * 3)
+        await record_applicants_created("u1", 3)
+        # Scored for the first time, then one rescored across tier and bucket
+        await record_rescores("u1", [(None, None, 600, "medium"), (None, None, 780, "low")])
+        await record_rescores("u1", [(600, "medium", 520, "high")])
+        # The applicants as those updates left them
+        docs = await db.applicants.find().to_list(None)
+        for doc, (score, tier) in zip(docs, [(520, "high"), (780, "low"), (None, None)]):
+            await db.applicants.update_one({"_id": doc["_id"]}, {"$set": {"credit_score": score, "risk_tier": tier}})
+
+    asyncio.run(scenario())
+    incremental = stored(db, "u1")
+    assert incremental["total"] == 3 and incremental["scored"] == 2 and incremental["unscored"] == 1
+    assert incremental["average_score"] == 650.0
+    assert incremental["tiers"] == {"low": 1, "medium": 0, "high": 1, "very_high": 0}
+    assert [bucket["count"] for bucket in incremental["buckets"]] == [1, 0, 0, 1]
+
+    asyncio.run(recompute_portfolio_stats("u1"))
+    assert stored(db, "u1") == incremental
+
+
+def test_first_delta_builds_the_baseline(db):
+    async def scenario():
+        await add_applicants(db, "u1", [(700, "medium"), (None, None)])
+        # No stats document yet: the delta triggers a rebuild that includes it
+        await record_applicants_created("u1", 1)
+
+    asyncio.run(scenario())
+    assert stored(db, "u1")["total"] == 2
+
+
+def test_rebuild_keeps_deltas_that_land_while_it_aggregates(db, monkeypatch):
+    calls = {"aggregate": 0}
+
+    class RacingApplicants:
+        """applicants collection where a new applicant arrives mid-aggregation"""
+
+        def __getattr__(self, name):
+            return getattr(db.applicants, name)
+
+        def aggregate(self, pipeline):
+            real = db.applicants.aggregate(pipeline)
+
+            class Cursor:
+                async def to_list(self, length):
+                    rows = await real.to_list(length)
+                    calls["aggregate"] += 1
+                    if calls["aggregate"] == 1:
+                        await add_applicants(db, "u1", [(None, None)])
+                        await record_applicants_created("u1", 1)
+                    return rows
+
+            return Cursor()
+
+    class RacingDB:
+        applicants = RacingApplicants()
+
+        def __getattr__(self, name):
+            return getattr(db, name)
+
+    async def scenario():
+        await add_applicants(db, "u1", [(700, "medium")])
+        await recompute_portfolio_stats("u1")
+        monkeypatch.setattr(portfolio_stats, "get_database", lambda: RacingDB())
+        await recompute_portfolio_stats("u1")
+
+    asyncio.run(scenario())
+    # The first aggregation missed the new applicant; its result was discarded
+    assert calls["aggregate"] == 2
+    assert stored(db, "u1")["total"] == 2
+
+
+def test_write_scores_returns_the_scores_actually_replaced(db):
+    async def scenario():
+        docs = await add_applicants(db, "u1", [(None, None), (600, "medium"), (650, "medium")])
+        # Rescored by someone else after we read it
+        await db.applicants.update_one({"_id": docs[1]["_id"]}, {"$set": {"credit_score": 500, "risk_tier": "high"}})
+        # Deleted after we read it
+        await db.applicants.delete_one({"_id": docs[2]["_id"]})
+
+        previous = await write_scores(docs, [
+            {"$set": {"credit_score": 700 + i, "risk_tier": "medium", "last_prediction_id": f"p{i}"}}
+            for i in range(3)
+        ])
+        return previous, await db.applicants.find().sort("_id", 1).to_list(None)
+
+    previous, applicants = asyncio.run(scenario())
+    assert previous == [(None, None), (500, "high"), None]
+    assert [doc["credit_score"] for doc in applicants] == [700, 701]
+    assert [doc["last_prediction_id"] for doc in applicants] == ["p0", "p1"]
@@ -0,0 +1,152 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.routers import predict
+from app.services.feature_store import compute_features, model_input
+from app.services.ml_stub import classify_risk_tier
+
+
+@pytest.fixture
+def model_calls(monkeypatch):
+    """Deterministic stand-in for the model: score follows monthly income"""
+    calls = []
+
+    def predict_from_features(features):
+        calls.append(len(features))
+        results = []
+        for record in features:
+            score = int(min(850, 300 + record["values"][0] / 100))
+            results.append({
+                "score": score,
+                "risk_tier": classify_risk_tier(score),
+                "feature_importances": [],
+                "confidence": 0.85,
+                "model_version": "test-model",
+            })
+        return results
+
+    monkeypatch.setattr(predict, "predict_from_features", predict_from_features)
+    return calls
+
+
+async def insert_applicants(db, user_id, incomes, **fields):
+    created = datetime.utcnow()
+    docs = []
+    for index, income in enumerate(incomes):
+        doc = {
+            "user_id": user_id,
+            "name": f"Applicant {index}",
+            "email": f"applicant{index}@example.com",
+            "financial_data": {"monthly_income": income, "monthly_expenses": 10000, "savings": 5000},
+            "social_data": {},
+            "gig_data": {},
+            "created_at": created - timedelta(seconds=index),
+            "updated_at": created - timedelta(seconds=index),
+            **fields,
+        }
+        doc["features"] = compute_features(model_input(doc))
+        docs.append(doc)
+    result = await db.applicants.insert_many(docs)
+    return [str(oid) for oid in result.inserted_ids]
+
+
+def run(coro):
+    import asyncio
+    return asyncio.run(coro)
+
+
+def test_scores_requested_applicants_in_request_order(api, db, user, model_calls):
+    ids = run(insert_applicants(db, user["id"], [20000, 40000, 60000]))
+    requested = [ids[2], ids[0], ids[1]]
+
+    response = api.post("/predict/batch", headers=user["headers"], json={"applicant_ids": requested})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [result["applicant_id"] for result in body["results"]] == requested
+    assert [result["score"] for result in body["results"]] == [850, 500, 700]
+    assert body["errors"] == []
+    # One model call for the whole batch
+    assert model_calls == [3]
+
+    stored = {str(doc["_id"]): doc for doc in run(db.applicants.find().to_list(None))}
+    for result in body["results"]:
+        applicant = stored[result["applicant_id"]]
+        assert applicant["credit_score"] == result["score"]
+        assert applicant["risk_tier"] == result["risk_tier"]
+        assert applicant["last_prediction_id"] == result["prediction_id"]
+        assert applicant["model_version"] == "test-model"
+    predictions = run(db.predictions.find().to_list(None))
+    assert sorted(str(doc["_id"]) for doc in predictions) == sorted(r["prediction_id"] for r in body["results"])
+
+
+def test_reports_malformed_missing_and_foreign_ids(api, db, user, model_calls):
+    ours = run(insert_applicants(db, user["id"], [30000]))
+    theirs = run(insert_applicants(db, "someone-else", [30000]))
+    missing = str(ObjectId())
+
+    response = api.post(
+        "/predict/batch",
+        headers=user["headers"],
+        json={"applicant_ids": ["not-an-id", ours[0], missing, theirs[0], ours[0]]}
+    )
+
+    body = response.json()
+    assert [result["applicant_id"] for result in body["results"]] == ours
+    assert body["errors"] == [
+        {"applicant_id": "not-an-id", "error": "Invalid applicant ID format"},
+        {"applicant_id": missing, "error": "Applicant not found or access denied"},
+        {"applicant_id": theirs[0], "error": "Applicant not found or access denied"},
+    ]
+    foreign = run(db.applicants.find_one({"_id": ObjectId(theirs[0])}))
+    assert "credit_score" not in foreign
+
+
+def test_filter_selects_newest_unscored_applicants_up_to_limit(api, db, user, model_calls):
+    unscored = run(insert_applicants(db, user["id"], [20000, 30000, 40000]))
+    run(insert_applicants(db, user["id"], [50000], credit_score=700, risk_tier="medium"))
+
+    response = api.post(
+        "/predict/batch",
+        headers=user["headers"],
+        json={"filter": {"unscored_only": True}, "limit": 2}
+    )
+
+    # insert_applicants makes earlier rows newer
+    assert [result["applicant_id"] for result in response.json()["results"]] == unscored[:2]
+
+
+def test_portfolio_stats_follow_the_batch(api, db, user, model_calls):
+    ids = run(insert_applicants(db, user["id"], [20000, 45000]))
+    api.post("/predict/batch", headers=user["headers"], json={"applicant_ids": ids})
+    api.post("/predict/batch", headers=user["headers"], json={"applicant_ids": ids})
+
+    incremental = api.get("/stats/portfolio", headers=user["headers"]).json()
+    rebuilt = api.post("/stats/portfolio/recompute", headers=user["headers"]).json()
+    for stats in (incremental, rebuilt):
+        stats.pop("updated_at", None)
+        stats.pop("recomputed_at", None)
+    assert incremental == rebuilt
+    assert incremental["scored"] == 2
+
+
+@pytest.mark.parametrize("body", [
+    {},
+    {"applicant_ids": [], "filter": {"unscored_only": True}},
+])
+def test_exactly_one_selector_is_required(api, user, body):
+    response = api.post("/predict/batch", headers=user["headers"], json=body)
+    assert response.status_code == 400
+
+
+def test_batch_size_is_capped(api, user, monkeypatch):
+    monkeypatch.setattr(predict.settings, "predict_batch_max_size", 2)
+    ids = [str(ObjectId()) for _ in range(3)]
+    response = api.post("/predict/batch", headers=user["headers"], json={"applicant_ids": ids})
+    assert response.status_code == 400
+
+
+def test_requires_authentication(api):
+    assert api.post("/predict/batch", json={"applicant_ids": []}).status_code in (401, 403)
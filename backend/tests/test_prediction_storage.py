@@ -0,0 +1,101 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services import prediction_storage
+from app.services.prediction_storage import (
+    compact_predictions, expand_predictions, input_hash, pack_features, unpack_features
+)
+
+INPUT = {
+    "financial_data": {"monthly_income": 42000.0, "monthly_expenses": 18000.0, "savings": 9000.0},
+    "social_data": {},
+    "gig_data": {"platforms": ["swiggy"]},
+}
+
+
+@pytest.fixture(autouse=True)
+def no_known_snapshots():
+    prediction_storage.known_snapshots.clear()
+    yield
+    prediction_storage.known_snapshots.clear()
+
+
+def prediction(input_data, vector):
+    return {"user_id": "user-1", "applicant_id": "applicant-1", "input_data": input_data, "features": vector, "score": 700}
+
+
+def test_input_hash_ignores_key_order():
+    reordered = {"gig_data": INPUT["gig_data"], "social_data": {}, "financial_data": dict(reversed(INPUT["financial_data"].items()))}
+    assert input_hash(reordered) == input_hash(INPUT)
+
+
+def test_features_pack_as_little_endian_float32():
+    packed = pack_features(np.array([0.42, 0.18, 0.18]))
+    assert len(packed) == 12
+    assert unpack_features(packed) == pytest.approx([0.42, 0.18, 0.18], rel=1e-6)
+
+
+def test_compact_then_expand_round_trip(db):
+    docs = [prediction(INPUT, [0.42, 0.18, 0.18]), prediction(dict(INPUT), [0.42, 0.18, 0.18])]
+
+    async def run():
+        await compact_predictions(docs)
+        compacted = [dict(doc) for doc in docs]
+        await db.predictions.insert_many(docs)
+        stored = await db.predictions.find().to_list(None)
+        return compacted, await expand_predictions(stored), await db.input_snapshots.count_documents({})
+
+    compacted, expanded, snapshots = asyncio.run(run())
+
+    # One snapshot for the shared input; documents hold only its hash
+    assert snapshots == 1
+    for doc in compacted:
+        assert "input_data" not in doc
+        assert doc["input_hash"] == input_hash(INPUT)
+        assert isinstance(doc["features"], bytes)
+    for doc in expanded:
+        assert doc["input_data"] == INPUT
+        assert doc["features"] == pytest.approx([0.42, 0.18, 0.18], rel=1e-6)
+
+
+def test_compacting_twice_changes_nothing(db):
+    docs = [prediction(INPUT, [0.42, 0.18, 0.18])]
+
+    async def run():
+        await compact_predictions(docs)
+        first = dict(docs[0])
+        await compact_predictions(docs)
+        return first
+
+    first = asyncio.run(run())
+    assert docs[0] == first
+
+
+def test_legacy_documents_expand_unchanged(db):
+    legacy = {"applicant_id": "applicant-1", "input_data": INPUT, "score": 640}
+    expanded = asyncio.run(expand_predictions([dict(legacy)]))
+    assert expanded == [legacy]
+
+
+def test_records_without_a_vector_get_the_feature_store_vector(db):
+    from app.services.feature_store import compute_features
+
+    doc = prediction(INPUT, None)
+    del doc["features"]
+    asyncio.run(compact_predictions([doc]))
+    assert unpack_features(doc["features"]) == pytest.approx(compute_features(INPUT)["vector"], rel=1e-6)
+
+
+def test_import_does_not_load_the_model():
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    check = "import sys, app.services.prediction_storage; print('app.services.ml_stub' in sys.modules)"
+    output = subprocess.run(
+        [sys.executable, "-c", check], cwd=Path(__file__).parent.parent,
+        capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == "False"
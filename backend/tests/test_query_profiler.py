@@ -0,0 +1,75 @@
+import asyncio
+
+from app.services.query_profiler import explain_shape
+
+
+class ExplainDB:
+    """Database stand-in that answers explain with a canned document"""
+
+    def __init__(self, explained):
+        self.explained = explained
+        self.commands = []
+
+    async def command(self, name, command, verbosity):
+        self.commands.append((command, verbosity))
+        return self.explained
+
+
+def ixscan(index="user_id_1"):
+    return {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": index}}
+
+
+def cursor(plan, execution=None):
+    stage = {"$cursor": {"queryPlanner": {"winningPlan": plan}}}
+    if execution:
+        stage["$cursor"]["executionStats"] = {"executionStages": execution}
+    return stage
+
+
+def explain(explained, shape=None):
+    shape = shape or {"name": "s", "collection": "c", "pipeline": [{"$match": {}}]}
+    db = ExplainDB(explained)
+    return asyncio.run(explain_shape(db, shape)), db.commands
+
+
+def test_find_served_by_an_index():
+    result, commands = explain(
+        {"queryPlanner": {"winningPlan": {"stage": "LIMIT", "inputStage": ixscan()}}},
+        {"name": "s", "collection": "c", "filter": {"user_id": "u"}, "sort": [("_id", 1)], "limit": 5},
+    )
+    assert commands == [({"find": "c", "filter": {"user_id": "u"}, "sort": {"_id": 1}, "limit": 5}, "queryPlanner")]
+    assert result["ok"] and result["stages"] == ["LIMIT", "FETCH", "IXSCAN"]
+    assert result["indexes"] == ["user_id_1"]
+
+
+def test_every_pipeline_stage_is_checked():
+    result, commands = explain({"stages": [
+        cursor(ixscan()),
+        {"$_internalUnpackBucket": {}},
+        {"$sort": {"sortKey": {"ts": 1}}},
+        {"$group": {"_id": "$day"}, "usedDisk": True, "spills": 3},
+        {"$sort": {"sortKey": {"_id": -1}}},
+    ]})
+
+    assert commands[0][1] == "executionStats"
+    assert result["stages"] == ["$sort", "$group", "$sort", "$_internalUnpackBucket", "FETCH", "IXSCAN"]
+    # The $sort after $group orders grouped rows and is not a problem
+    assert result["problems"] == ["$group spilled to disk", "$sort not covered by an index"]
+    assert not result["ok"]
+
+
+def test_pushed_down_group_and_sort():
+    plan = {"stage": "SORT", "inputStage": {"stage": "GROUP", "inputStage": ixscan()}}
+    execution = {"stage": "SORT", "inputStage": {"stage": "GROUP", "usedDisk": False, "spills": 0}}
+    result, _ = explain({"queryPlanner": {"winningPlan": {"queryPlan": plan}}, "executionStats": {"executionStages": execution}})
+    assert result["ok"]
+
+    execution["inputStage"].update(usedDisk=True, spills=1)
+    plan["inputStage"] = {"stage": "SORT", "inputStage": {"stage": "GROUP", "inputStage": {"stage": "COLLSCAN"}}}
+    result, _ = explain({"queryPlanner": {"winningPlan": plan}, "executionStats": {"executionStages": execution}})
+    assert result["problems"] == ["$group spilled to disk", "collection scan"]
+
+
+def test_document_sort_in_the_plan_is_flagged():
+    result, _ = explain({"stages": [cursor({"stage": "SORT", "inputStage": ixscan()}), {"$group": {"_id": None}}]})
+    assert result["problems"] == ["in-memory sort"]
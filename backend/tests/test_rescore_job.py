@@ -0,0 +1,162 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services import rescore_job
+from app.services.feature_store import compute_features, model_input
+from app.services.ml_stub import classify_risk_tier
+from app.services.model_registry import model_registry
+from app.services.rescore_job import RescoreRunner
+
+
+@pytest.fixture
+def model(monkeypatch):
+    """Stand-in model; set `fail_on_call` to make that call (1-based) raise"""
+    state = {"calls": [], "fail_on_call": None}
+
+    def predict_from_features(features):
+        state["calls"].append(len(features))
+        if len(state["calls"]) == state["fail_on_call"]:
+            raise RuntimeError("model crashed")
+        return [
+            {
+                "score": 650,
+                "risk_tier": classify_risk_tier(650),
+                "feature_importances": [],
+                "confidence": 0.85,
+                "model_version": "v2",
+            }
+            for _ in features
+        ]
+
+    monkeypatch.setattr(rescore_job, "predict_from_features", predict_from_features)
+    monkeypatch.setattr(type(model_registry), "active_version", property(lambda self: "v2"))
+    return state
+
+
+@pytest.fixture
+def runner():
+    return RescoreRunner(batch_size=2, max_rate=0, lease_seconds=30, yield_ms=0, max_yield_seconds=0)
+
+
+async def insert_applicants(db, count):
+    docs = []
+    for index in range(count):
+        doc = {
+            "user_id": "u1",
+            "name": f"Applicant {index}",
+            "email": f"a{index}@example.com",
+            "financial_data": {"monthly_income": 30000, "monthly_expenses": 10000, "savings": 5000},
+            "credit_score": None,
+            "risk_tier": None,
+            "model_version": "v1",
+            "created_at": datetime.utcnow(),
+        }
+        doc["features"] = compute_features(model_input(doc))
+        docs.append(doc)
+    await db.applicants.insert_many(docs)
+
+
+def test_failed_job_resumes_from_its_checkpoint(db, model, runner):
+    async def scenario():
+        await insert_applicants(db, 5)
+        job = await runner.create()
+        model["fail_on_call"] = 2
+
+        failed = await runner.run(await runner.claim(job["_id"]))
+        assert failed["status"] == "failed"
+        assert failed["processed"] == 2
+        first_chunk = await db.applicants.find().sort("_id", 1).limit(2).to_list(None)
+        assert failed["last_id"] == first_chunk[-1]["_id"]
+
+        done = await runner.run(await runner.claim(job["_id"]))
+        assert done["status"] == "done"
+        assert done["processed"] == 5
+        assert done["runs"] == 2
+        assert "lease_expires_at" not in done
+        # Chunks 1, 2 (failed), then 2 again and 3 - nothing scored twice
+        assert model["calls"] == [2, 2, 2, 1]
+        assert await db.predictions.count_documents({}) == 5
+        assert await db.applicants.count_documents({"model_version": "v2", "credit_score": 650}) == 5
+
+    asyncio.run(scenario())
+
+
+def test_running_job_is_claimable_only_after_its_lease_expires(db, model, runner):
+    async def scenario():
+        await insert_applicants(db, 1)
+        job = await runner.create()
+        assert await runner.claim(job["_id"]) is not None
+        assert await runner.claim(job["_id"]) is None
+
+        await db.rescore_jobs.update_one(
+            {"_id": job["_id"]},
+            {"$set": {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}}
+        )
+        reclaimed = await runner.claim(job["_id"])
+        assert reclaimed["runs"] == 2
+        # The dead run may have written scores without their stats delta
+        assert reclaimed["recompute_stats"] is True
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake time for rescore_job: asyncio.sleep advances datetime.utcnow()"""
+    state = {"now": datetime(2024, 1, 1), "sleeps": []}
+
+    class FakeDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return state["now"]
+
+    async def sleep(seconds):
+        state["sleeps"].append((state["now"], seconds))
+        state["now"] += timedelta(seconds=seconds)
+
+    monkeypatch.setattr(rescore_job, "datetime", FakeDatetime)
+    monkeypatch.setattr(rescore_job.asyncio, "sleep", sleep)
+    return state
+
+
+def test_pacing_renews_the_lease_while_it_sleeps(db, model, runner, clock):
+    leases = []
+
+    async def scenario():
+        job = await runner.create()
+        job = await runner.claim(job["_id"])
+        job.update(run_processed=100, max_rate=1.0)
+
+        real_renew = runner._renew_lease
+
+        async def renew(job):
+            renewed = await real_renew(job)
+            stored = await db.rescore_jobs.find_one({"_id": job["_id"]})
+            leases.append((clock["now"], stored["lease_expires_at"]))
+            return renewed
+
+        runner._renew_lease = renew
+        await runner._pace(job, elapsed=0)
+
+    asyncio.run(scenario())
+
+    assert sum(seconds for _, seconds in clock["sleeps"]) == pytest.approx(100)
+    assert len(clock["sleeps"]) == len(leases) == 10
+    # Every slice ends before the lease it started under
+    for (started, seconds), (checked, expires_at) in zip(clock["sleeps"], leases):
+        assert checked == started
+        assert started + timedelta(seconds=seconds) < expires_at
+
+
+def test_sleep_stops_once_the_job_is_cancelled(db, model, runner, clock):
+    async def scenario():
+        job = await runner.create()
+        job = await runner.claim(job["_id"])
+        await runner.cancel(job["_id"])
+        job["lease_expires_at"] = None
+        return await runner._sleep(job, 100)
+
+    assert asyncio.run(scenario()) is False
+    assert clock["sleeps"] == []
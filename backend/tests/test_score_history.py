@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.services.score_history import history_point
+
+
+def prediction(**fields):
+    doc = {
+        "_id": ObjectId(),
+        "user_id": "user-1",
+        "applicant_id": "applicant-1",
+        "score": 705,
+        "risk_tier": "medium",
+        "created_at": datetime(2024, 3, 1, 12, 0),
+    }
+    doc.update(fields)
+    return doc
+
+
+def test_point_carries_score_and_metadata():
+    doc = prediction(confidence=0.85, model_version="3b3c5790757a")
+    assert history_point(doc) == {
+        "ts": datetime(2024, 3, 1, 12, 0),
+        "meta": {"applicant_id": "applicant-1", "user_id": "user-1"},
+        "score": 705,
+        "risk_tier": "medium",
+        "confidence": 0.85,
+        "model_version": "3b3c5790757a",
+        "prediction_id": str(doc["_id"]),
+    }
+
+
+def test_legacy_prediction_without_version_or_confidence():
+    doc = prediction()
+    point = history_point(doc)
+    assert point["model_version"] is None
+    assert point["confidence"] is None
+    assert point["prediction_id"] == str(doc["_id"])
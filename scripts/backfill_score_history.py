@@ -0,0 +1,82 @@
+"""
+Score history backfill script
+
+Writes `score_history` points for predictions made before the time-series
+collection existed. Predictions are read newest first, down from the
+earliest point already stored, so an interrupted run continues where it
+stopped when started again and never adds a point twice.
+
+Usage:
+    python scripts/backfill_score_history.py
+    python scripts/backfill_score_history.py --batch-size 5000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from app.db import connect_to_mongo, close_mongo_connection, get_database
+from app.services.score_history import history_point
+
+PROJECTION = {
+    "user_id": 1,
+    "applicant_id": 1,
+    "score": 1,
+    "risk_tier": 1,
+    "confidence": 1,
+    "model_version": 1,
+    "created_at": 1,
+}
+
+
+async def main(args):
+    await connect_to_mongo()
+    try:
+        db = get_database()
+        query = {}
+        already = set()
+        first = await db.score_history.find({}, {"ts": 1}).sort("ts", 1).limit(1).to_list(1)
+        if first:
+            # Points at the boundary timestamp may be only partly written
+            cutoff = first[0]["ts"]
+            query["created_at"] = {"$lte": cutoff}
+            already = {
+                point["prediction_id"]
+                async for point in db.score_history.find({"ts": cutoff}, {"prediction_id": 1})
+            }
+            print(f"Score history starts at {cutoff:%Y-%m-%d %H:%M:%S}; backfilling older predictions")
+
+        remaining = await db.predictions.count_documents(query)
+        print(f"{remaining} predictions to backfill")
+
+        written = 0
+        started = time.monotonic()
+        batch = []
+        cursor = db.predictions.find(query, PROJECTION).sort("created_at", -1).batch_size(args.batch_size)
+        async for prediction in cursor:
+            if str(prediction["_id"]) in already:
+                continue
+            batch.append(history_point(prediction))
+            if len(batch) >= args.batch_size:
+                await db.score_history.insert_many(batch)
+                written += len(batch)
+                batch = []
+                print(f"  {written}/{remaining}")
+        if batch:
+            await db.score_history.insert_many(batch)
+            written += len(batch)
+
+        print(f"✓ Wrote {written} score history points in {time.monotonic() - started:.1f}s")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill score history from existing predictions")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Points per insert_many")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,172 @@
+"""
+Columnar loader benchmark
+
+Compares building the model input matrix for many applicants through
+decoded dicts (what motor's find() returns, then compute_features per row)
+against the columnar loader (raw BSON batches scanned into NumPy columns).
+
+By default the documents are generated and BSON-encoded in memory, so only
+decoding and feature extraction are timed. With --mongo the three paths
+read the `applicants` collection through the driver instead (seed it
+first, e.g. with --seed).
+
+Usage:
+    python scripts/benchmark_columnar_loader.py
+    python scripts/benchmark_columnar_loader.py --count 500000 --batch-size 10000
+    python scripts/benchmark_columnar_loader.py --mongo --seed 200000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import bson
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from seed_db import generate_applicant
+from app.db import connect_to_mongo, close_mongo_connection, get_database
+from app.services.columnar_loader import ApplicantColumns, FEATURE_FIELDS, load_applicant_columns
+from app.services.feature_store import compute_features, model_input
+from app.services.ml_stub import normalize_features_batch
+
+
+def make_batches(count: int, batch_size: int):
+    """Full and projected applicant documents, BSON-encoded in raw batches"""
+    full, projected = [], []
+    for start in range(0, count, batch_size):
+        docs = []
+        for index in range(start, min(start + batch_size, count)):
+            doc = generate_applicant(index)
+            doc["_id"] = bson.ObjectId()
+            doc["features"] = compute_features(model_input(doc))
+            docs.append(doc)
+        full.append(b"".join(bson.encode(doc) for doc in docs))
+        projected.append(b"".join(
+            bson.encode({"_id": doc["_id"], "financial_data": {
+                path.split(".")[1]: doc["financial_data"][path.split(".")[1]] for path in FEATURE_FIELDS
+            }})
+            for doc in docs
+        ))
+    return full, projected
+
+
+def dict_path(batches):
+    docs = []
+    for batch in batches:
+        docs.extend(bson.decode_all(batch))
+    return normalize_features_batch(docs)
+
+
+def columnar_path(batches, count: int):
+    columns = ApplicantColumns(FEATURE_FIELDS, count)
+    for batch in batches:
+        columns.add_batch(batch)
+    return columns.finish().feature_matrix()
+
+
+def best_of(run, repeats: int):
+    """Best-of-N seconds and the last result"""
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+async def best_of_async(run, repeats: int):
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = await run()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def report(rows, count: int):
+    baseline = rows[0][1]
+    print(f"\n{'path':<26} {'ms':>10} {'rows/s':>12} {'speedup':>8}")
+    for label, seconds in rows:
+        print(f"{label:<26} {seconds * 1000:>10.1f} {count / seconds:>12,.0f} {baseline / seconds:>7.1f}x")
+
+
+def run_in_memory(args):
+    print(f"Generating {args.count} applicants...")
+    full, projected = make_batches(args.count, args.batch_size)
+    print(f"  {sum(map(len, full)) / 1e6:.1f} MB full BSON, {sum(map(len, projected)) / 1e6:.1f} MB projected")
+
+    full_s, expected = best_of(lambda: dict_path(full), args.repeats)
+    projected_s, from_projected = best_of(lambda: dict_path(projected), args.repeats)
+    columnar_s, matrix = best_of(lambda: columnar_path(projected, args.count), args.repeats)
+    assert np.array_equal(expected, from_projected) and np.array_equal(expected, matrix), "feature matrices differ"
+
+    report([
+        ("dicts, full documents", full_s),
+        ("dicts, projected", projected_s),
+        ("columnar, projected", columnar_s),
+    ], args.count)
+
+
+async def run_mongo(args):
+    await connect_to_mongo()
+    try:
+        db = get_database()
+        if args.seed:
+            print(f"Seeding {args.seed} applicants (user_id 'benchmark')...")
+            await db.applicants.delete_many({"user_id": "benchmark"})
+            for start in range(0, args.seed, args.batch_size):
+                docs = [generate_applicant(i) for i in range(start, min(start + args.batch_size, args.seed))]
+                for doc in docs:
+                    doc["user_id"] = "benchmark"
+                    doc["features"] = compute_features(model_input(doc))
+                await db.applicants.insert_many(docs)
+
+        query = {"user_id": "benchmark"} if args.seed else {}
+        count = await db.applicants.count_documents(query)
+        projection = {path: 1 for path in FEATURE_FIELDS}
+        print(f"{count} applicants")
+
+        async def via_dicts(projection=None):
+            docs = await db.applicants.find(query, projection).batch_size(args.batch_size).to_list(None)
+            return normalize_features_batch(docs)
+
+        full_s, expected = await best_of_async(via_dicts, args.repeats)
+        projected_s, _ = await best_of_async(lambda: via_dicts(projection), args.repeats)
+        columnar_s, columns = await best_of_async(
+            lambda: load_applicant_columns(query, batch_size=args.batch_size), args.repeats
+        )
+        # Rows come back in cursor order; compare them sorted
+        matrix = columns.feature_matrix()
+        assert np.array_equal(expected[np.lexsort(expected.T)], matrix[np.lexsort(matrix.T)]), "feature matrices differ"
+
+        report([
+            ("find(), full documents", full_s),
+            ("find(), projected", projected_s),
+            ("find_raw_batches, columnar", columnar_s),
+        ], count)
+    finally:
+        await close_mongo_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the columnar applicant loader against decoded dicts")
+    parser.add_argument("--count", type=int, default=200000, help="Generated applicants (in-memory mode)")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--mongo", action="store_true", help="Read applicants from MongoDB")
+    parser.add_argument("--seed", type=int, default=0, help="With --mongo: insert N benchmark applicants first")
+    args = parser.parse_args()
+
+    if args.mongo:
+        asyncio.run(run_mongo(args))
+    else:
+        run_in_memory(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Tree evaluator benchmark
+
+Compares the compiled NumPy evaluator against the native CatBoost
+predictor: cold-start (import + load) time and scoring throughput at
+several batch sizes.
+
+Usage:
+    python scripts/compile_model.py            # produce the .npz first
+    python scripts/benchmark_tree_evaluator.py
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from catboost import CatBoostRegressor
+from app.services.tree_compiler import CompiledModel
+
+
+MODELS_DIR = Path(__file__).parent.parent / "models"
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+
+LOAD_SNIPPETS = {
+    "catboost": (
+        "from catboost import CatBoostRegressor\n"
+        "m = CatBoostRegressor(); m.load_model({path!r})"
+    ),
+    "numpy": (
+        "from app.services.tree_compiler import CompiledModel\n"
+        "m = CompiledModel.load({path!r})"
+    ),
+}
+
+
+def cold_start_seconds(backend: str, path: str, repeats: int) -> float:
+    """Best-of-N wall time to import the runtime and load the model in a fresh interpreter"""
+    code = LOAD_SNIPPETS[backend].format(path=path)
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, cwd=BACKEND_DIR)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def time_predict(predict, X: np.ndarray, repeats: int) -> float:
+    """Best-of-N seconds for one predict call"""
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        predict(X)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compiled vs native CatBoost inference")
+    parser.add_argument("--model", default=str(MODELS_DIR / "catboost_model_best.cbm"))
+    parser.add_argument("--compiled", default=str(MODELS_DIR / "catboost_model_best.npz"))
+    parser.add_argument("--batch-sizes", default="1,32,256,4096")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--thread-count", type=int, default=1)
+    args = parser.parse_args()
+    
+    native = CatBoostRegressor()
+    native.load_model(args.model)
+    compiled = CompiledModel.load(args.compiled)
+    
+    print(f"Model: {compiled.tree_count} trees, depth {compiled.depth}")
+    print("\nCold start (fresh interpreter, import + load):")
+    for backend, path in (("catboost", args.model), ("numpy", args.compiled)):
+        print(f"  {backend:>8}: {cold_start_seconds(backend, path, 3) * 1000:8.1f} ms")
+    
+    rng = np.random.default_rng(0)
+    print(f"\n{'batch':>6} {'catboost ms':>12} {'numpy ms':>10} {'ratio':>7} {'max |diff|':>11}")
+    for batch_size in (int(b) for b in args.batch_sizes.split(",")):
+        X = rng.uniform(0, 2, size=(batch_size, len(compiled.feature_names)))
+        native_s = time_predict(lambda m: native.predict(m, thread_count=args.thread_count), X, args.repeats)
+        compiled_s = time_predict(compiled.predict, X, args.repeats)
+        diff = float(np.abs(native.predict(X) - compiled.predict(X)).max())
+        print(f"{batch_size:>6} {native_s * 1000:>12.3f} {compiled_s * 1000:>10.3f} "
+              f"{native_s / compiled_s:>6.2f}x {diff:>11.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Query plan check
+
+Creates the declared indexes, then runs `explain` on every query shape in
+backend/app/query_shapes.py. Exits non-zero if any shape is answered with
+a collection scan (COLLSCAN), an in-memory sort of documents (SORT, or a
+pipeline $sort the index does not cover) or a $group that spilled to disk,
+so it can gate CI.
+
+Runs against MONGODB_URI / MONGODB_DB from backend/.env; a throwaway local
+mongod is enough:
+    docker compose up -d mongodb
+
+Usage:
+    python scripts/check_query_plans.py
+    python scripts/check_query_plans.py --json plans.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from app.db import connect_to_mongo, close_mongo_connection, get_database
+from app.services.query_profiler import check_query_plans
+
+
+async def main(args):
+    await connect_to_mongo()
+    try:
+        results = await check_query_plans(get_database())
+    finally:
+        await close_mongo_connection()
+
+    for result in results:
+        mark = "✓" if result["ok"] else "✗"
+        plan = " <- ".join(result["stages"])
+        indexes = ", ".join(result["indexes"]) or "-"
+        print(f"{mark} {result['name']:<32} {plan:<40} [{indexes}]")
+        for problem in result["problems"]:
+            print(f"    {problem} (used by {result['used_by']})")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failed = [result["name"] for result in results if not result["ok"]]
+    if failed:
+        print(f"\n❌ {len(failed)} query shape(s) with plan problems: {', '.join(failed)}")
+        sys.exit(1)
+    print(f"\n✅ All {len(results)} query shapes use an index without an in-memory sort")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Explain every declared query shape")
+    parser.add_argument("--json", help="Also write results to this file")
+    asyncio.run(main(parser.parse_args()))
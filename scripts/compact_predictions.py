@@ -0,0 +1,142 @@
+"""
+Prediction storage migration script
+
+Converts `predictions` documents written in the old format (full
+`input_data` copy per prediction) to the compact format: the input is
+stored once in `input_snapshots` and referenced by hash, and the feature
+vector is stored as packed float32 (see app/services/prediction_storage.py).
+
+Only documents that still have `input_data` are touched, so the script can
+be stopped and re-run. It reports the BSON bytes before and after, and the
+collection sizes from collStats. WiredTiger keeps freed pages for reuse;
+run `db.runCommand({compact: "predictions"})` to return them to the OS.
+
+Usage:
+    python scripts/compact_predictions.py --dry-run
+    python scripts/compact_predictions.py
+    python scripts/compact_predictions.py --batch-size 5000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import bson
+from pymongo import UpdateOne
+
+from app.db import connect_to_mongo, close_mongo_connection, get_database
+from app.services.ml_stub import normalize_features_batch
+from app.services.prediction_storage import input_hash, pack_features, store_snapshots
+
+
+def format_bytes(count: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(count) < 1024:
+            return f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} TB"
+
+
+async def collection_sizes(db):
+    sizes = {}
+    for name in ("predictions", "input_snapshots"):
+        try:
+            stats = await db.command("collStats", name)
+            sizes[name] = (stats.get("count", 0), stats.get("size", 0), stats.get("storageSize", 0))
+        except Exception:
+            sizes[name] = (0, 0, 0)
+    return sizes
+
+
+def print_sizes(label, sizes):
+    print(label)
+    for name, (count, size, storage) in sizes.items():
+        print(f"  {name:<16} {count:>10} docs  data {format_bytes(size):>10}  on disk {format_bytes(storage):>10}")
+
+
+async def migrate_batch(db, docs, totals, seen, dry_run):
+    inputs = [doc["input_data"] for doc in docs]
+    hashes = [input_hash(data) for data in inputs]
+    features = normalize_features_batch(inputs)
+
+    compacted = []
+    for doc, key, row in zip(docs, hashes, features):
+        new_doc = {field: value for field, value in doc.items() if field != "input_data"}
+        new_doc["input_hash"] = key
+        new_doc["features"] = pack_features(row)
+        compacted.append(new_doc)
+        totals["before"] += len(bson.encode(doc))
+        totals["after"] += len(bson.encode(new_doc))
+
+    snapshots = dict(zip(hashes, inputs))
+    if dry_run:
+        # Estimate: snapshots already in the collection are not checked
+        new_keys = set(snapshots) - seen
+        seen.update(new_keys)
+    else:
+        new_keys = await store_snapshots(snapshots)
+        await db.predictions.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": new_doc["_id"], "input_data": {"$exists": True}},
+                    {"$set": {"input_hash": new_doc["input_hash"], "features": new_doc["features"]},
+                     "$unset": {"input_data": ""}}
+                )
+                for new_doc in compacted
+            ],
+            ordered=False
+        )
+    totals["snapshots"] += len(new_keys)
+    totals["snapshot_bytes"] += sum(len(bson.encode({"_id": key, "data": snapshots[key]})) for key in new_keys)
+    totals["converted"] += len(docs)
+
+
+async def main(args):
+    await connect_to_mongo()
+    try:
+        db = get_database()
+        print_sizes("Before:", await collection_sizes(db))
+
+        query = {"input_data": {"$exists": True}}
+        remaining = await db.predictions.count_documents(query)
+        print(f"{remaining} predictions to convert{' (dry run)' if args.dry_run else ''}")
+
+        totals = {"converted": 0, "before": 0, "after": 0, "snapshots": 0, "snapshot_bytes": 0}
+        seen = set()
+        started = time.monotonic()
+        batch = []
+        cursor = db.predictions.find(query).sort("_id", 1).batch_size(args.batch_size)
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= args.batch_size:
+                await migrate_batch(db, batch, totals, seen, args.dry_run)
+                batch = []
+                print(f"  {totals['converted']}/{remaining}")
+        if batch:
+            await migrate_batch(db, batch, totals, seen, args.dry_run)
+
+        elapsed = time.monotonic() - started
+        new_total = totals["after"] + totals["snapshot_bytes"]
+        saved = totals["before"] - new_total
+        print(f"{'✓' if not args.dry_run else '~'} {totals['converted']} predictions in {elapsed:.1f}s")
+        print(f"  predictions (BSON):   {format_bytes(totals['before'])} -> {format_bytes(totals['after'])}")
+        print(f"  new input snapshots:  {totals['snapshots']} ({format_bytes(totals['snapshot_bytes'])})")
+        if totals["before"]:
+            print(f"  saved:                {format_bytes(saved)} ({saved / totals['before'] * 100:.1f}%)")
+
+        if not args.dry_run:
+            print_sizes("After:", await collection_sizes(db))
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert predictions to the compact storage format")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Predictions per bulk write")
+    parser.add_argument("--dry-run", action="store_true", help="Report the savings without writing")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,68 @@
+"""
+Model compilation script
+
+Compiles the trained CatBoost model into a NumPy artifact that the API can
+serve with MODEL_BACKEND=numpy (no catboost import in the workers), and
+verifies the compiled predictions and SHAP contributions against CatBoost.
+
+Usage:
+    python scripts/compile_model.py
+    python scripts/compile_model.py --model models/catboost_model_best.cbm --output models/catboost_model_best.npz
+"""
+
+import argparse
+import hashlib
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from catboost import CatBoostRegressor, Pool
+from app.services.tree_compiler import compile_catboost_model, CompiledModel
+
+
+MODELS_DIR = Path(__file__).parent.parent / "models"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a CatBoost model to NumPy arrays")
+    parser.add_argument("--model", default=str(MODELS_DIR / "catboost_model_best.cbm"))
+    parser.add_argument("--output", default=str(MODELS_DIR / "catboost_model_best.npz"))
+    parser.add_argument("--verify-rows", type=int, default=10000)
+    parser.add_argument("--tolerance", type=float, default=1e-6)
+    args = parser.parse_args()
+    
+    print(f"Loading CatBoost model from {args.model}...")
+    model = CatBoostRegressor()
+    model.load_model(args.model)
+    
+    print("Compiling oblivious trees...")
+    compiled = compile_catboost_model(model)
+    # Same version string the API derives from the .cbm, so caches and
+    # prediction records agree across backends
+    with open(args.model, "rb") as f:
+        compiled.metadata["model_version"] = hashlib.sha256(f.read()).hexdigest()[:12]
+    compiled.save(args.output)
+    print(f"✅ Wrote {args.output} ({compiled.tree_count} trees, depth {compiled.depth}, "
+          f"{Path(args.output).stat().st_size / 1024:.1f} KiB)")
+    
+    # Verify the saved artifact, not the in-memory copy
+    reloaded = CompiledModel.load(args.output)
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 2, size=(args.verify_rows, len(compiled.feature_names)))
+    max_error = float(np.abs(reloaded.predict(X) - model.predict(X)).max())
+    print(f"Max abs difference vs CatBoost over {args.verify_rows} rows: {max_error:.3e}")
+    shap_values = model.get_feature_importance(data=Pool(X), type="ShapValues")[:, :-1]
+    max_shap_error = float(np.abs(reloaded.shap_values(X) - shap_values).max())
+    print(f"Max abs SHAP difference vs CatBoost: {max_shap_error:.3e}")
+    
+    if max_error > args.tolerance or max_shap_error > args.tolerance:
+        print(f"❌ Compiled model differs from CatBoost by more than {args.tolerance}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
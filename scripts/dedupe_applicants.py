@@ -0,0 +1,81 @@
+"""
+Applicant dedupe script
+
+The unique (user_id, email) index on `applicants` cannot be built while a
+user has several applicants with the same email; the API then starts
+without it and logs the conflicting IDs. This script resolves those
+groups: in each one it keeps the most recently updated applicant and
+deletes the others, then rebuilds the affected users' portfolio stats and
+creates the index.
+
+Predictions of deleted applicants are kept as audit records.
+
+Usage:
+    python scripts/dedupe_applicants.py            # dry run: list the duplicates
+    python scripts/dedupe_applicants.py --apply
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from app.db import connect_to_mongo, close_mongo_connection, ensure_indexes, find_duplicates, get_database
+from app.services.portfolio_stats import recompute_portfolio_stats
+
+KEYS = [("user_id", 1), ("email", 1)]
+
+
+def recency(applicant):
+    """Sort key: last data change, then creation, then _id"""
+    return (
+        applicant.get("updated_at") or applicant.get("created_at") or datetime.min,
+        applicant.get("created_at") or datetime.min,
+        applicant["_id"],
+    )
+
+
+async def main(args):
+    await connect_to_mongo()
+    try:
+        db = get_database()
+        duplicates = await find_duplicates("applicants", KEYS, limit=0)
+        if not duplicates:
+            print("✓ No duplicate applicants")
+            return
+
+        removed = []
+        users = set()
+        for group in duplicates:
+            applicants = await db.applicants.find(
+                {"_id": {"$in": group["ids"]}},
+                {"updated_at": 1, "created_at": 1}
+            ).to_list(None)
+            applicants.sort(key=recency, reverse=True)
+            keep, drop = applicants[0], applicants[1:]
+            print(f"{group['_id']}: keep {keep['_id']}, remove {', '.join(str(a['_id']) for a in drop)}")
+            removed.extend(applicant["_id"] for applicant in drop)
+            users.add(group["_id"]["user_id"])
+
+        if not args.apply:
+            print(f"\n{len(removed)} applicants would be removed; run with --apply")
+            return
+
+        result = await db.applicants.delete_many({"_id": {"$in": removed}})
+        print(f"\n✓ Removed {result.deleted_count} duplicate applicants")
+        for user_id in users:
+            await recompute_portfolio_stats(user_id)
+        print(f"✓ Recomputed portfolio stats for {len(users)} users")
+        await ensure_indexes()
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Remove duplicate (user_id, email) applicants")
+    parser.add_argument("--apply", action="store_true", help="Delete the duplicates (default: only list them)")
+    asyncio.run(main(parser.parse_args()))
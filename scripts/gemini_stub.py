@@ -0,0 +1,109 @@
+"""
+Local Gemini stub
+
+Serves canned Borrower Intelligence Reports on the two Gemini endpoints the
+backend uses, so insights can be developed and tested offline:
+
+    POST /v1/models/<model>:generateContent
+    POST /v1/models/<model>:streamGenerateContent?alt=sse
+
+The streaming endpoint sends the report in small text chunks with a delay
+between them, like the real API does.
+
+Usage:
+    python scripts/gemini_stub.py --port 8089
+    # then start the backend with
+    GEMINI_API_URL=http://127.0.0.1:8089/v1 GEMINI_API_KEY=stub uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import json
+import random
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+CATEGORIES = [
+    "Financial Health",
+    "Work Performance",
+    "Behavioral Signals",
+    "Identity & Fraud",
+    "Network Insights",
+    "Risk Assessment",
+]
+
+
+def build_report(prompt: str) -> dict:
+    """Deterministic fake report (varies with the prompt so caching is visible)"""
+    rng = random.Random(prompt)
+    report = {}
+    for category in CATEGORIES:
+        report[category] = {
+            "score": rng.randint(40, 95),
+            "summary": f"{category} looks {rng.choice(['strong', 'stable', 'mixed', 'weak'])}",
+            "signals": [f"signal {i}" for i in range(rng.randint(2, 4))],
+        }
+    report["dashboard_output"] = {
+        "recommendation": rng.choice(["Approve", "Review", "Decline"]),
+        "reasoning": "Generated by the local Gemini stub",
+        "suggested_terms": {"amount": rng.randint(10, 100) * 1000, "tenure_months": 12},
+        "confidence": round(rng.uniform(0.6, 0.95), 2),
+        "top_factors": CATEGORIES[:5],
+    }
+    return report
+
+
+def candidate(text: str) -> dict:
+    return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}]}
+
+
+def create_app(args) -> FastAPI:
+    app = FastAPI(title="Gemini stub")
+
+    @app.post("/v1/models/{model_action}")
+    async def models(model_action: str, request: Request):
+        model, _, action = model_action.partition(":")
+        if random.random() < args.fail_rate:
+            raise HTTPException(status_code=503, detail="stub: simulated overload")
+
+        body = await request.json()
+        prompt = body["contents"][0]["parts"][0]["text"]
+        text = json.dumps(build_report(prompt), indent=2)
+        if args.fence:
+            text = f"```json\n{text}\n```"
+
+        if action == "generateContent":
+            await asyncio.sleep(args.delay * len(text) / args.chunk_size)
+            return JSONResponse(candidate(text))
+
+        if action == "streamGenerateContent":
+            async def events():
+                for start in range(0, len(text), args.chunk_size):
+                    await asyncio.sleep(args.delay)
+                    chunk = candidate(text[start:start + args.chunk_size])
+                    yield f"data: {json.dumps(chunk)}\r\n\r\n"
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        raise HTTPException(status_code=404, detail=f"stub: unknown action {action!r} for {model}")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline stand-in for the Gemini API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--chunk-size", type=int, default=40, help="Characters per streamed chunk")
+    parser.add_argument("--delay", type=float, default=0.05, help="Seconds between streamed chunks")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of calls answered with 503")
+    parser.add_argument("--fence", action="store_true", help="Wrap the JSON in a ```json code block")
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(args), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,534 @@
+"""
+API load test
+
+Starts the backend (uvicorn, in a child process) against a local mongod,
+or with --in-memory against an in-memory stand-in (mongomock-motor), plus
+the local Gemini stub (scripts/gemini_stub.py). It then seeds generated
+applicants through the API and drives each endpoint in turn with
+--concurrency clients. Each endpoint reports p50/p95/p99 latency,
+throughput and errors.
+
+Google is never contacted and no sign-in endpoint is used: the server
+process inserts a load-test user and a load-test admin when it connects to
+the database, and this script signs their JWTs itself with the run's
+SECRET_KEY. Admin-only endpoints are driven as the admin. The auth
+endpoints and /admin (which reloads models and starts jobs) are not driven.
+
+--save writes the results as JSON. --baseline compares against a saved
+run, and the script exits with status 1 when an endpoint's p50 or p95
+latency grows, or its throughput drops, by more than --threshold. It also
+exits with 1 when an endpoint's error rate exceeds --max-error-rate.
+Compare runs made with the same mode, concurrency and request count on
+the same machine.
+
+Usage:
+    python scripts/load_test.py --in-memory
+    python scripts/load_test.py --mongo-uri mongodb://localhost:27017 --save load_baseline.json
+    python scripts/load_test.py --baseline load_baseline.json --threshold 0.25
+    python scripts/load_test.py --in-memory --endpoints predict.,users. --requests 500 --concurrency 16
+    python scripts/load_test.py --in-memory --env FAST_JSON_RESPONSES=true
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+STARTUP_TIMEOUT_SECONDS = 90
+
+# Stand-in values for the settings the backend requires
+SERVER_ENV = {
+    "GOOGLE_CLIENT_ID": "load-test",
+    "GOOGLE_CLIENT_SECRET": "load-test",
+    "GOOGLE_OAUTH_REDIRECT_URI": "http://127.0.0.1/auth/google/callback",
+    "GEMINI_API_KEY": "stub",
+    "GEMINI_RATE_PER_MINUTE": "0",
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+# ---------------------------------------------------------------------------
+# Child processes
+
+def run_gemini_stub(port: int, delay: float):
+    """Serve scripts/gemini_stub.py (child process)"""
+    import uvicorn
+    from gemini_stub import create_app
+
+    stub_args = argparse.Namespace(chunk_size=200, delay=delay, fail_rate=0.0, fence=False)
+    uvicorn.run(create_app(stub_args), host="127.0.0.1", port=port, log_level="warning")
+
+
+def use_in_memory_database():
+    """Point app.db at mongomock-motor instead of a mongod (child process)"""
+    try:
+        from mongomock_motor import AsyncMongoMockClient, AsyncMongoMockCollection
+        import mongomock.collection
+    except ImportError:
+        print("✗ --in-memory needs mongomock-motor (pip install mongomock-motor)")
+        raise
+
+    # mongomock-motor gaps: with_options returns a synchronous collection,
+    # and bulk operations reject the `sort` argument newer pymongo passes
+    AsyncMongoMockCollection.with_options = lambda self, **kwargs: self
+    for name in ("add_update", "add_replace", "add_delete"):
+        original = getattr(mongomock.collection.BulkOperationBuilder, name, None)
+        if original:
+            def without_sort(self, *args, _original=original, **kwargs):
+                kwargs.pop("sort", None)
+                return _original(self, *args, **kwargs)
+            setattr(mongomock.collection.BulkOperationBuilder, name, without_sort)
+
+    from app import db
+    from app.config import settings
+    import app.main
+
+    async def connect():
+        db.mongodb.client = AsyncMongoMockClient()
+        db.mongodb.db = db.mongodb.client[settings.mongodb_db]
+        try:
+            await db.ensure_indexes()
+        except Exception as e:
+            # e.g. time-series collections; they are created as plain collections
+            print(f"✗ In-memory database: {e}")
+        print("Connected to in-memory database")
+
+    db.connect_to_mongo = connect
+    app.main.connect_to_mongo = connect
+
+
+def create_users_on_connect(users: dict):
+    """Insert the load-test users once the backend has connected (child process)"""
+    from bson import ObjectId
+    from app.db import get_database
+    import app.main
+
+    connect = app.main.connect_to_mongo
+
+    async def connect_and_create_users():
+        await connect()
+        now = datetime.utcnow()
+        await get_database().users.insert_many([
+            {
+                "_id": ObjectId(user_id),
+                "email": f"load-test-{role}-{user_id}@example.com",
+                "name": f"Load Test {role}",
+                "role": role,
+                "created_at": now,
+                "last_login": now,
+            }
+            for role, user_id in users.items()
+        ])
+
+    app.main.connect_to_mongo = connect_and_create_users
+
+
+def run_server(port: int, env: dict, in_memory: bool, users: dict):
+    """Serve the backend (child process)"""
+    os.environ.update(env)
+    os.chdir(BACKEND_DIR)
+    import uvicorn
+
+    if in_memory:
+        use_in_memory_database()
+    create_users_on_connect(users)
+    from app.main import app
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+async def wait_until_ready(client, process, url: str):
+    started = time.monotonic()
+    while time.monotonic() - started < STARTUP_TIMEOUT_SECONDS:
+        if not process.is_alive():
+            raise RuntimeError(f"Process serving {url} exited with code {process.exitcode}")
+        try:
+            if (await client.get(url)).status_code < 500:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.25)
+    raise RuntimeError(f"{url} not ready after {STARTUP_TIMEOUT_SECONDS}s")
+
+
+# ---------------------------------------------------------------------------
+# Generated data
+
+def applicant_payload(index: int, prefix: str) -> dict:
+    """Realistic applicant (scripts/seed_db.py profile) as an API payload"""
+    from seed_db import generate_applicant
+
+    doc = generate_applicant(index)
+    return {
+        "name": doc["name"],
+        "email": f"{prefix}{index}@example.com",
+        "phone": doc["phone"],
+        "financial_data": doc["financial_data"],
+        "social_data": doc["social_data"],
+        "gig_data": doc["gig_data"],
+    }
+
+
+def auth_headers(user_id: str) -> dict:
+    """Bearer header with a JWT signed with the run's SECRET_KEY"""
+    from app.utils.security import create_access_token
+
+    return {"Authorization": f"Bearer {create_access_token({'sub': user_id})}"}
+
+
+class Context:
+    """State shared by the request builders"""
+
+    def __init__(self, run_id: str, applicant_ids, insight_applicants, admin_headers: dict):
+        self.run_id = run_id
+        self.admin_headers = admin_headers
+        self.applicant_ids = applicant_ids
+        self.insight_applicants = insight_applicants
+        self.insight_job_ids = []
+        self.counter = itertools.count(1_000_000)
+        self.rng = random.Random(0)
+
+    def applicant_id(self) -> str:
+        return self.rng.choice(self.applicant_ids)
+
+    def new_applicant(self) -> dict:
+        return applicant_payload(next(self.counter), f"load-{self.run_id}-")
+
+
+def bulk_body(ctx: Context) -> dict:
+    lines = "\n".join(json.dumps(ctx.new_applicant()) for _ in range(20))
+    return {"content": lines.encode(), "headers": {"Content-Type": "application/x-ndjson"}}
+
+
+def insight_body(ctx: Context) -> dict:
+    return {"json": ctx.rng.choice(ctx.insight_applicants)}
+
+
+def remember_job(ctx: Context, response):
+    if response.status_code == 202:
+        ctx.insight_job_ids.append(response.json()["job_id"])
+
+
+# name, method, path(ctx), request kwargs(ctx) or None, needs a real mongod
+ENDPOINTS = [
+    ("health", "GET", lambda ctx: "/health", None, False),
+    ("users.me", "GET", lambda ctx: "/users/me", None, False),
+    ("users.update", "PATCH", lambda ctx: "/users/me", lambda ctx: {"json": {"name": "Load Test"}}, False),
+    ("ingest.list", "GET", lambda ctx: "/ingest/applicants?limit=50", None, False),
+    ("ingest.list_summary", "GET", lambda ctx: "/ingest/applicants?limit=50&view=summary", None, False),
+    ("ingest.create", "POST", lambda ctx: "/ingest/applicant", lambda ctx: {"json": ctx.new_applicant()}, False),
+    ("ingest.bulk", "POST", lambda ctx: "/ingest/applicants/bulk", bulk_body, False),
+    ("ingest.financial", "POST", lambda ctx: "/ingest/financial",
+     lambda ctx: {"json": {"applicant_id": ctx.applicant_id(), "data": ctx.new_applicant()["financial_data"]}}, False),
+    ("ingest.social", "POST", lambda ctx: "/ingest/social",
+     lambda ctx: {"json": {"applicant_id": ctx.applicant_id(), "data": ctx.new_applicant()["social_data"]}}, False),
+    ("ingest.gig", "POST", lambda ctx: "/ingest/gig",
+     lambda ctx: {"json": {"applicant_id": ctx.applicant_id(), "data": ctx.new_applicant()["gig_data"]}}, False),
+    ("predict.score", "POST", lambda ctx: "/predict/score", lambda ctx: {"json": {"applicant_id": ctx.applicant_id()}}, False),
+    ("predict.batch", "POST", lambda ctx: "/predict/batch",
+     lambda ctx: {"json": {"applicant_ids": ctx.rng.sample(ctx.applicant_ids, min(50, len(ctx.applicant_ids)))}}, False),
+    ("predict.model", "GET", lambda ctx: "/predict/model", None, False),
+    ("predict.executor_stats", "GET", lambda ctx: "/predict/executor/stats", None, False),
+    ("predict.history", "GET", lambda ctx: f"/predict/history/{ctx.applicant_id()}", None, False),
+    ("predict.series_raw", "GET", lambda ctx: f"/predict/history/{ctx.applicant_id()}/series?interval=raw", None, False),
+    ("predict.series_daily", "GET", lambda ctx: f"/predict/history/{ctx.applicant_id()}/series?interval=day", None, True),
+    ("stats.portfolio", "GET", lambda ctx: "/stats/portfolio", None, False),
+    ("insights.generate", "POST", lambda ctx: "/insights/generate", insight_body, False),
+    ("insights.stream", "POST", lambda ctx: "/insights/stream", insight_body, False),
+    ("insights.cache_stats", "GET", lambda ctx: "/insights/cache/stats", None, False),
+    ("insights.job_create", "POST", lambda ctx: "/insights/jobs", insight_body, False),
+    ("insights.job_get", "GET", lambda ctx: f"/insights/jobs/{ctx.rng.choice(ctx.insight_job_ids)}", None, False),
+    ("insights.job_stats", "GET", lambda ctx: "/insights/jobs/stats", None, False),
+]
+
+# Called with each response, e.g. to collect IDs for later endpoints
+AFTER_RESPONSE = {"insights.job_create": remember_job}
+
+# Sent with the load-test admin's token instead of the user's
+ADMIN_ENDPOINTS = {"insights.cache_stats", "insights.job_stats"}
+
+
+# ---------------------------------------------------------------------------
+# Load generation
+
+async def seed(client, args, run_id: str):
+    """Bulk-ingest applicants and score them; returns their IDs"""
+    print(f"Seeding {args.applicants} applicants...")
+    for start in range(0, args.applicants, 500):
+        rows = [applicant_payload(i, f"seed-{run_id}-") for i in range(start, min(start + 500, args.applicants))]
+        response = await client.post(
+            "/ingest/applicants/bulk",
+            content="\n".join(json.dumps(row) for row in rows).encode(),
+            headers={"Content-Type": "application/x-ndjson"}
+        )
+        response.raise_for_status()
+
+    applicant_ids, cursor = [], None
+    while True:
+        params = {"limit": 200, **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/ingest/applicants", params=params)
+        response.raise_for_status()
+        applicant_ids.extend(row["id"] for row in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    # Two rounds so every applicant has score history
+    for _ in range(2):
+        for start in range(0, len(applicant_ids), 100):
+            response = await client.post("/predict/batch", json={"applicant_ids": applicant_ids[start:start + 100]})
+            response.raise_for_status()
+    # Let the audit writers flush before the measured runs
+    await asyncio.sleep(1.0)
+    return applicant_ids
+
+
+async def drive(client, ctx: Context, endpoint, requests: int, concurrency: int, warmup: int):
+    """Send `requests` requests to one endpoint from `concurrency` workers"""
+    name, method, path, build, _ = endpoint
+    after = AFTER_RESPONSE.get(name)
+    admin = name in ADMIN_ENDPOINTS
+    latencies, statuses = [], {}
+
+    async def send(record: bool):
+        kwargs = build(ctx) if build else {}
+        if admin:
+            kwargs["headers"] = {**kwargs.get("headers", {}), **ctx.admin_headers}
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path(ctx), **kwargs)
+            status_code = response.status_code
+        except Exception as e:
+            status_code = type(e).__name__
+            response = None
+        elapsed = time.perf_counter() - started
+        if response is not None and after:
+            after(ctx, response)
+        if record:
+            latencies.append(elapsed)
+            statuses[str(status_code)] = statuses.get(str(status_code), 0) + 1
+
+    for _ in range(warmup):
+        await send(record=False)
+
+    remaining = itertools.count()
+
+    async def worker():
+        while next(remaining) < requests:
+            await send(record=True)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    errors = sum(count for code, count in statuses.items() if not code.isdigit() or int(code) >= 400)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "rps": round(len(latencies) / wall, 1) if wall else 0.0,
+    }
+
+
+def print_results(results: dict):
+    print(f"\n{'endpoint':<24} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'errors':>7}")
+    for name, result in results.items():
+        print(f"{name:<24} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+              f"{result['rps']:>9.1f} {result['errors']:>7}")
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Regressions against a baseline run (p50 / p95 up or req/s down by more than threshold)"""
+    regressions = []
+    print(f"\n{'vs baseline':<24} {'p50':>9} {'p95':>9} {'req/s':>9}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            print(f"{name:<24} {'(new)':>9}")
+            continue
+        changes = {
+            "p50": result["p50_ms"] / base["p50_ms"] - 1 if base["p50_ms"] else 0.0,
+            "p95": result["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0,
+            "rps": result["rps"] / base["rps"] - 1 if base["rps"] else 0.0,
+        }
+        failed = [
+            metric for metric, change in changes.items()
+            if (change < -threshold if metric == "rps" else change > threshold)
+        ]
+        marks = {metric: "✗" if metric in failed else " " for metric in changes}
+        print(f"{name:<24} " + " ".join(f"{changes[m] * 100:>+7.1f}%{marks[m]}" for m in ("p50", "p95", "rps")))
+        regressions.extend(f"{name} {metric} {changes[metric] * 100:+.1f}%" for metric in failed)
+    return regressions
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=BACKEND_DIR
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+async def run(args, base_url: str, run_id: str, users: dict) -> dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=args.timeout, limits=limits, headers=auth_headers(users["user"])
+    ) as client:
+        applicant_ids = await seed(client, args, run_id)
+        insight_applicants = [applicant_payload(i, f"insights-{run_id}-") for i in range(20)]
+        ctx = Context(run_id, applicant_ids, insight_applicants, auth_headers(users["admin"]))
+
+        selected = [prefix.strip() for prefix in args.endpoints.split(",")] if args.endpoints else None
+        results = {}
+        for endpoint in ENDPOINTS:
+            name, _, _, _, needs_mongod = endpoint
+            if selected and not any(name.startswith(prefix) for prefix in selected):
+                continue
+            if needs_mongod and args.in_memory:
+                print(f"  {name}: skipped (needs mongod)")
+                continue
+            if name == "insights.job_get" and not ctx.insight_job_ids:
+                continue
+            results[name] = await drive(client, ctx, endpoint, args.requests, args.concurrency, args.warmup)
+            print(f"  {name}: {results[name]['rps']:.0f} req/s")
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test every API endpoint and compare against a baseline")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--in-memory", action="store_true", help="Use mongomock-motor instead of a mongod")
+    parser.add_argument("--keep-db", action="store_true", help="Keep the load-test database (mongod only)")
+    parser.add_argument("--applicants", type=int, default=1000, help="Applicants seeded before the runs")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per endpoint")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--endpoints", help="Comma-separated name prefixes, e.g. predict.,users.me")
+    parser.add_argument("--gemini-delay", type=float, default=0.01, help="Gemini stub delay per chunk (seconds)")
+    parser.add_argument("--env", action="append", default=[], help="Extra backend setting, KEY=VALUE (repeatable)")
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results saved with --save")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative regression (0.25 = 25%%)")
+    parser.add_argument("--max-error-rate", type=float, default=0.0, help="Allowed fraction of failed requests")
+    args = parser.parse_args()
+
+    run_id = secrets.token_hex(4)
+    server_port, stub_port = free_port(), free_port()
+    env = dict(SERVER_ENV)
+    env.update({
+        "SECRET_KEY": secrets.token_urlsafe(32),
+        "MONGODB_URI": args.mongo_uri,
+        "MONGODB_DB": f"loadtest_{run_id}",
+        "GEMINI_API_URL": f"http://127.0.0.1:{stub_port}/v1",
+        "AUDIT_SPILL_DIR": tempfile.mkdtemp(prefix="load-test-spill-"),
+    })
+    env.update(item.split("=", 1) for item in args.env)
+    # The parent imports seed_db (which reads settings) for generated data
+    # and signs the users' tokens with the same SECRET_KEY
+    os.environ.update(env)
+    # ObjectId hex strings; the server inserts these users
+    users = {"user": secrets.token_hex(12), "admin": secrets.token_hex(12)}
+
+    spawn = multiprocessing.get_context("spawn")
+    stub = spawn.Process(target=run_gemini_stub, args=(stub_port, args.gemini_delay), daemon=True)
+    server = spawn.Process(target=run_server, args=(server_port, env, args.in_memory, users), daemon=True)
+    stub.start()
+    server.start()
+    try:
+        import httpx
+
+        async def start_and_run():
+            async with httpx.AsyncClient() as probe:
+                await wait_until_ready(probe, stub, f"http://127.0.0.1:{stub_port}/docs")
+                await wait_until_ready(probe, server, f"http://127.0.0.1:{server_port}/health")
+            return await run(args, f"http://127.0.0.1:{server_port}", run_id, users)
+
+        results = asyncio.run(start_and_run())
+    finally:
+        for process in (server, stub):
+            process.terminate()
+            process.join(10)
+        if not args.in_memory and not args.keep_db:
+            from pymongo import MongoClient
+            MongoClient(args.mongo_uri).drop_database(env["MONGODB_DB"])
+
+    print_results(results)
+    report = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "commit": git_commit(),
+            "mode": "in-memory" if args.in_memory else "mongod",
+            "applicants": args.applicants,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "env": args.env,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "endpoints": results,
+    }
+    if args.save:
+        Path(args.save).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\n✓ Results saved to {args.save}")
+
+    failures = [
+        f"{name} error rate {result['errors'] / result['requests']:.1%}"
+        for name, result in results.items()
+        if result["requests"] and result["errors"] / result["requests"] > args.max_error_rate
+    ]
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        for key in ("mode", "requests", "concurrency", "applicants", "env"):
+            if baseline["meta"].get(key) != report["meta"][key]:
+                print(f"✗ Baseline {key} differs: {baseline['meta'].get(key)} vs {report['meta'][key]}")
+        failures.extend(compare(results, baseline["endpoints"], args.threshold))
+
+    if failures:
+        print("\n✗ Failed:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\n✓ No regressions")
+
+
+if __name__ == "__main__":
+    main()
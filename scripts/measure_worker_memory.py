@@ -0,0 +1,186 @@
+"""
+Worker memory measurement script
+
+Starts the API with several workers in each serving mode and reports RSS
+and PSS (proportional set size: shared pages are split between the
+processes that map them) for the master and every worker. PSS is the
+number that shows whether the model is really shared.
+
+Modes:
+    independent  uvicorn --workers N; every worker loads its own model
+    preload      gunicorn with preload_app; model loaded once before fork
+    mmap         uvicorn --workers N with MODEL_BACKEND=numpy MODEL_MMAP=true
+
+Requires Linux (/proc/<pid>/smaps_rollup), a reachable MongoDB and the
+usual backend .env, since each worker runs the normal startup.
+
+Usage:
+    python scripts/measure_worker_memory.py
+    python scripts/measure_worker_memory.py --modes preload,mmap --workers 8 --json memory.json
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+
+SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def server_command(mode: str, app: str, workers: int, port: int):
+    """Command line and extra environment for a serving mode"""
+    if mode == "preload":
+        return (
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}", app],
+            {"PRELOAD_APP": "true", "WEB_CONCURRENCY": str(workers)}
+        )
+    command = [sys.executable, "-m", "uvicorn", app, "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)]
+    if mode == "mmap":
+        return command, {"MODEL_BACKEND": "numpy", "MODEL_MMAP": "true"}
+    return command, {}
+
+
+def descendants(pid: int):
+    """All descendant PIDs of a process"""
+    children = {}
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # Field 4 (ppid) follows the parenthesised command name
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry.name))
+
+    found, stack = [], [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def process_role(pid: int) -> str:
+    """Label a descendant process (multiprocessing helpers are not workers)"""
+    try:
+        cmdline = Path(f"/proc/{pid}/cmdline").read_bytes().replace(b"\0", b" ").decode()
+    except OSError:
+        return "worker"
+    return "helper" if "resource_tracker" in cmdline else "worker"
+
+
+def smaps_rollup(pid: int):
+    """Memory counters (KiB) from /proc/<pid>/smaps_rollup"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in SMAPS_FIELDS:
+                values[key] = int(rest.split()[0])
+    return values
+
+
+def wait_until_ready(port: int, process, expected_workers: int, timeout: float):
+    """Wait for /health to answer and for all workers to have started"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                if response.status == 200 and len(descendants(process.pid)) >= expected_workers:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("Server did not become ready in time")
+
+
+def measure(mode: str, args):
+    """Start the server in one mode, measure every process, shut it down"""
+    command, extra_env = server_command(mode, args.app, args.workers, args.port)
+    env = {**os.environ, **extra_env}
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(args.port, process, args.workers, args.timeout)
+        # Exercise every worker a little so lazily-touched pages show up
+        for _ in range(args.workers * 4):
+            urllib.request.urlopen(f"http://127.0.0.1:{args.port}/health", timeout=5).read()
+        time.sleep(args.settle)
+
+        processes = [{"pid": process.pid, "role": "master", **smaps_rollup(process.pid)}]
+        for pid in descendants(process.pid):
+            try:
+                processes.append({"pid": pid, "role": process_role(pid), **smaps_rollup(pid)})
+            except OSError:
+                continue
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    return {
+        "mode": mode,
+        "workers": args.workers,
+        "processes": processes,
+        "total_rss_kib": sum(p["Rss"] for p in processes),
+        "total_pss_kib": sum(p["Pss"] for p in processes),
+    }
+
+
+def print_report(result):
+    print(f"\n=== {result['mode']} ({result['workers']} workers) ===")
+    print(f"{'pid':>8} {'role':>7} {'RSS MiB':>9} {'PSS MiB':>9} {'shared MiB':>11} {'private MiB':>12}")
+    for p in result["processes"]:
+        shared = p.get("Shared_Clean", 0) + p.get("Shared_Dirty", 0)
+        private = p.get("Private_Clean", 0) + p.get("Private_Dirty", 0)
+        print(f"{p['pid']:>8} {p['role']:>7} {p['Rss'] / 1024:>9.1f} {p['Pss'] / 1024:>9.1f} "
+              f"{shared / 1024:>11.1f} {private / 1024:>12.1f}")
+    print(f"{'total':>16} {result['total_rss_kib'] / 1024:>9.1f} {result['total_pss_kib'] / 1024:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-worker RSS/PSS for each serving mode")
+    parser.add_argument("--modes", default="independent,preload,mmap")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--app", default="app.main:app")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--settle", type=float, default=2)
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    if not Path("/proc/self/smaps_rollup").exists():
+        print("❌ /proc/<pid>/smaps_rollup not available (Linux 4.14+ required)")
+        sys.exit(1)
+
+    results = []
+    for mode in args.modes.split(","):
+        result = measure(mode, args)
+        print_report(result)
+        results.append(result)
+
+    print("\nSummary (total PSS is the real memory cost):")
+    for result in results:
+        print(f"  {result['mode']:>12}: RSS {result['total_rss_kib'] / 1024:8.1f} MiB   "
+              f"PSS {result['total_pss_kib'] / 1024:8.1f} MiB")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
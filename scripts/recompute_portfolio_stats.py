@@ -0,0 +1,41 @@
+"""
+Portfolio stats recompute script
+
+Rebuilds the per-user `portfolio_stats` documents from the applicants
+collection. Scoring and ingestion keep them current incrementally; run
+this after manual data changes or to repair drift.
+
+Usage:
+    python scripts/recompute_portfolio_stats.py
+    python scripts/recompute_portfolio_stats.py --user-id 65f0c2...
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from app.db import connect_to_mongo, close_mongo_connection
+from app.services.portfolio_stats import recompute_all_portfolio_stats, recompute_portfolio_stats
+
+
+async def main(args):
+    await connect_to_mongo()
+    try:
+        if args.user_id:
+            stats = await recompute_portfolio_stats(args.user_id)
+            print(f"✓ {args.user_id}: {stats['total']} applicants, {stats['scored']} scored")
+        else:
+            users = await recompute_all_portfolio_stats()
+            print(f"✓ Recomputed portfolio stats for {users} users")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild portfolio stats from applicants")
+    parser.add_argument("--user-id", help="Only this user (default: everyone)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,101 @@
+"""
+Applicant re-scoring script
+
+Re-scores stored applicants with the current model (after deploying a new
+one) in vectorized chunks, checkpointing after each chunk. Runs the same
+job as POST /admin/rescore; an interrupted job - Ctrl+C, crash, or a job
+started from the API whose worker died - resumes from its checkpoint.
+
+Usage:
+    python scripts/rescore_applicants.py
+    python scripts/rescore_applicants.py --artifact catboost_model_v2.cbm --max-rate 200
+    python scripts/rescore_applicants.py --user-id 65f0c2... --all
+    python scripts/rescore_applicants.py --resume 6650a1...
+    python scripts/rescore_applicants.py --list
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from bson import ObjectId
+
+from app.db import connect_to_mongo, close_mongo_connection
+from app.services.audit_writer import audit_writer
+from app.services.score_history import score_history_writer
+from app.services.inference_executor import inference_executor
+from app.services.model_registry import model_registry
+from app.services.rescore_job import rescore_runner, describe_progress
+
+
+def print_progress(job):
+    progress = describe_progress(job)
+    eta = f", ETA {progress['eta_seconds']:.0f}s" if progress["eta_seconds"] is not None else ""
+    print(
+        f"  {job['processed']}/{job['total']} ({progress['percent']}%), "
+        f"{job['changed']} changed, {job.get('rate', 0)}/s{eta}"
+    )
+
+
+async def main(args):
+    if args.artifact:
+        model_registry.load(args.artifact)
+    await connect_to_mongo()
+    await audit_writer.start()
+    await score_history_writer.start()
+    inference_executor.start()
+    try:
+        if args.list:
+            for job in await rescore_runner.list():
+                print(f"{job['_id']}  {job['status']:<9}  {job.get('processed', 0)}/{job.get('total', 0)}  "
+                      f"model {job.get('model_version')}  created {job['created_at']:%Y-%m-%d %H:%M}")
+            return
+
+        if args.resume:
+            job = await rescore_runner.claim(ObjectId(args.resume))
+            if job is None:
+                print("✗ Job not found, finished, or still running in another process")
+                sys.exit(1)
+            print(f"Resuming job {job['_id']} after {job['processed']} applicants")
+        else:
+            job = await rescore_runner.create(
+                user_id=args.user_id,
+                only_stale=not args.all,
+                batch_size=args.batch_size,
+                max_rate=args.max_rate
+            )
+            job = await rescore_runner.claim(job["_id"])
+            print(f"Job {job['_id']}: {job['total']} applicants to score with model {job['model_version']}")
+
+        started = time.monotonic()
+        job = await rescore_runner.run(job, progress=print_progress)
+        elapsed = time.monotonic() - started
+        print(f"{'✓' if job['status'] == 'done' else '✗'} Job {job['_id']} {job['status']}: "
+              f"{job['processed']} scored, {job['changed']} changed in {elapsed:.1f}s")
+        if job.get("error"):
+            print(f"  {job['error']}")
+    finally:
+        await audit_writer.stop()
+        await score_history_writer.stop()
+        inference_executor.shutdown()
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-score stored applicants with the current model")
+    parser.add_argument("--user-id", help="Only this user's applicants (default: everyone)")
+    parser.add_argument("--all", action="store_true", help="Also re-score applicants already scored by this model")
+    parser.add_argument("--artifact", help="Model file in models/ to score with (default: the active artifact)")
+    parser.add_argument("--batch-size", type=int, help="Applicants per chunk (default: RESCORE_BATCH_SIZE)")
+    parser.add_argument("--max-rate", type=float, help="Applicants per second, 0 = unthrottled (default: RESCORE_MAX_RATE)")
+    parser.add_argument("--resume", metavar="JOB_ID", help="Continue an interrupted job from its checkpoint")
+    parser.add_argument("--list", action="store_true", help="List recent jobs")
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        print("Interrupted; resume with --resume <job id>")
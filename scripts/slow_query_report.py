@@ -0,0 +1,69 @@
+"""
+Slow query report
+
+Reads the MongoDB profiler (`system.profile`) and prints the slowest query
+shapes: literal values are replaced with "?" so the same query from
+different requests is grouped, then shapes are ranked by total time.
+
+Turn the profiler on either with MONGO_PROFILE_SLOW_MS in backend/.env
+(applied at API startup) or with --enable here, exercise the API, then
+run the report.
+
+Usage:
+    python scripts/slow_query_report.py --enable 50     # profile ops > 50 ms
+    python scripts/slow_query_report.py --minutes 30 --top 10
+    python scripts/slow_query_report.py --disable
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.config import settings
+from app.services.query_profiler import set_profiling, slow_query_report
+
+
+async def main(args):
+    client = AsyncIOMotorClient(settings.mongodb_uri)
+    db = client[settings.mongodb_db]
+    try:
+        if args.enable is not None or args.disable:
+            slow_ms = 0 if args.disable else args.enable
+            await set_profiling(db, slow_ms)
+            print(f"✓ Profiler {'off' if slow_ms == 0 else f'on for operations over {slow_ms} ms'} ({settings.mongodb_db})")
+            return
+
+        report = await slow_query_report(db, since_minutes=args.minutes, top=args.top)
+    finally:
+        client.close()
+
+    print(f"Profiler level {report['profiling_level']}, slowms {report['slow_ms']}, since {report['since']:%Y-%m-%d %H:%M} UTC")
+    if not report["shapes"]:
+        print("No slow operations recorded")
+    for i, shape in enumerate(report["shapes"], 1):
+        flag = "  ⚠ COLLSCAN" if shape["collscan"] else ""
+        print(f"\n{i}. {shape['ns']} {shape['op']}  x{shape['count']}  "
+              f"total {shape['total_ms']} ms  avg {shape['avg_ms']} ms  max {shape['max_ms']} ms{flag}")
+        print(f"   shape: {json.dumps(shape['shape'])}")
+        print(f"   plan: {', '.join(shape['plans']) or '-'}  "
+              f"examined/returned: {shape['examined_per_returned']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank slow MongoDB query shapes from the profiler")
+    parser.add_argument("--minutes", type=int, default=60, help="Look back this far")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--enable", type=int, metavar="SLOW_MS", help="Turn the profiler on and exit")
+    parser.add_argument("--disable", action="store_true", help="Turn the profiler off and exit")
+    parser.add_argument("--json", help="Also write the report to this file")
+    asyncio.run(main(parser.parse_args()))
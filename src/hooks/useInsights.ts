@@ -1,4 +1,4 @@
-import api from "@/services/api";
+import { streamInsights } from "@/services/api";
 import { useState, useCallback } from "react";
 
 export interface InsightsReport {
@@ -15,10 +15,18 @@ export function useInsights() {
     setError(null);
     setInsights(null);
     try {
-      const response = await api.post("/insights/generate", applicant);
-      setInsights(response.data.insights);
+      // Render each report section as soon as the backend streams it
+      await streamInsights(applicant, (event, data) => {
+        if (event === "section") {
+          setInsights((prev) => ({ ...(prev || {}), [data.name]: data.data }));
+        } else if (event === "complete") {
+          setInsights(data);
+        } else if (event === "error") {
+          setError(data.detail || "Failed to fetch insights");
+        }
+      });
     } catch (err: any) {
-      setError(err.response?.data?.detail || "Failed to fetch insights");
+      setError(err.message || "Failed to fetch insights");
     } finally {
       setLoading(false);
     }
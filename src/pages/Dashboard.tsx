@@ -24,6 +24,15 @@ import { Plus, Users, TrendingUp, AlertCircle } from "lucide-react";
 import api from "@/services/api";
 import { toast } from "sonner";
 
+interface PortfolioStats {
+  total: number;
+  scored: number;
+  unscored: number;
+  average_score: number | null;
+  tiers: Record<string, number>;
+  buckets: { range: string; count: number }[];
+}
+
 interface Applicant {
   id: string;
   name: string;
@@ -43,6 +52,7 @@ interface Applicant {
 const Dashboard = () => {
   const navigate = useNavigate();
   const [applicants, setApplicants] = useState<Applicant[]>([]);
+  const [stats, setStats] = useState<PortfolioStats | null>(null);
   const [loading, setLoading] = useState(true);
   const [filterTier, setFilterTier] = useState<string>("all");
   const [insightsOpen, setInsightsOpen] = useState(false);
@@ -57,9 +67,12 @@ const Dashboard = () => {
   } = useInsights();
 
   useEffect(() => {
-    fetchApplicants();
+    fetchDashboard();
   }, []);
 
+  // Loaded side by side; a failed stats request leaves the list usable
+  const fetchDashboard = () => Promise.all([fetchApplicants(), fetchStats()]);
+
   const fetchApplicants = async () => {
     try {
       const response = await api.get("/ingest/applicants");
@@ -72,6 +85,16 @@ const Dashboard = () => {
     }
   };
 
+  const fetchStats = async () => {
+    try {
+      const response = await api.get("/stats/portfolio");
+      setStats(response.data);
+    } catch (error: any) {
+      console.error("Failed to fetch portfolio stats:", error);
+      toast.error("Failed to load portfolio statistics");
+    }
+  };
+
   const handlePredict = async (applicantId: string) => {
     const toastId = toast.loading("Calculating credit score...");
     try {
@@ -81,8 +104,8 @@ const Dashboard = () => {
       toast.dismiss(toastId);
       toast.success(`Credit score calculated: ${response.data.score}`);
 
-      // Refresh applicants to show updated score
-      await fetchApplicants();
+      // Refresh applicants and stats to show the updated score
+      await fetchDashboard();
 
       // Navigate to result page
       navigate("/result", { state: { prediction: response.data } });
@@ -107,42 +130,15 @@ const Dashboard = () => {
       ? applicants
       : applicants.filter((a) => a.risk_tier === filterTier);
 
-  // Calculate statistics
-  const totalApplicants = applicants.length;
-  const scoredApplicants = applicants.filter((a) => a.credit_score).length;
-  const avgScore =
-    scoredApplicants > 0
-      ? Math.round(
-          applicants.reduce((sum, a) => sum + (a.credit_score || 0), 0) /
-            scoredApplicants
-        )
-      : 0;
+  // Portfolio statistics are computed server-side over all applicants
+  const totalApplicants = stats?.total ?? 0;
+  const scoredApplicants = stats?.scored ?? 0;
+  const avgScore = Math.round(stats?.average_score ?? 0);
+  const highRiskApplicants =
+    (stats?.tiers.high ?? 0) + (stats?.tiers.very_high ?? 0);
 
   // Score distribution data
-  const scoreDistribution = [
-    {
-      range: "300-549",
-      count: applicants.filter((a) => a.credit_score && a.credit_score < 550)
-        .length,
-    },
-    {
-      range: "550-649",
-      count: applicants.filter(
-        (a) => a.credit_score && a.credit_score >= 550 && a.credit_score < 650
-      ).length,
-    },
-    {
-      range: "650-749",
-      count: applicants.filter(
-        (a) => a.credit_score && a.credit_score >= 650 && a.credit_score < 750
-      ).length,
-    },
-    {
-      range: "750-850",
-      count: applicants.filter((a) => a.credit_score && a.credit_score >= 750)
-        .length,
-    },
-  ];
+  const scoreDistribution = stats?.buckets ?? [];
 
   // Render a section as a table
   function renderTable(obj: any): JSX.Element {
@@ -277,11 +273,7 @@ const Dashboard = () => {
             </CardHeader>
             <CardContent>
               <div className="text-2xl font-bold">
-                {
-                  applicants.filter(
-                    (a) => a.risk_tier === "high" || a.risk_tier === "very_high"
-                  ).length
-                }
+                {highRiskApplicants}
               </div>
               <p className="text-xs text-muted-foreground">Require attention</p>
             </CardContent>
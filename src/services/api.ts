@@ -39,6 +39,47 @@ api.interceptors.response.use(
   }
 );
 
+// Stream Gemini-powered insights (Server-Sent Events over a POST response)
+export async function streamInsights(
+  applicant: any,
+  onEvent: (event: string, data: any) => void
+) {
+  const token = getToken();
+  const response = await fetch(`${API_BASE_URL}/insights/stream`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      ...(token ? { Authorization: `Bearer ${token}` } : {}),
+    },
+    body: JSON.stringify(applicant),
+  });
+  if (!response.ok || !response.body) {
+    throw new Error(`Insights stream failed (HTTP ${response.status})`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    // Events are separated by a blank line
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+      const raw = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = "message";
+      let data = "";
+      for (const line of raw.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data += line.slice(5).trim();
+      }
+      if (data) onEvent(event, JSON.parse(data));
+    }
+  }
+}
+
 export default api;
 
 // Call Gemini-powered insights endpoint